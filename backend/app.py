@@ -27,6 +27,7 @@ from backend.commands import (
     init_lambda_task_click,
     init_study_subject_click,
     reset_db_click,
+    sync_taps_click,
 )
 from backend.extensions import cache, cors, db, jwt, migrate, oauth, tm
 from backend.views import (
@@ -118,6 +119,7 @@ def register_commands(app):
     app.cli.add_command(init_lambda_task_click)
     app.cli.add_command(delete_lambda_tasks_click)
     app.cli.add_command(create_researcher_account_click)
+    app.cli.add_command(sync_taps_click)
 
 
 def register_extensions(app):
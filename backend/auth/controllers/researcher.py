@@ -21,10 +21,12 @@ from backend.auth.providers.cognito import (
     init_researcher_oauth_client,
 )
 from backend.auth.utils import (
+    RESEARCHER,
     create_error_response,
     create_researcher,
     create_success_response,
     get_researcher_cognito_client,
+    invalidate_identity,
     update_researcher,
 )
 from backend.extensions import db
@@ -199,6 +201,9 @@ class ResearcherAuthController(AuthControllerBase):
             logger.error(f"Failed to update last_login timestamp: {e!s}")
             db.session.rollback()
 
+        # The cached account no longer matches the database
+        invalidate_identity(RESEARCHER, account.email)
+
         return create_success_response(
             data={
                 "email": account.email,
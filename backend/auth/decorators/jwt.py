@@ -60,7 +60,7 @@ def auth_required(action, _resource=None):
 
             # check whether the user has permissions
             try:
-                permissions = current_user.get_permissions(app_id, study_id)
+                permissions = current_user.get_permission_set(app_id, study_id)
                 current_user.validate_ask(action, resource, permissions)
 
             # when the user does not have permission
@@ -44,6 +44,9 @@ def participant_auth_required(decorated_func=None):
     if decorated_func is None:
         return lambda f: participant_auth_required(f)
 
+    # Check once whether the decorated function expects 'ditti_id'
+    expects_ditti_id = "ditti_id" in inspect.signature(decorated_func).parameters
+
     @functools.wraps(decorated_func)
     def wrapper(*args, **kwargs):
         # Check for token in Authorization header
@@ -66,9 +69,7 @@ def participant_auth_required(decorated_func=None):
             # If validation failed, return error response
             return error_response
 
-        # Check if the decorated function expects 'ditti_id'
-        sig = inspect.signature(decorated_func)
-        if "ditti_id" in sig.parameters:
+        if expects_ditti_id:
             # Call the decorated function with ditti_id
             return decorated_func(*args, ditti_id=ditti_id, **kwargs)
         else:
@@ -21,7 +21,9 @@ from flask import make_response
 from backend.auth.controllers import ResearcherAuthController
 from backend.auth.utils.auth_helpers import (
     check_permissions,
+    get_auth_context,
     get_token_from_request,
+    set_auth_context,
 )
 from backend.models import Account
 
@@ -43,6 +45,9 @@ def researcher_auth_required(
     3. Passes the account to the decorated function instead of token_claims
     4. Ensures archived accounts cannot authenticate
 
+    The account and its permissions are kept in a request-scoped auth context,
+    so stacked decorators authenticate and load permissions only once.
+
     Parameters
     ----------
         action: The action to check permissions for or the function to decorate
@@ -54,13 +59,22 @@ def researcher_auth_required(
     """
 
     def decorator(func: F) -> F:
+        # Check once whether the function expects an 'account' parameter
+        expects_account = "account" in inspect.signature(func).parameters
+
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: dict[str, Any]) -> Any:
+            context = get_auth_context()
+
             # Check if we've already authenticated in a previous decorator
             # and added account to kwargs - only add once to avoid param conflict
             if "account" in kwargs:
                 # Account already authenticated and added by a previous decorator
                 auth_account = cast(Account, kwargs["account"])
+            elif context is not None:
+                # Account already authenticated earlier in this request
+                auth_account = context.account
+                kwargs["account"] = auth_account
             else:
                 # First decorator to run, need to authenticate
                 id_token = get_token_from_request()
@@ -79,7 +93,8 @@ def researcher_auth_required(
                     # If validation failed, return error response
                     return error_response
 
-                # Save account to kwargs for this and future decorators
+                # Save account to kwargs and the request for future decorators
+                set_auth_context(auth_account)
                 kwargs["account"] = auth_account
 
             # Check permissions if action was provided
@@ -90,14 +105,9 @@ def researcher_auth_required(
                 if not has_permission:
                     return error_response
 
-            # Call the decorated function with account
-            # Check if the function expects 'account' parameter
-            sig = inspect.signature(func)
-
-            # Simplify the parameter passing logic
-            if "account" not in sig.parameters and "account" in kwargs:
-                # If function doesn't expect 'account', remove it from kwargs
-                kwargs.pop("account")
+            # Call the decorated function with account only if it expects it
+            if not expects_account:
+                kwargs.pop("account", None)
 
             return func(*args, **kwargs)
 
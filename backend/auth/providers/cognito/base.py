@@ -16,11 +16,10 @@ import time
 import jwt
 import requests
 from flask import current_app
-from jwt.algorithms import RSAAlgorithm
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 
 from backend.auth.providers.cognito.constants import AUTH_ERROR_MESSAGES
-from backend.auth.utils.tokens import get_cognito_jwks
+from backend.auth.utils.tokens import claims_cache, jwks_cache
 
 logger = logging.getLogger(__name__)
 
@@ -141,7 +140,8 @@ class CognitoAuthBase:
 
         This is a secure alternative to parse_and_validate_id_token when
         validating existing tokens in authenticated routes where nonce isn't
-        available.
+        available. Verified claims are cached until the token expires, so a
+        token is only decoded and verified on its first request.
 
         Parameters
         ----------
@@ -153,6 +153,11 @@ class CognitoAuthBase:
                 - If success is True, result contains the parsed user info
                 - If success is False, result contains an error message
         """
+        namespace = self.get_config_prefix()
+        claims = claims_cache.get(namespace, id_token)
+        if claims is not None:
+            return True, claims
+
         try:
             # Decode the token without verification to get the header and claims
             unverified_header = jwt.get_unverified_header(id_token)
@@ -193,29 +198,19 @@ class CognitoAuthBase:
 
             # Manually verify signature using PyJWT instead of Authlib
             try:
-                # Fetch JWKs from Cognito
+                # Get the parsed public key from the cache of each pool's keys
                 jwks_url = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}/.well-known/jwks.json"
-                jwks = get_cognito_jwks(jwks_url)
-
-                if not jwks:
-                    logger.error(f"Failed to fetch JWKS: {jwks_url}")
-                    return False, AUTH_ERROR_MESSAGES["system_error"]
-
-                # Find the key that matches our token's key ID
                 kid = unverified_header.get("kid")
-                key = None
-                for jwk in jwks.get("keys", []):
-                    if jwk.get("kid") == kid:
-                        key = jwk
-                        break
+                public_key = jwks_cache.get_key(jwks_url, kid)
+
+                if not public_key:
+                    if jwks_cache.fetch_failed(jwks_url):
+                        logger.error(f"Failed to fetch JWKS: {jwks_url}")
+                        return False, AUTH_ERROR_MESSAGES["system_error"]
 
-                if not key:
                     logger.error(f"No matching key found for kid: {kid}")
                     return False, AUTH_ERROR_MESSAGES["auth_failed"]
 
-                # Get public key in PEM format for PyJWT
-                public_key = RSAAlgorithm.from_jwk(key)
-
                 # Verify the token
                 claims = jwt.decode(
                     id_token,
@@ -233,6 +228,7 @@ class CognitoAuthBase:
                 )
 
                 # Validation successful
+                claims_cache.set(namespace, id_token, claims)
                 return True, claims
 
             except jwt.ExpiredSignatureError:
@@ -16,6 +16,11 @@ from sqlalchemy import func
 
 from backend.auth.providers.cognito import CognitoAuthBase
 from backend.auth.providers.cognito.constants import AUTH_ERROR_MESSAGES
+from backend.auth.utils.identity import (
+    PARTICIPANT,
+    cache_identity,
+    get_cached_identity,
+)
 from backend.extensions import oauth
 from backend.models import StudySubject
 
@@ -80,14 +85,20 @@ class ParticipantAuth(CognitoAuthBase):
             logger.warning("No cognito:username found in token claims")
             return None, "Invalid token"
 
-        study_subject = self.get_study_subject_from_ditti_id(
-            ditti_id, include_archived
-        )
+        # Ditti IDs are case-insensitive
+        study_subject = get_cached_identity(PARTICIPANT, ditti_id.lower())
+        if study_subject is None:
+            study_subject = self.get_study_subject_from_ditti_id(
+                ditti_id, include_archived=True
+            )
+            if study_subject:
+                cache_identity(PARTICIPANT, ditti_id.lower(), study_subject)
+
         if not study_subject:
             logger.warning(f"No study subject found for ID: {ditti_id}")
             return None, AUTH_ERROR_MESSAGES["not_found"]
 
-        if study_subject.is_archived:
+        if study_subject.is_archived and not include_archived:
             logger.warning(
                 f"Attempt to access with archived study subject: {ditti_id}"
             )
@@ -13,6 +13,11 @@
 import logging
 
 from backend.auth.providers.cognito.base import CognitoAuthBase
+from backend.auth.utils.identity import (
+    RESEARCHER,
+    cache_identity,
+    get_cached_identity,
+)
 from backend.extensions import oauth
 from backend.models import Account
 
@@ -73,15 +78,18 @@ class ResearcherAuth(CognitoAuthBase):
             logger.warning("No email found in token claims")
             return None, "Invalid token"
 
-        # First check if account exists regardless of archived status
-        any_account = self.get_account_from_email(email, include_archived=True)
+        # Get the account regardless of archived status, from the identity
+        # cache if it was recently loaded
+        account = get_cached_identity(RESEARCHER, email)
+        if account is None:
+            account = self.get_account_from_email(email, include_archived=True)
+            if account:
+                cache_identity(RESEARCHER, email, account)
 
-        if any_account and any_account.is_archived and not include_archived:
+        if account and account.is_archived and not include_archived:
             logger.warning(f"Attempt to access with archived account: {email}")
             return None, "Account unavailable. Please contact support."
 
-        account = self.get_account_from_email(email, include_archived)
-
         if not account:
             logger.warning(f"No active account found for email: {email}")
             return None, "Invalid credentials"
@@ -18,10 +18,20 @@ and provide common functionality for cookies, tokens, sessions, and responses.
 """
 
 from backend.auth.utils.auth_helpers import (
+    AuthContext,
     check_permissions,
+    get_auth_context,
     get_token_from_request,
+    set_auth_context,
 )
 from backend.auth.utils.cookies import clear_auth_cookies, set_auth_cookies
+from backend.auth.utils.identity import (
+    PARTICIPANT,
+    RESEARCHER,
+    cache_identity,
+    get_cached_identity,
+    invalidate_identity,
+)
 from backend.auth.utils.researcher_cognito import (
     create_researcher,
     delete_researcher,
@@ -35,14 +45,21 @@ from backend.auth.utils.responses import (
 )
 from backend.auth.utils.session import AuthFlowSession
 from backend.auth.utils.tokens import (
+    claims_cache,
     create_code_challenge,
     generate_code_verifier,
     get_cognito_jwks,
+    jwks_cache,
 )
 
 __all__ = [
+    "PARTICIPANT",
+    "RESEARCHER",
+    "AuthContext",
     "AuthFlowSession",
+    "cache_identity",
     "check_permissions",
+    "claims_cache",
     "clear_auth_cookies",
     "create_code_challenge",
     "create_error_response",
@@ -50,10 +67,15 @@ __all__ = [
     "create_success_response",
     "delete_researcher",
     "generate_code_verifier",
+    "get_auth_context",
+    "get_cached_identity",
     "get_cognito_jwks",
     "get_researcher",
     "get_researcher_cognito_client",
     "get_token_from_request",
+    "invalidate_identity",
+    "jwks_cache",
+    "set_auth_context",
     "set_auth_cookies",
     "update_researcher",
 ]
@@ -12,13 +12,106 @@
 
 import logging
 
-from flask import Response, make_response, request
+from flask import Response, g, make_response, request
 
 from backend.models import Account, App, Study
 
 logger = logging.getLogger(__name__)
 
 
+class AuthContext:
+    """
+    The researcher that is authenticated for the current request.
+
+    Stacked `researcher_auth_required` decorators share one context, so the
+    account is authenticated, the request's app and study are read and each
+    permission set is loaded once per request.
+
+    Vars
+    ----
+        account (Account): The authenticated account
+        request (Request): The request the account was authenticated for
+        permission_sets (dict): Maps each (app, study) to a permission set
+    """
+
+    def __init__(self, account: Account):
+        self.account = account
+        self.request = request._get_current_object()
+        self.permission_sets = {}
+        self.data = None
+
+    def get_request_data(self) -> dict:
+        """
+        Get the request's arguments or JSON body.
+
+        Returns
+        -------
+            dict: The JSON body, or the query string for GET requests
+        """
+        if self.data is None:
+            if request.method == "GET":
+                self.data = request.args or {}
+            else:
+                self.data = request.json or request.args or {}
+
+        return self.data
+
+    def get_permission_set(self, app_id, study_id=None) -> frozenset:
+        """
+        Get the account's permissions for an app and study.
+
+        Parameters
+        ----------
+            app_id: The app's primary key
+            study_id: The study's primary key
+
+        Returns
+        -------
+            frozenset: The (action, resource) definition of each permission
+        """
+        key = app_id, study_id
+        if key not in self.permission_sets:
+            self.permission_sets[key] = self.account.get_permission_set(
+                app_id, study_id
+            )
+
+        return self.permission_sets[key]
+
+
+def get_auth_context() -> AuthContext | None:
+    """
+    Get the auth context of the current request.
+
+    Returns
+    -------
+        AuthContext or None: The context, or None if no researcher has been
+            authenticated for the current request
+    """
+    context = g.get("researcher_auth")
+
+    # g can outlive a request when an app context is already pushed
+    if context is None or context.request is not request._get_current_object():
+        return None
+
+    return context
+
+
+def set_auth_context(account: Account) -> AuthContext:
+    """
+    Set the researcher that is authenticated for the current request.
+
+    Parameters
+    ----------
+        account: The authenticated account
+
+    Returns
+    -------
+        AuthContext: The new context
+    """
+    g.researcher_auth = AuthContext(account)
+    return g.researcher_auth
+
+
 def get_token_from_request() -> str | None:
     """
     Extract authentication token from request headers or cookies.
@@ -54,12 +147,11 @@ def check_permissions(
             success: True if permission check passed, False otherwise
             error_response: Error response if check failed, None otherwise
     """
-    # Get data from appropriate sources based on request method
-    if request.method == "GET":
-        data = request.args or {}
-    else:
-        data = request.json or request.args or {}
+    context = get_auth_context()
+    if context is None or context.account is not auth_account:
+        context = set_auth_context(auth_account)
 
+    data = context.get_request_data()
     app_id = data.get("app")
     study_id = data.get("study")
 
@@ -67,7 +159,7 @@ def check_permissions(
     resource_to_check = resource_param or data.get("resource")
 
     try:
-        permissions = auth_account.get_permissions(app_id, study_id)
+        permissions = context.get_permission_set(app_id, study_id)
         auth_account.validate_ask(action, resource_to_check, permissions)
         return True, None
     except ValueError:
@@ -0,0 +1,104 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import logging
+
+from flask import current_app
+
+from backend.extensions import cache, db
+
+logger = logging.getLogger(__name__)
+
+# The kinds of identity that are cached
+RESEARCHER = "researcher"
+PARTICIPANT = "participant"
+
+
+def get_identity_key(kind, identifier):
+    """
+    Get the cache key of an identity.
+
+    Parameters
+    ----------
+        kind (str): RESEARCHER or PARTICIPANT
+        identifier (str): The account's email or the study subject's Ditti ID
+
+    Returns
+    -------
+        str: The cache key
+    """
+    return f"identity:{kind}:{identifier}"
+
+
+def get_cached_identity(kind, identifier):
+    """
+    Get a cached Account or StudySubject and attach it to the session.
+
+    The entry is attached without loading it from the database, so a cached
+    identity costs no SQL until an attribute that was not cached is read.
+
+    Parameters
+    ----------
+        kind (str): RESEARCHER or PARTICIPANT
+        identifier (str): The account's email or the study subject's Ditti ID
+
+    Returns
+    -------
+        Account, StudySubject or None: The entry or None if it is not cached
+    """
+    entry = cache.get(get_identity_key(kind, identifier))
+
+    if entry is None:
+        return None
+
+    try:
+        return db.session.merge(entry, load=False)
+    except Exception as e:
+        logger.warning(f"Discarding cached identity {identifier}: {e!s}")
+        invalidate_identity(kind, identifier)
+        return None
+
+
+def cache_identity(kind, identifier, entry):
+    """
+    Cache an Account or StudySubject for `IDENTITY_CACHE_TTL` seconds.
+
+    Parameters
+    ----------
+        kind (str): RESEARCHER or PARTICIPANT
+        identifier (str): The account's email or the study subject's Ditti ID
+        entry (Account or StudySubject): A clean entry loaded from the database
+    """
+    try:
+        cache.set(
+            get_identity_key(kind, identifier),
+            entry,
+            timeout=current_app.config["IDENTITY_CACHE_TTL"],
+        )
+    except Exception as e:
+        logger.warning(f"Failed to cache identity {identifier}: {e!s}")
+
+
+def invalidate_identity(kind, *identifiers):
+    """
+    Remove one or more identities from the cache.
+
+    Call this when an account or study subject is archived or edited.
+
+    Parameters
+    ----------
+        kind (str): RESEARCHER or PARTICIPANT
+        identifiers (str): The accounts' emails or study subjects' Ditti IDs
+    """
+    for identifier in identifiers:
+        if identifier:
+            cache.delete(get_identity_key(kind, identifier))
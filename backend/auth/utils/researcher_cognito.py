@@ -12,10 +12,11 @@
 
 import logging
 
-import boto3
 from botocore.exceptions import ClientError
 from flask import current_app
 
+from backend.utils.aws import registry
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,7 +29,7 @@ def get_researcher_cognito_client():
         boto3.client: Cognito IDP client configured for researcher operations
     """
     region = current_app.config["COGNITO_RESEARCHER_REGION"]
-    return boto3.client("cognito-idp", region_name=region)
+    return registry.get_client("cognito-idp", region_name=region)
 
 
 def create_researcher(email, temp_password=None, attributes=None):
@@ -14,17 +14,20 @@ import base64
 import hashlib
 import logging
 import os
-from functools import lru_cache
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
 
 import requests
+from jwt.algorithms import RSAAlgorithm
 
 logger = logging.getLogger(__name__)
 
 
-@lru_cache(maxsize=1)
 def get_cognito_jwks(jwks_url):
     """
-    Retrieve and cache the JSON Web Key Set (JWKS) from Cognito.
+    Retrieve the JSON Web Key Set (JWKS) from Cognito.
 
     Parameters
     ----------
@@ -45,6 +48,252 @@ def get_cognito_jwks(jwks_url):
         return None
 
 
+class JwksEntry(NamedTuple):
+    """The parsed public keys of one user pool and when they were fetched."""
+
+    keys: dict
+    fetched_at: float
+
+
+class JwksCache:
+    """
+    A cache of the parsed public keys of each Cognito user pool.
+
+    Keys are cached per JWKS URL, so the participant and researcher pools do
+    not evict each other, and are parsed once when they are fetched rather
+    than on every request. Once an entry is older than `ttl` it is refreshed
+    by the next request that reads it while other requests keep using the
+    stale keys. A token signed with an unknown key ID triggers an immediate
+    refresh, which picks up rotated keys, but no more than once every
+    `min_refresh_interval` seconds per pool. Only one request fetches a pool's
+    keys at a time, and if a fetch fails the stale keys are kept and
+    `fetch_failed` reports the failure, so that callers can tell an outage
+    from a token signed with an unknown key.
+
+    Vars
+    ----
+        ttl (float): seconds before an entry is refreshed
+        min_refresh_interval (float): the least number of seconds between
+            refreshes for an unknown key ID
+    """
+
+    ttl = 3600
+    min_refresh_interval = 30
+
+    def __init__(self):
+        self.entries = {}
+        self.failures = set()
+        self.locks = {}
+        self.locks_lock = threading.Lock()
+
+    def get_key(self, jwks_url, kid):
+        """
+        Get the public key that a token was signed with.
+
+        Parameters
+        ----------
+            jwks_url (str): The URL to the user pool's JWKS endpoint
+            kid (str): The key ID from the token's header
+
+        Returns
+        -------
+            RSAPublicKey: The public key or None if it could not be found
+        """
+        entry = self.entries.get(jwks_url)
+
+        if entry is None:
+            entry = self.refresh(jwks_url, None)
+        elif time.monotonic() - entry.fetched_at >= self.ttl:
+            # Serve the stale keys if another request is already refreshing
+            entry = self.refresh(jwks_url, entry, blocking=False)
+
+        if entry is None:
+            return None
+
+        key = entry.keys.get(kid)
+        if (
+            key is None
+            and time.monotonic() - entry.fetched_at >= self.min_refresh_interval
+        ):
+            entry = self.refresh(jwks_url, entry)
+            key = entry.keys.get(kid)
+
+        return key
+
+    def refresh(self, jwks_url, seen, blocking=True):
+        """
+        Fetch and parse a user pool's keys unless another request already did.
+
+        Parameters
+        ----------
+            jwks_url (str): The URL to the user pool's JWKS endpoint
+            seen (JwksEntry): The entry the caller found stale, or None
+            blocking (bool): Whether to wait for a refresh that is already in
+                progress rather than return `seen`
+
+        Returns
+        -------
+            JwksEntry: The current entry, which is `seen` if the refresh
+                failed, or None if no keys were ever fetched
+        """
+        with self.locks_lock:
+            lock = self.locks.setdefault(jwks_url, threading.Lock())
+
+        if not lock.acquire(blocking=blocking):
+            return seen
+
+        try:
+            entry = self.entries.get(jwks_url)
+            if entry is not seen:
+                # Another request refreshed the keys while this one waited
+                return entry
+
+            jwks = get_cognito_jwks(jwks_url)
+            if jwks is None:
+                self.failures.add(jwks_url)
+                if seen is not None:
+                    logger.warning(f"Using stale JWKS for {jwks_url}")
+                return seen
+
+            entry = JwksEntry(parse_jwks(jwks), time.monotonic())
+            self.entries[jwks_url] = entry
+            self.failures.discard(jwks_url)
+            return entry
+
+        finally:
+            lock.release()
+
+    def fetch_failed(self, jwks_url):
+        """
+        Check whether the latest fetch of a user pool's keys failed.
+
+        Parameters
+        ----------
+            jwks_url (str): The URL to the user pool's JWKS endpoint
+
+        Returns
+        -------
+            bool
+        """
+        return jwks_url in self.failures
+
+    def clear(self):
+        """Remove every cached entry."""
+        self.entries.clear()
+        self.failures.clear()
+
+
+def parse_jwks(jwks):
+    """
+    Parse the public keys of a JWKS.
+
+    Parameters
+    ----------
+        jwks (dict): The JWKS response
+
+    Returns
+    -------
+        dict: Maps each key ID to its public key. Keys that cannot be parsed
+            are skipped.
+    """
+    keys = {}
+    for jwk in jwks.get("keys", []):
+        try:
+            keys[jwk["kid"]] = RSAAlgorithm.from_jwk(jwk)
+        except Exception as e:
+            logger.error(f"Skipping invalid JWK {jwk.get('kid')}: {e!s}")
+
+    return keys
+
+
+class ClaimsCache:
+    """
+    A bounded LRU cache of the claims of verified ID tokens.
+
+    Tokens are cached by a hash of the token rather than the token itself,
+    and each entry expires at the token's `exp` claim. The least recently
+    used entry is evicted once the cache holds `maxsize` tokens.
+
+    Vars
+    ----
+        maxsize (int): the most tokens cached at once
+    """
+
+    maxsize = 4096
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_cache_key(namespace, token):
+        """
+        Get the key a token is cached under.
+
+        Parameters
+        ----------
+            namespace (str): The user pool the token was verified against
+            token (str): The encoded token
+
+        Returns
+        -------
+            tuple: (namespace, hash of the token)
+        """
+        return namespace, hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, namespace, token):
+        """
+        Get the verified claims of a token.
+
+        Parameters
+        ----------
+            namespace (str): The user pool the token was verified against
+            token (str): The encoded token
+
+        Returns
+        -------
+            dict: The claims or None if the token is not cached or expired
+        """
+        key = self.get_cache_key(namespace, token)
+        with self.lock:
+            claims = self.entries.get(key)
+            if claims is None:
+                return None
+
+            if claims.get("exp", 0) <= time.time():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return claims
+
+    def set(self, namespace, token, claims):
+        """
+        Cache the verified claims of a token until it expires.
+
+        Parameters
+        ----------
+            namespace (str): The user pool the token was verified against
+            token (str): The encoded token
+            claims (dict): The verified claims
+        """
+        key = self.get_cache_key(namespace, token)
+        with self.lock:
+            self.entries[key] = claims
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self.lock:
+            self.entries.clear()
+
+
+jwks_cache = JwksCache()
+claims_cache = ClaimsCache()
+
+
 def generate_code_verifier(length: int = 128) -> str:
     """
     Generate a high-entropy cryptographic random string for PKCE.
@@ -32,6 +32,7 @@ from backend.models import (
     init_lambda_task,
     init_study_subject,
 )
+from backend.utils.tap_sync import sync_taps
 
 
 @click.command("init-admin-app")
@@ -155,6 +156,24 @@ def clear_cache_click():
     cache.clear()
 
 
+@click.command(
+    "sync-taps", help="Copy new taps from DynamoDB to the local tap tables."
+)
+@click.option(
+    "--full", is_flag=True, help="Read every item instead of only new ones."
+)
+@with_appcontext
+def sync_taps_click(full):
+    """Copy new taps from DynamoDB to the local tap tables.
+
+    Parameters
+    ----------
+        full (bool): Whether to read every item instead of only new ones.
+    """
+    for table_key, copied in sync_taps(full=full).items():
+        click.echo(f"{table_key}: {copied} new items copied.")
+
+
 @click.command(
     "init-lambda-task", help="Initialize a lambda task with the specified status."
 )
@@ -11,6 +11,7 @@
 # under the License.
 
 import os
+import tempfile
 from typing import ClassVar
 
 
@@ -48,6 +49,41 @@ class Default:
     AWS_TABLENAME_AUDIO_TAP = os.getenv("AWS_TABLENAME_AUDIO_TAP")
     AWS_AUDIO_FILE_BUCKET = os.getenv("AWS_AUDIO_FILE_BUCKET")
 
+    # Optional global secondary index on the User table's user_permission_id
+    AWS_USER_PERMISSION_ID_INDEX = os.getenv("AWS_USER_PERMISSION_ID_INDEX")
+
+    # Number of parallel segments used for full scans of large DynamoDB tables
+    DYNAMODB_SCAN_SEGMENTS = int(os.getenv("DYNAMODB_SCAN_SEGMENTS", "4"))
+
+    # Serve taps from the local copies kept up to date by the sync-taps command
+    # instead of scanning DynamoDB. Nothing runs the sync automatically, so
+    # `flask sync-taps` must be scheduled (e.g., every few minutes with cron, or
+    # backend.utils.tap_sync.handle_sync_event with a scheduled Lambda event),
+    # with an occasional `flask sync-taps --full` to copy items that have no
+    # createdAt timestamp
+    LOCAL_TAPS = os.getenv("LOCAL_TAPS", "false").lower() == "true"
+
+    # Seconds that each study's users are cached for by the user directory
+    USER_DIRECTORY_TTL = int(os.getenv("USER_DIRECTORY_TTL", "300"))
+
+    # Seconds that authenticated accounts and study subjects are cached for
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", "60"))
+
+    # Seconds that compiled permission sets are held in memory for, even if
+    # no permission change is seen
+    PERMISSION_SET_TTL = int(os.getenv("PERMISSION_SET_TTL", "30"))
+
+    # Flask-Caching is shared by every process through files in CACHE_DIR, or
+    # through Redis if CACHE_TYPE is "RedisCache"
+    CACHE_TYPE = os.getenv("CACHE_TYPE", "FileSystemCache")
+    CACHE_DIR = os.getenv(
+        "CACHE_DIR", os.path.join(tempfile.gettempdir(), "ditti-cache")
+    )
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+    CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "ditti:")
+    CACHE_DEFAULT_TIMEOUT = int(os.getenv("CACHE_DEFAULT_TIMEOUT", "7200"))
+    CACHE_THRESHOLD = int(os.getenv("CACHE_THRESHOLD", "10000"))
+
     COGNITO_PARTICIPANT_CLIENT_ID = os.environ.get(
         "COGNITO_PARTICIPANT_CLIENT_ID"
     )
@@ -95,6 +131,12 @@ class Default:
     # Configuration for invoking a lambda function locally
     LOCAL_LAMBDA_ENDPOINT = os.environ.get("LOCAL_LAMBDA_ENDPOINT")
 
+    # Background export configuration. Exports run in a local thread pool
+    # ("thread") or in an asynchronous invocation of this function ("lambda")
+    AWS_EXPORT_BUCKET = os.getenv("AWS_EXPORT_BUCKET")
+    EXPORT_TASK_RUNNER = os.getenv("EXPORT_TASK_RUNNER", "thread")
+    EXPORT_FUNCTION_NAME = os.getenv("AWS_LAMBDA_FUNCTION_NAME")
+
 
 class Staging(Default):
     """
@@ -107,6 +149,13 @@ class Staging(Default):
     ENV = "production"
     DEBUG = False
 
+    EXPORT_TASK_RUNNER = os.getenv("EXPORT_TASK_RUNNER", "lambda")
+
+    # Lambda containers do not share a filesystem, so set CACHE_REDIS_URL to
+    # share the cache between them. Without it, each container falls back to
+    # its own filesystem cache and a warning is logged at startup
+    CACHE_TYPE = "RedisCache"
+
     CORS_ALLOW_HEADERS: ClassVar[list[str]] = [
         "Content-Type",
         "X-Amz-Date",
@@ -127,6 +176,13 @@ class Production(Default):
     ENV = "production"
     DEBUG = False
 
+    EXPORT_TASK_RUNNER = os.getenv("EXPORT_TASK_RUNNER", "lambda")
+
+    # Lambda containers do not share a filesystem, so set CACHE_REDIS_URL to
+    # share the cache between them. Without it, each container falls back to
+    # its own filesystem cache and a warning is logged at startup
+    CACHE_TYPE = "RedisCache"
+
     CORS_ALLOW_HEADERS: ClassVar[list[str]] = [
         "Content-Type",
         "X-Amz-Date",
@@ -178,6 +234,9 @@ class Testing(Default):
     ENV = "testing"
     TESTING = True
 
+    # Each test app gets its own empty cache
+    CACHE_TYPE = "SimpleCache"
+
     CORS_ORIGINS = "http://localhost:3000"
 
     TM_FSTRING = "{api_name}-tokens-testing"
@@ -22,6 +22,12 @@ from sqlalchemy.orm import validates
 from sqlalchemy.sql.schema import UniqueConstraint
 
 from backend.extensions import db
+from backend.utils.permissions import (
+    get_permission_set,
+    has_permission,
+    invalidate_account_permissions,
+    invalidate_all_permissions,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -119,6 +125,7 @@ def init_admin_group():
     db.session.add(access_group)
     db.session.add(join)
     db.session.commit()
+    invalidate_all_permissions()
 
     return access_group
 
@@ -181,6 +188,7 @@ def init_admin_account(email=None):
 
     db.session.add(admin)
     db.session.commit()
+    invalidate_account_permissions(admin.id)
 
     return admin
 
@@ -967,6 +975,81 @@ class Account(db.Model):
 
         return permissions
 
+    def compile_permissions(self, app_id, study_id=None):
+        """
+        Compile an account's permissions for an app and study into a set.
+
+        Retrieves the same permissions as `get_permissions`, but as the
+        (action, resource) definition of each permission, using one query.
+
+        Parameters
+        ----------
+        app_id : int
+            The app's primary key.
+        study_id : int, optional
+            The study's primary key.
+
+        Returns
+        -------
+        frozenset of (str, str)
+        """
+        # the permissions granted by access groups that grant access to the app
+        permission_ids = (
+            select(JoinAccessGroupPermission.permission_id)
+            .join(AccessGroup)
+            .join(JoinAccountAccessGroup)
+            .where(
+                (AccessGroup.app_id == app_id)
+                & (~AccessGroup.is_archived)
+                & (JoinAccountAccessGroup.account_id == self.id)
+            )
+        )
+
+        # and the permissions granted by the account's role in the study
+        if study_id:
+            permission_ids = permission_ids.union(
+                select(JoinRolePermission.permission_id)
+                .join(Role)
+                .join(JoinAccountStudy, Role.id == JoinAccountStudy.role_id)
+                .join(Study)
+                .where(
+                    (JoinAccountStudy.primary_key == tuple_(self.id, study_id))
+                    & (~Study.is_archived)
+                )
+            )
+
+        query = (
+            select(Action.value, Resource.value)
+            .select_from(Permission)
+            .join(Action, Action.id == Permission._action_id)
+            .join(Resource, Resource.id == Permission._resource_id)
+            .where(Permission.id.in_(permission_ids))
+        )
+
+        return frozenset(tuple(row) for row in db.session.execute(query))
+
+    def get_permission_set(self, app_id, study_id=None):
+        """
+        Get an account's compiled permissions for an app and study.
+
+        Compiled permissions are held in memory until the account's access
+        groups or study roles change, or until any access group, role or study
+        changes.
+
+        Parameters
+        ----------
+        app_id : int
+            The app's primary key.
+        study_id : int, optional
+            The study's primary key.
+
+        Returns
+        -------
+        frozenset of (str, str)
+            The (action, resource) definition of each permission.
+        """
+        return get_permission_set(self, app_id, study_id)
+
     def validate_ask(self, action, resource, permissions):
         """
         Validate a request using a set of permissions.
@@ -976,12 +1059,19 @@ class Account(db.Model):
         action: str
         resource: str
         permissions:
+            A query from `get_permissions` or a set from `get_permission_set`.
 
         Raises
         ------
         ValueError
             If the account has no permissions that satisfy the request.
         """
+        if isinstance(permissions, frozenset):
+            if not has_permission(permissions, action, resource):
+                raise ValueError("Unauthorized Ask")
+
+            return
+
         # build a query using the requested action and resource
         query = Permission.definition == tuple_(action, resource)
 
@@ -1696,6 +1786,15 @@ class StudySubject(db.Model):
     """
 
     __tablename__ = "study_subject"
+    __table_args__ = (
+        # Serves "ditti_id LIKE 'prefix%'" lookups of a study's subjects
+        db.Index(
+            "idx_study_subject_ditti_id_pattern",
+            "ditti_id",
+            postgresql_ops={"ditti_id": "text_pattern_ops"},
+        ),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     created_on = db.Column(db.DateTime, default=func.now(), nullable=False)
     ditti_id = db.Column(db.String, nullable=False, unique=True)
@@ -2292,3 +2391,194 @@ class LambdaTask(db.Model):
 
     def __repr__(self):
         return f"<LambdaTask {self.id}>"
+
+
+class ExportTask(db.Model):
+    """
+    The export_task table mapping class.
+
+    A background export of a study's Fitbit data to S3, created by
+    `backend.utils.export_task`.
+
+    Vars
+    ----
+    id: sqlalchemy.Column
+    status: sqlalchemy.Column
+        The status of the task ("Pending", "InProgress", "Success", "Failed").
+    study_id: sqlalchemy.Column
+        The primary key of the study being exported.
+    account_id: sqlalchemy.Column
+        The primary key of the account that requested the export.
+    format: sqlalchemy.Column
+        The file format of the export, e.g., "csv".
+    rows_done: sqlalchemy.Column
+        The number of rows exported so far.
+    rows_total: sqlalchemy.Column
+        The number of rows to export, or None until they are counted.
+    created_on: sqlalchemy.Column
+    updated_on: sqlalchemy.Column
+    completed_on: sqlalchemy.Column
+        The datetime when the task was completed.
+    file_key: sqlalchemy.Column
+        The S3 key of the exported file.
+    error_code: sqlalchemy.Column
+        Error code if any.
+    study: sqlalchemy.orm.relationship
+    """
+
+    __tablename__ = "export_task"
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(
+        db.Enum(
+            "Pending",
+            "InProgress",
+            "Success",
+            "Failed",
+            "CompletedWithErrors",
+            name="taskstatustypeenum",
+        ),
+        nullable=False,
+    )
+    study_id = db.Column(
+        db.Integer, db.ForeignKey("study.id", ondelete="CASCADE"), nullable=False
+    )
+    account_id = db.Column(
+        db.Integer,
+        db.ForeignKey("account.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    format = db.Column(db.String, nullable=False)
+    rows_done = db.Column(db.Integer, default=0, nullable=False)
+    rows_total = db.Column(db.Integer, nullable=True)
+    created_on = db.Column(
+        db.DateTime, default=func.now(), nullable=False, index=True
+    )
+    updated_on = db.Column(
+        db.DateTime, default=func.now(), onupdate=func.now(), nullable=False
+    )
+    completed_on = db.Column(db.DateTime, nullable=True)
+    file_key = db.Column(db.String, nullable=True)
+    error_code = db.Column(db.String, nullable=True)
+
+    study = db.relationship("Study")
+
+    @property
+    def meta(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "studyId": self.study_id,
+            "format": self.format,
+            "rowsDone": self.rows_done,
+            "rowsTotal": self.rows_total,
+            "createdOn": self.created_on.isoformat(),
+            "updatedOn": self.updated_on.isoformat(),
+            "completedOn": self.completed_on.isoformat()
+            if self.completed_on
+            else None,
+            "errorCode": self.error_code,
+        }
+
+    def __repr__(self):
+        return f"<ExportTask {self.id}>"
+
+
+class Tap(db.Model):
+    """
+    The tap table mapping class.
+
+    A local copy of the DynamoDB Tap table, kept up to date by
+    `backend.utils.tap_sync`.
+
+    Vars
+    ----
+    id: sqlalchemy.Column
+        The ID of the item on DynamoDB.
+    user_id: sqlalchemy.Column
+        The DynamoDB ID of the user who tapped.
+    time: sqlalchemy.Column
+        The ISO 8601 timestamp of the tap.
+    timezone: sqlalchemy.Column
+        The name of the user's timezone (nullable for old versions of the app).
+    created_at: sqlalchemy.Column
+        The ISO 8601 timestamp of when the item was created on DynamoDB.
+    """
+
+    __tablename__ = "tap"
+    __table_args__ = (db.Index("idx_tap_user_id_time", "user_id", "time"),)
+
+    id = db.Column(db.String, primary_key=True)
+    user_id = db.Column(db.String, nullable=False)
+    time = db.Column(db.String, nullable=True)
+    timezone = db.Column(db.String, nullable=True)
+    created_at = db.Column(db.String, nullable=True)
+
+    def __repr__(self):
+        return f"<Tap {self.id}>"
+
+
+class AudioTap(db.Model):
+    """
+    The audio_tap table mapping class.
+
+    A local copy of the DynamoDB AudioTap table, kept up to date by
+    `backend.utils.tap_sync`.
+
+    Vars
+    ----
+    id: sqlalchemy.Column
+        The ID of the item on DynamoDB.
+    user_id: sqlalchemy.Column
+        The DynamoDB ID of the user who tapped.
+    audio_file_id: sqlalchemy.Column
+        The DynamoDB ID of the audio file that was tapped.
+    time: sqlalchemy.Column
+        The ISO 8601 timestamp of the tap.
+    timezone: sqlalchemy.Column
+        The name of the user's timezone.
+    action: sqlalchemy.Column
+        The action taken on the audio file.
+    created_at: sqlalchemy.Column
+        The ISO 8601 timestamp of when the item was created on DynamoDB.
+    """
+
+    __tablename__ = "audio_tap"
+    __table_args__ = (db.Index("idx_audio_tap_user_id_time", "user_id", "time"),)
+
+    id = db.Column(db.String, primary_key=True)
+    user_id = db.Column(db.String, nullable=False)
+    audio_file_id = db.Column(db.String, nullable=True)
+    time = db.Column(db.String, nullable=True)
+    timezone = db.Column(db.String, nullable=True)
+    action = db.Column(db.String, nullable=True)
+    created_at = db.Column(db.String, nullable=True)
+
+    def __repr__(self):
+        return f"<AudioTap {self.id}>"
+
+
+class SyncCheckpoint(db.Model):
+    """
+    The sync_checkpoint table mapping class.
+
+    Records how far each DynamoDB table has been copied to its local table.
+
+    Vars
+    ----
+    table_key: sqlalchemy.Column
+        The short name of the DynamoDB table (Tap, AudioTap, etc.).
+    high_water_mark: sqlalchemy.Column
+        The latest `createdAt` timestamp of any item that has been copied.
+    synced_on: sqlalchemy.Column
+        The datetime of the last successful sync.
+    """
+
+    __tablename__ = "sync_checkpoint"
+
+    table_key = db.Column(db.String, primary_key=True)
+    high_water_mark = db.Column(db.String, nullable=True)
+    synced_on = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<SyncCheckpoint {self.table_key}>"
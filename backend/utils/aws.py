@@ -10,31 +10,58 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
 import json
 import os
+import queue
 import re
-from functools import reduce
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, reduce
+from typing import Any, ClassVar, NamedTuple
 
 import boto3
 import requests
 from boto3.dynamodb.conditions import Attr
+from botocore.config import Config
 from requests_aws4auth import AWS4Auth
 
 
+class MutationResult(NamedTuple):
+    """The outcome of creating a single item with a batched mutation."""
+
+    item: dict
+    id: str | None
+    error: str | None
+
+
 class MutationClient:
     """
     The client that makes mutation requests to AWS AppSync.
 
+    Every client shares a single signed HTTP session, so that connections to
+    AppSync are reused across clients and requests.
+
     Vars
     ----
     f_string: str
         used for formatting the mutation request body
-    headers: dict
-        used to validate the mutation request
+    chunk_size: int
+        the most items created by a single mutation document
+    max_workers: int
+        the most mutation documents posted at once
     """
 
     f_string = "mutation($in:%(inp)s!){%(fun)s(input:$in){%(var)s}}"
 
+    chunk_size = 25
+    max_workers = 8
+
+    session = None
+    session_lock = threading.Lock()
+    executor = None
+    executor_lock = threading.Lock()
+
     def __init__(self):
         self.__body = None
         self.__conn = None
@@ -62,14 +89,54 @@ class MutationClient:
         return self.__conn
 
     def open_connection(self):
-        """Initialize an HTTP connection to AppSync."""
-        self.__conn = requests.Session()
-        self.__conn.auth = AWS4Auth(
-            os.getenv("APPSYNC_ACCESS_KEY"),
-            os.getenv("APPSYNC_SECRET_KEY"),
-            "us-east-1",
-            "appsync",
-        )
+        """Use the HTTP session to AppSync that is shared by every client."""
+        self.__conn = self.get_session()
+
+    @classmethod
+    def get_session(cls):
+        """
+        Get the signed HTTP session to AppSync, creating it on first use.
+
+        Returns
+        -------
+        requests.Session
+        """
+        with cls.session_lock:
+            if cls.session is None:
+                session = requests.Session()
+                session.auth = AWS4Auth(
+                    os.getenv("APPSYNC_ACCESS_KEY"),
+                    os.getenv("APPSYNC_SECRET_KEY"),
+                    "us-east-1",
+                    "appsync",
+                )
+
+                # keep a connection open for each concurrent request
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_maxsize=cls.max_workers
+                )
+                session.mount("https://", adapter)
+                cls.session = session
+
+        return cls.session
+
+    @classmethod
+    def get_executor(cls):
+        """
+        Get the thread pool that mutation documents are posted on.
+
+        Returns
+        -------
+        concurrent.futures.ThreadPoolExecutor
+        """
+        with cls.executor_lock:
+            if cls.executor is None:
+                cls.executor = ThreadPoolExecutor(
+                    max_workers=cls.max_workers,
+                    thread_name_prefix="appsync-mutation",
+                )
+
+        return cls.executor
 
     def set_mutation(self, inp, fun, var):
         """
@@ -103,6 +170,26 @@ class MutationClient:
         items : dict
             Dictionary of items to include in the mutation.
         """
+        self.__body = self.build_mutation_v2(items)
+
+    @classmethod
+    def build_mutation_v2(cls, items):
+        """
+        Build a mutation that creates each of a list of audio files.
+
+        The operation that creates the nth item (counting from 1) is aliased
+        `CreateAudioFileOperation{n}`.
+
+        Parameters
+        ----------
+        items : list of dict
+            The audio files to create.
+
+        Returns
+        -------
+        dict
+            The mutation request body.
+        """
         # Declare variables in the query
         query = "mutation (\n"
         variables = {}
@@ -161,7 +248,7 @@ class MutationClient:
         # Close the mutation block
         query += "\n}"
 
-        self.__body = {"query": query, "variables": variables}
+        return {"query": query, "variables": variables}
 
     def post_mutation(self):
         """
@@ -188,6 +275,100 @@ class MutationClient:
 
         return res.text
 
+    def post_mutations_v2(self, items, chunk_size=None):
+        """
+        Create a list of audio files, posting several mutations at once.
+
+        Items are split into chunks of at most `chunk_size` items, each of which
+        is created by its own mutation document, so that no document exceeds
+        AppSync's request size limit and a slow chunk does not hold up the
+        others. A chunk that fails does not stop the others from being posted.
+
+        Args
+        ----
+        items: list of dict
+            The audio files to create
+        chunk_size: int (optional)
+            The most items to create in a single mutation, default `chunk_size`
+
+        Returns
+        -------
+        list of MutationResult
+            The outcome of creating each item, in the order they were given
+
+        Raises
+        ------
+        ValueError
+            if chunk_size is less than 1
+        """
+        if chunk_size is None:
+            chunk_size = self.chunk_size
+
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+
+        if self.__conn is None:
+            self.open_connection()
+
+        chunks = [
+            items[i : i + chunk_size] for i in range(0, len(items), chunk_size)
+        ]
+
+        executor = self.get_executor()
+        futures = [executor.submit(self.post_chunk_v2, chunk) for chunk in chunks]
+
+        results = []
+        for future in futures:
+            results.extend(future.result())
+
+        return results
+
+    def post_chunk_v2(self, items):
+        """
+        Create a chunk of audio files with a single mutation.
+
+        Args
+        ----
+        items: list of dict
+            The audio files to create
+
+        Returns
+        -------
+        list of MutationResult
+            The outcome of creating each item, in the order they were given
+        """
+        body = self.build_mutation_v2(items)
+
+        try:
+            res = self.__conn.request(
+                "POST", os.getenv("APP_SYNC_HOST"), json=body
+            )
+            res.raise_for_status()
+            data = res.json()
+
+        except Exception as e:
+            return [MutationResult(item, None, str(e)) for item in items]
+
+        # map each error to the operation it was raised by, if any
+        errors = {}
+        for error in data.get("errors") or []:
+            path = error.get("path") or [None]
+            errors.setdefault(path[0], error.get("message"))
+
+        created = data.get("data") or {}
+        results = []
+        for index, item in enumerate(items, start=1):
+            alias = f"CreateAudioFileOperation{index}"
+            if created.get(alias):
+                results.append(MutationResult(item, created[alias]["id"], None))
+            else:
+                error = (
+                    errors.get(alias) or errors.get(None) or "Item not created"
+                )
+                results.append(MutationResult(item, None, error))
+
+        return results
+
 
 class Connection:
     """A connection with an AWS resource."""
@@ -212,6 +393,142 @@ class Connection:
         return self.__session
 
 
+class ResourceRegistry:
+    """
+    A process-wide registry of boto3 clients, resources and DynamoDB tables.
+
+    Creating a boto3 client or resource loads the service model and opens a new
+    HTTP connection pool, so clients, resources and the Table objects built
+    from them are created once and reused. boto3 clients are thread-safe and
+    are shared by every thread. boto3 resources are not, so each thread is
+    given its own resource and tables, which are created on first use by that
+    thread.
+
+    Vars
+    ----
+    client_config: dict
+        the botocore config options of every client and resource, which can be
+        overridden for each client
+    constructions: int
+        the number of clients and resources created by this registry
+    """
+
+    client_config: ClassVar[dict] = {
+        "max_pool_connections": 25,
+        "retries": {"mode": "standard", "max_attempts": 5},
+    }
+
+    def __init__(self):
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__generation = 0
+        self.__clients = {}
+        self.constructions = 0
+
+    def __get_cache(self):
+        # Reset this thread's cache if the registry was cleared since last use
+        if getattr(self.__local, "generation", None) != self.__generation:
+            self.__local.generation = self.__generation
+            self.__local.resources = {}
+            self.__local.tables = {}
+
+        return self.__local
+
+    def get_client(self, service, region_name=None, **config):
+        """
+        Get the shared client for a given service, region and config.
+
+        Args
+        ----
+        service: str
+            the name of the service, e.g., "s3"
+        region_name: str (optional)
+            the region of the client, default the default region
+        config: dict (optional)
+            botocore config options that override `client_config`
+
+        Returns
+        -------
+        boto3.client
+        """
+        options = {**self.client_config, **config}
+        key = service, region_name, json.dumps(options, sort_keys=True)
+
+        client = self.__clients.get(key)
+        if client is None:
+            # The default boto3 session is not safe to create clients from
+            # concurrently
+            with self.__lock:
+                client = self.__clients.get(key)
+                if client is None:
+                    # botocore rewrites the retries options in place
+                    client = boto3.client(
+                        service,
+                        region_name=region_name,
+                        config=Config(**copy.deepcopy(options)),
+                    )
+                    self.__clients[key] = client
+                    self.constructions += 1
+
+        return client
+
+    def get_resource(self, service="dynamodb"):
+        """
+        Get this thread's resource for a given service.
+
+        Args
+        ----
+        service: str (optional)
+            the name of the service, default "dynamodb"
+
+        Returns
+        -------
+        boto3.resource
+        """
+        cache = self.__get_cache()
+        if service not in cache.resources:
+            # The default boto3 session is not safe to create resources from
+            # concurrently
+            with self.__lock:
+                cache.resources[service] = boto3.resource(
+                    service, config=Config(**copy.deepcopy(self.client_config))
+                )
+                self.constructions += 1
+
+        return cache.resources[service]
+
+    def get_table(self, tablename):
+        """
+        Get this thread's Table object for a given DynamoDB table.
+
+        Args
+        ----
+        tablename: str
+            the full name of the table as it appears on dynamodb
+
+        Returns
+        -------
+        DynamoDB.Table
+        """
+        cache = self.__get_cache()
+        if tablename not in cache.tables:
+            cache.tables[tablename] = self.get_resource("dynamodb").Table(
+                tablename
+            )
+
+        return cache.tables[tablename]
+
+    def clear(self):
+        """Discard all clients, resources and tables held by the registry."""
+        with self.__lock:
+            self.__generation += 1
+            self.__clients = {}
+            self.constructions = 0
+
+
+registry = ResourceRegistry()
+
+
 class Loader:
     """
     Loads a dynamodb table.
@@ -223,6 +540,7 @@ class Loader:
 
     def __init__(self, tablekey):
         self.__tablekey = tablekey
+        self.__session = None
         self.__table = None
         self.config = {
             "User": os.getenv("AWS_TABLENAME_USER"),
@@ -251,9 +569,17 @@ class Loader:
         self.__session = connection.session
 
     def load_table(self):
-        """Load the table."""
+        """
+        Load the table.
+
+        If no connection was made, the table is loaded from the process-wide
+        resource registry.
+        """
         tablename = self.get_tablename(self.__tablekey)
-        self.__table = self.__session.Table(tablename)
+        if self.__session is None:
+            self.__table = registry.get_table(tablename)
+        else:
+            self.__table = self.__session.Table(tablename)
 
     @property
     def table(self):
@@ -276,7 +602,7 @@ class Updater:
         self.__update_expression = None
         self.__expression_attribute_values = None
 
-    def set_key_from_query(self, q, pk="id"):
+    def set_key_from_query(self, q, pk="id", params=None):
         """
         Set the primary key of the item to update.
 
@@ -289,11 +615,27 @@ class Updater:
             The query to make
         pk: str (optional)
             The name of the table"s primary key, default "id"
+        params: dict (optional)
+            The values of any named parameters in the query
         """
-        res = Query(self.tablekey, q).scan()
+        res = Query(self.tablekey, q, params=params).scan()
         key = res["Items"][0][pk]
         self.__key = {pk: key}
 
+    def set_key(self, key):
+        """
+        Set the primary key of the item to update.
+
+        Use this instead of `set_key_from_query` when the key is already known,
+        e.g., from an earlier lookup, to avoid scanning the table.
+
+        Args
+        ----
+        key: dict
+            The primary key of the item, e.g., {"id": "..."}
+        """
+        self.__key = key
+
     def get_key(self):
         """
         Get the primary key for DynamoDB operations.
@@ -365,10 +707,7 @@ class Updater:
         if not (self.tablekey and self.__key):
             raise ValueError("tablekey and key must be set")
 
-        connection = Connection()
-        connection.open_connection("dynamodb")
         loader = Loader(self.tablekey)
-        loader.connect(connection)
         loader.load_table()
         res = loader.table.update_item(
             Key=self.__key,
@@ -536,6 +875,7 @@ class Scanner:
     def __init__(self, tablekey):
         self.__loader = Loader(tablekey)
         self.__filter = None
+        self.__projection = None
 
     def query(self, expression):
         """
@@ -552,6 +892,49 @@ class Scanner:
         self.__filter = expression
         return self
 
+    def project(self, attributes):
+        """
+        Set the attributes to return for each item.
+
+        Args
+        ----
+        attributes: list of str
+            The names of the attributes to return. If None, all attributes are
+            returned
+
+        Returns
+        -------
+        self
+        """
+        self.__projection = attributes
+        return self
+
+    @classmethod
+    def build_projection(cls, attributes):
+        """
+        Build a projection expression for a set of attribute names.
+
+        Each attribute name is replaced with a placeholder so that names that
+        are reserved words in DynamoDB (e.g., time, action) can be projected.
+
+        Args
+        ----
+        attributes: list of str
+
+        Returns
+        -------
+        dict
+            {
+                ProjectionExpression: str,
+                ExpressionAttributeNames: dict
+            }
+        """
+        names = {f"#p{i}": attribute for i, attribute in enumerate(attributes)}
+        return {
+            "ProjectionExpression": ", ".join(names.keys()),
+            "ExpressionAttributeNames": names,
+        }
+
     def scan(self, connection=None, **kwargs):
         """
         Scan the table.
@@ -559,6 +942,8 @@ class Scanner:
         Args
         ----
         connection: Connection (optional)
+            If None, the table is loaded from the process-wide resource
+            registry
         kwargs
             optional arguments to pass to DynamoDB.Table.Scan
 
@@ -574,17 +959,41 @@ class Scanner:
         if self.__filter is not None:
             kwargs.update({"FilterExpression": self.__filter})
 
-        if connection is None:
-            connection = Connection()
-            connection.open_connection("dynamodb")
+        # if a projection was set
+        if self.__projection:
+            kwargs.update(self.build_projection(self.__projection))
+
+        if connection is not None:
+            self.__loader.connect(connection)
 
-        self.__loader.connect(connection)
         self.__loader.load_table()
         result = self.__loader.table.scan(**kwargs)
 
         return result
 
 
+class Parameter(NamedTuple):
+    """A named placeholder for a value that is bound when a query is built."""
+
+    name: str
+
+
+class Condition(NamedTuple):
+    """A single comparison in a parsed query, e.g., `foo=="bar"`."""
+
+    key: str
+    conditional: str
+    values: tuple
+
+
+class Combination(NamedTuple):
+    """Two parsed subexpressions joined by AND or OR."""
+
+    comparitor: str
+    left: Any
+    right: Any
+
+
 class Query:
     """
     Handle queries against a dynamodb table.
@@ -609,45 +1018,73 @@ class Query:
             ~~ - will return results that are true
             ~ - will return results that are false
         Expressions are evaluated by paranthetical sub-expressions first, then
-        from left to right. Expressions can only contain these characters:
-            a-zA-Z0-9_-=":.<>()~!
+        from left to right. Values can be replaced with named parameters, e.g.,
+        "fooBEGINS$prefix", which are bound to `params` when the query is built.
+        Expressions can only contain these characters:
+            a-zA-Z0-9_-=":.<>()~!$
+    projection: list of str (optional)
+        The names of the attributes to return for each item. If None, all
+        attributes are returned
+    params: dict (optional)
+        The values of any named parameters in the query. If a parameter's value
+        is a list, its condition is repeated for each value and the results are
+        combined with OR, e.g., "fooBEGINS$prefixes" with
+        {"prefixes": ["a", "b"]} is equivalent to "fooBEGINS"a"ORfooBEGINS"b""
+    include_deleted: bool (optional)
+        Whether to also return items that are marked as deleted, default False
 
     Vars
     ----
     invalid_chars: str
         a regex string for identifying invalid chatacters
-    blocks: str
-        a regex string for extracting paranthetical blocks
+    tokens: re.Pattern
+        a regex for reading the next token of a query
     conditionals: str
-        a regex string for identifying conditionals
+        a regex string for identifying conditionals that follow a key
     comparitors: str
         a regex string for identifying comparitors
-    values: str
-        a regex string for values
-    keys: str
-        a regex string for keys
+    max_workers: int
+        the number of threads that parallel scans are run on
     """
 
-    invalid_chars = r"[^\w|\d|=|\"|\-|:|\.|<|>|(|)|~|!]"
-    blocks = r"((?<=\()[\w\d=<>\"\-:.$~!]+(?=\)))"
-    conditionals = r"(==|!=|<=|>=|<<|>>|BETWEEN|BEGINS|CONTAINS|~~|~)"
+    invalid_chars = r"[^\w|\d|=|\"|\-|:|\.|<|>|(|)|~|!|$]"
+    tokens = re.compile(
+        r"(?P<open>\()"
+        r"|(?P<close>\))"
+        r'|"(?P<value>[^"]*)"'
+        r"|\$(?P<parameter>\w+)"
+        r"|(?P<conditional>==|!=|<=|>=|<<|>>|~~|~)"
+        r"|(?P<word>[a-zA-Z_]+)"
+    )
+    conditionals = r"([a-zA-Z_]+?)(BETWEEN|BEGINS|CONTAINS)?"
     comparitors = r"(AND|OR)"
-    values = r"((?<=\")[\w\d\-:.]+(?=\"))"
-    keys = r"[a-zA-Z_]+(?=\")"
 
-    def __init__(self, key, query=None):
+    max_workers = 16
+    executor = None
+    executor_lock = threading.Lock()
+
+    def __init__(
+        self, key, query=None, projection=None, params=None, include_deleted=False
+    ):
         if query is not None:
             self.check_query(query)
 
-        self.expression = self.build_query(query)
+        self.expression = self.build_query(query, params, include_deleted)
         self.key = key
+        self.projection = projection
 
-    def scan(self, **kwargs):
+    def scan(self, segments=1, **kwargs):
         """
         Run the query.
 
+        When more than one segment is requested, the table is read with a
+        parallel scan: each segment is paged through on its own thread and the
+        results are merged once every segment is exhausted.
+
         Args
         ----
+        segments: int (optional)
+            The number of segments to split the scan into, default 1
         kwargs
             Optional arguments for DynamoDB.Table.scan
 
@@ -658,25 +1095,205 @@ class Query:
                 Items: the items returned by the scan,
                 ConsumedCapacity: the number of read units consumed by the scan
             }
-        """
-        scanner = Scanner(self.key).query(self.expression)
-        res = scanner.scan(ReturnConsumedCapacity="TOTAL", **kwargs)
-        units = res["ConsumedCapacity"]["CapacityUnits"]
-        items = res["Items"]
 
-        # iteratively scan the entire table
-        while "LastEvaluatedKey" in res:
-            last = res["LastEvaluatedKey"]
-            res = scanner.scan(
-                ExclusiveStartKey=last, ReturnConsumedCapacity="TOTAL", **kwargs
-            )
+        Raises
+        ------
+        ValueError
+            if segments is less than 1
+        """
+        items = []
+        units = 0
 
+        for res in self.iter_pages(segments=segments, **kwargs):
             # tally the consumed read units
             units = units + res["ConsumedCapacity"]["CapacityUnits"]
             items.extend(res["Items"])
 
         return {"Items": items, "ConsumedCapacity": units}
 
+    def iter_items(self, segments=1, **kwargs):
+        """
+        Run the query, yielding items one at a time as pages are read.
+
+        Args
+        ----
+        segments: int (optional)
+            The number of segments to split the scan into, default 1
+        kwargs
+            Optional arguments for DynamoDB.Table.scan
+
+        Returns
+        -------
+        generator of dict
+            Each item returned by the scan
+
+        Raises
+        ------
+        ValueError
+            if segments is less than 1
+        """
+        pages = self.iter_pages(segments=segments, **kwargs)
+        return (item for res in pages for item in res["Items"])
+
+    def iter_pages(self, segments=1, **kwargs):
+        """
+        Run the query, yielding each page of results as it is read.
+
+        Only a bounded number of pages are held in memory at once. When more
+        than one segment is requested, segments are read in parallel and their
+        pages are yielded in the order they arrive.
+
+        Args
+        ----
+        segments: int (optional)
+            The number of segments to split the scan into, default 1
+        kwargs
+            Optional arguments for DynamoDB.Table.scan
+
+        Returns
+        -------
+        generator of dict
+            The return value of DynamoDB.Table.scan for each page
+
+        Raises
+        ------
+        ValueError
+            if segments is less than 1
+        """
+        # Validate before any generator is created, so that errors are raised
+        # here rather than when the first page is read
+        if segments < 1:
+            raise ValueError("segments must be a positive integer")
+
+        if segments == 1:
+            return self.iter_segment_pages(**kwargs)
+
+        return self.iter_parallel_pages(segments, **kwargs)
+
+    def iter_parallel_pages(self, segments, **kwargs):
+        """
+        Read the segments of a parallel scan, yielding pages as they arrive.
+
+        Each page is read by its own task on the shared scan pool, and the
+        next page of a segment is only requested once its previous page has
+        been taken by the consumer. Tasks never wait on the consumer, so a
+        consumer that reads slowly holds back its own scan but never occupies
+        the pool's threads, and at most one page per segment is held in memory.
+
+        Args
+        ----
+        segments: int
+            The number of segments to split the scan into
+        kwargs
+            Optional arguments for DynamoDB.Table.scan
+
+        Yields
+        ------
+        dict
+            The return value of DynamoDB.Table.scan for each page
+        """
+        pages = queue.Queue()
+        executor = self.get_executor()
+
+        def read_page(segment, start_key):
+            scan_kwargs = {
+                **kwargs,
+                "Segment": segment,
+                "TotalSegments": segments,
+            }
+            if start_key is not None:
+                scan_kwargs["ExclusiveStartKey"] = start_key
+
+            try:
+                pages.put((segment, self.scan_page(**scan_kwargs), None))
+            except Exception as e:
+                pages.put((segment, None, e))
+
+        for segment in range(segments):
+            executor.submit(read_page, segment, None)
+
+        remaining = segments
+        while remaining:
+            segment, res, error = pages.get()
+            if error is not None:
+                raise error
+
+            # Request the segment's next page before handing this one over
+            if "LastEvaluatedKey" in res:
+                executor.submit(read_page, segment, res["LastEvaluatedKey"])
+            else:
+                remaining -= 1
+
+            yield res
+
+    @classmethod
+    def get_executor(cls):
+        """
+        Get the thread pool that parallel scans are run on.
+
+        The pool is shared across requests so that its threads, and the
+        resources the registry holds for them, are reused between scans.
+
+        Returns
+        -------
+        concurrent.futures.ThreadPoolExecutor
+        """
+        with cls.executor_lock:
+            if cls.executor is None:
+                cls.executor = ThreadPoolExecutor(
+                    max_workers=cls.max_workers,
+                    thread_name_prefix="dynamodb-scan",
+                )
+
+        return cls.executor
+
+    def scan_page(self, **kwargs):
+        """
+        Read a single page of the table, or of one segment of it.
+
+        Args
+        ----
+        kwargs
+            Optional arguments for DynamoDB.Table.scan
+
+        Returns
+        -------
+        dict
+            The return value of DynamoDB.Table.scan
+        """
+        scanner = (
+            Scanner(self.key).query(self.expression).project(self.projection)
+        )
+        return scanner.scan(ReturnConsumedCapacity="TOTAL", **kwargs)
+
+    def iter_segment_pages(self, **kwargs):
+        """
+        Page through the table, or one segment of it, until it is exhausted.
+
+        Args
+        ----
+        kwargs
+            Optional arguments for DynamoDB.Table.scan, including `Segment` and
+            `TotalSegments` for reading a single segment of a parallel scan and
+            `ExclusiveStartKey` for resuming after a given item
+
+        Yields
+        ------
+        dict
+            The return value of DynamoDB.Table.scan for each page
+        """
+        scanner = (
+            Scanner(self.key).query(self.expression).project(self.projection)
+        )
+        res = scanner.scan(ReturnConsumedCapacity="TOTAL", **kwargs)
+        yield res
+
+        # iteratively scan the entire table
+        while "LastEvaluatedKey" in res:
+            kwargs["ExclusiveStartKey"] = res["LastEvaluatedKey"]
+            res = scanner.scan(ReturnConsumedCapacity="TOTAL", **kwargs)
+            yield res
+
     @classmethod
     def check_query(cls, query):
         """
@@ -708,12 +1325,47 @@ class Query:
         return True
 
     @classmethod
-    def build_query(cls, query):
+    def build_query(cls, query, params=None, include_deleted=False):
         """
         Build the query expression to pass to DynamoDB.Table.scan.
 
-        The resulting query returns only elements that have
-        not been deleted.
+        Unless `include_deleted` is set, the resulting query returns only
+        elements that have not been deleted. Queries without parameters are
+        compiled once and cached. Queries with parameters are parsed once and
+        cached, and their parameters are bound on each call.
+
+        Args
+        ----
+        query: str
+        params: dict (optional)
+        include_deleted: bool (optional)
+
+        Returns
+        -------
+        DynamoDB.conditions.Attr or None
+            None if deleted elements are included and there is no query
+        """
+        if include_deleted:
+            if query is None:
+                return None
+
+            return cls.compile(cls.parse(query), params)
+
+        if params is None:
+            return cls.compile_query(query)
+
+        # Build an expression to filter any deleted elements
+        deleted_exp = cls.compile_query(None)
+        if query is None:
+            return deleted_exp
+
+        return cls.compile(cls.parse(query), params) & deleted_exp
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def compile_query(cls, query):
+        """
+        Compile a query without parameters, caching the result.
 
         Args
         ----
@@ -728,177 +1380,323 @@ class Query:
         if query is None:
             return deleted_exp
 
-        # get paranthetical subexperssions
-        blocks = cls.build_blocks(query)
+        return cls.compile(cls.parse(query)) & deleted_exp
 
-        # build the expression
-        expression = cls.build_expression(blocks) & deleted_exp
+    @classmethod
+    def tokenize(cls, query):
+        """
+        Split a query into tokens in a single pass.
 
-        return expression
+        Keys are matched together with any conditional or comparitor that they
+        are written against, e.g., "ORfooBEGINS", so words are split here based
+        on whether a comparitor or a key is expected next.
+
+        Args
+        ----
+        query: str
+
+        Returns
+        -------
+        list of (str, str)
+            The kind and text of each token. Kinds are "open", "close",
+            "value", "parameter", "conditional", "comparitor", and "key"
+
+        Raises
+        ------
+        ValueError
+            if the query contains an unexpected string
+        """
+        tokens = []
+        pos = 0
+
+        while pos < len(query):
+            match = cls.tokens.match(query, pos)
+            if match is None:
+                raise ValueError(
+                    f"Query contains invalid string at position {pos}: "
+                    f"{query[pos:]}"
+                )
+
+            kind = match.lastgroup
+            text = match.group(kind)
+            pos = match.end()
+
+            if kind != "word":
+                tokens.append((kind, text))
+                continue
+
+            # A word that follows a value or closing parenthesis starts with a
+            # comparitor
+            if tokens and tokens[-1][0] in ("value", "parameter", "close"):
+                comparitor = re.match(cls.comparitors, text)
+                if comparitor is None:
+                    raise ValueError(
+                        f"Expected AND or OR at position {match.start()}: {text}"
+                    )
+
+                tokens.append(("comparitor", comparitor.group(0)))
+                text = text[comparitor.end() :]
+                if not text:
+                    continue
+
+            # The rest of the word is a key, possibly followed by a conditional
+            key, conditional = re.fullmatch(cls.conditionals, text).groups()
+            tokens.append(("key", key))
+            if conditional is not None:
+                tokens.append(("conditional", conditional))
+
+        return tokens
 
     @classmethod
-    def build_blocks(cls, query, blocks=None):
+    @lru_cache(maxsize=256)
+    def parse(cls, query):
         """
-        Extract paranthentical subexpressions from a given query.
+        Parse a query into a tree of conditions, caching the result.
 
-        The expression is a list of subexpressions sorted in the order of
-        evaluation. Nested subexpressions are replaced with "$X" in following
-        subexpressions, where X is the index of the nested subexpression.
-        For example, the expression
-        (a=="a"ORa=="b")AND(b=="a"AND(b=="b"ORb=="c"))
+        For example, the query
+        (a=="a"ORa=="b")ANDb=="c"
         will return
-        ["a=="a"ORa=="b"", "b=="b"ORb=="c"", "b=="a"AND$1", "$0AND$2"]
+        Combination("AND",
+            Combination("OR",
+                Condition("a", "==", ("a",)),
+                Condition("a", "==", ("b",))),
+            Condition("b", "==", ("c",)))
 
         Args
         ----
         query: str
-        blocks: list of str
 
         Returns
         -------
-        list of str
+        Condition or Combination
+
+        Raises
+        ------
+        ValueError
+            if the query is malformed
+        """
+        tokens = cls.tokenize(query)
+        node, pos = cls.parse_expression(tokens, 0)
+
+        if pos != len(tokens):
+            raise ValueError(f"Unexpected token in query: {tokens[pos][1]}")
+
+        return node
+
+    @classmethod
+    def parse_expression(cls, tokens, pos):
         """
-        # an empty list on the first call
-        blocks = blocks or []
+        Parse subexpressions joined by comparitors, from left to right.
 
-        # get all subqueries by locating all expressions that are closed by a
-        # single set of parantheses
-        match = re.findall(cls.blocks, query)
+        Args
+        ----
+        tokens: list of (str, str)
+        pos: int
+            The index of the first token of the expression
 
-        # if there are no more parantheses, return
-        if not match:
-            blocks.append(query)
-            return blocks
+        Returns
+        -------
+        tuple
+            The parsed expression and the index of the token after it
+        """
+        node, pos = cls.parse_operand(tokens, pos)
 
-        # replace nested subqueries with "$X"
-        for i, block in enumerate(match):
-            _i = i + len(blocks)
-            query = query.replace(f"({block})", f"${_i}")
+        while pos < len(tokens) and tokens[pos][0] == "comparitor":
+            comparitor = tokens[pos][1]
+            right, pos = cls.parse_operand(tokens, pos + 1)
+            node = Combination(comparitor, node, right)
 
-        blocks.extend(match)
-        return cls.build_blocks(query, blocks=blocks)
+        return node, pos
 
     @classmethod
-    def build_expression(cls, blocks, expressions=None):
+    def parse_operand(cls, tokens, pos):
         """
-        Build expression to pass to DynamoDB.Table.scan given a set of blocks.
+        Parse a paranthetical subexpression or a single condition.
 
         Args
         ----
-        blocks: list of str
-        expressions: list of DynamoDB.conditions.Attr
-            A list used for iteratively building the expression, where the last
-            element will be the ultimate return value
+        tokens: list of (str, str)
+        pos: int
+            The index of the first token of the operand
 
         Returns
         -------
-        DynamoDB.conditions.Attr
+        tuple
+            The parsed operand and the index of the token after it
+
+        Raises
+        ------
+        ValueError
+            if the operand is malformed
         """
-        # an empty list on the first call
-        expressions = expressions or []
+        if pos >= len(tokens):
+            raise ValueError("Query ended unexpectedly")
 
-        # get the first block
-        block = blocks[0]
-        blocks = blocks[1:]
-        expression = None
+        kind, text = tokens[pos]
 
-        # iterate over each subexpression in this block
-        strings = re.split(cls.comparitors, block)
-        for i, string in enumerate(strings):
-            # odd-indexed items will be comparitors. Continue
-            if i % 2:
-                continue
+        if kind == "open":
+            node, pos = cls.parse_expression(tokens, pos + 1)
+            if pos >= len(tokens) or tokens[pos][0] != "close":
+                raise ValueError("Query contains an unclosed parenthesis")
 
-            # if this subexpression is a nested subexpression
-            if "$" in string:
-                # get the index and subexpression
-                ix = int(string.replace("$", ""))
-                _expression = expressions[ix]
+            return node, pos + 1
 
-            else:
-                # parse the subexpression
-                _expression = cls.get_expression_from_string(string)
+        # ~"key" and ~~"key" name the key as a value
+        if kind == "conditional" and text in ("~", "~~"):
+            if pos + 1 >= len(tokens) or tokens[pos + 1][0] != "value":
+                raise ValueError(f"Expected a key after {text}")
 
-            # if this is the first subexpression, then there is no previous
-            # expression to combine it with. Continue
-            if not i:
-                expression = _expression
-                continue
+            return Condition(tokens[pos + 1][1], text, ()), pos + 2
 
-            # the last item will be the comparitor with the previous expression
-            comparison = strings[i - 1]
+        if kind != "key":
+            raise ValueError(f"Expected a key but found: {text}")
 
-            if comparison == "OR":
-                expression = expression | _expression
+        if pos + 1 >= len(tokens) or tokens[pos + 1][0] != "conditional":
+            raise ValueError(f"Expected a conditional after key: {text}")
 
-            elif comparison == "AND":
-                expression = expression & _expression
+        conditional = tokens[pos + 1][1]
+        count = 2 if conditional == "BETWEEN" else 1
+        pos = pos + 2
+        values = []
 
-        expressions.append(expression)
+        for _ in range(count):
+            if pos >= len(tokens) or tokens[pos][0] not in ("value", "parameter"):
+                raise ValueError(f"Expected a value after: {text}{conditional}")
 
-        # on last call
-        if not blocks:
-            return expressions[-1]
+            value_kind, value = tokens[pos]
+            values.append(
+                Parameter(value) if value_kind == "parameter" else value
+            )
+            pos += 1
 
-        return cls.build_expression(blocks, expressions)
+        return Condition(text, conditional, tuple(values)), pos
 
     @classmethod
-    def get_expression_from_string(cls, string):
+    def compile(cls, node, params=None):
         """
-        Parse a subexpression.
+        Build the expression to pass to DynamoDB.Table.scan from a parsed query.
 
         Args
         ----
-        string: str
+        node: Condition or Combination
+        params: dict (optional)
+            The values of any named parameters in the query
 
         Returns
         -------
         DynamoDB.conditions.Attr
+
+        Raises
+        ------
+        ValueError
+            if a parameter is not bound to a value
         """
-        # remove conditionals
-        popped = re.sub(cls.conditionals, "", string)
+        if isinstance(node, Combination):
+            left = cls.compile(node.left, params)
+            right = cls.compile(node.right, params)
+
+            if node.comparitor == "OR":
+                return left | right
+
+            return left & right
+
+        values = []
+        expand = None
+        for value in node.values:
+            if isinstance(value, Parameter):
+                if params is None or value.name not in params:
+                    raise ValueError(f"Missing query parameter: {value.name}")
+
+                value = params[value.name]
+                if isinstance(value, list | tuple):
+                    if expand is not None or not value:
+                        raise ValueError(
+                            f"Invalid list for query parameter: {node.key}"
+                        )
+
+                    expand = len(values)
+
+            values.append(value)
+
+        if expand is None:
+            return cls.get_condition(node.key, node.conditional, values)
+
+        # combine the condition for each value of a list parameter with OR
+        return reduce(
+            lambda acc, value: acc | value,
+            (
+                cls.get_condition(
+                    node.key,
+                    node.conditional,
+                    [*values[:expand], value, *values[expand + 1 :]],
+                )
+                for value in values[expand]
+            ),
+        )
 
-        # get the subexpression"s key
-        key = re.search(cls.keys, popped).group(0)
+    @classmethod
+    def get_condition(cls, key, conditional, values):
+        """
+        Build the expression for a single condition.
 
-        # get the subexpression"s conditional
-        condition = re.search(cls.conditionals, string).group(0)
+        Args
+        ----
+        key: str
+        conditional: str
+        values: list
 
-        # get the subexpressions values
-        values = re.findall(cls.values, string) or [""]
+        Returns
+        -------
+        DynamoDB.conditions.Attr
+        """
+        values = values or [""]
 
-        # build the expression
-        if condition == "==":
-            expression = Column(key) == values.pop()
+        if conditional == "==":
+            expression = Column(key) == values[-1]
 
-        elif condition == "!=":
-            expression = Column(key) != values.pop()
+        elif conditional == "!=":
+            expression = Column(key) != values[-1]
 
-        elif condition == "<=":
-            expression = Column(key) <= values.pop()
+        elif conditional == "<=":
+            expression = Column(key) <= values[-1]
 
-        elif condition == ">=":
-            expression = Column(key) >= values.pop()
+        elif conditional == ">=":
+            expression = Column(key) >= values[-1]
 
-        elif condition == "<<":
-            expression = Column(key) < values.pop()
+        elif conditional == "<<":
+            expression = Column(key) < values[-1]
 
-        elif condition == ">>":
-            expression = Column(key) > values.pop()
+        elif conditional == ">>":
+            expression = Column(key) > values[-1]
 
-        elif condition == "BETWEEN":
+        elif conditional == "BETWEEN":
             expression = Column(key).between(*values)
 
-        elif condition == "BEGINS":
-            expression = Column(key).begins_with(values.pop())
+        elif conditional == "BEGINS":
+            expression = Column(key).begins_with(values[-1])
 
-        elif condition == "CONTAINS":
-            expression = Column(key).contains(values.pop())
+        elif conditional == "CONTAINS":
+            expression = Column(key).contains(values[-1])
 
-        elif condition == "~":
+        elif conditional == "~":
             expression = ~Column(key)
 
-        elif condition == "~~":
+        elif conditional == "~~":
             expression = ~~Column(key)
 
         return expression
+
+    @classmethod
+    def get_expression_from_string(cls, string):
+        """
+        Parse a subexpression.
+
+        Args
+        ----
+        string: str
+
+        Returns
+        -------
+        DynamoDB.conditions.Attr
+        """
+        return cls.compile(cls.parse(string))
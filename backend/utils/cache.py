@@ -0,0 +1,129 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import logging
+import threading
+
+from flask import current_app
+from flask_caching import Cache
+
+logger = logging.getLogger(__name__)
+
+
+class CountingCache(Cache):
+    """
+    A Flask-Caching cache that counts the hits and misses of its lookups.
+
+    The backend is chosen by the app's `CACHE_TYPE`, so that a shared backend
+    such as Redis or the filesystem is used by every process. Apps that use
+    Redis without a `CACHE_REDIS_URL` fall back to the filesystem, which is
+    only shared by the processes of a single host, and log a warning.
+
+    Counts are kept for the current process only. Lookups of keys that start
+    with one of `uncounted_prefixes` are not counted, since they are made on
+    every request and almost always hit.
+
+    Attributes
+    ----------
+        hits (int): The number of keys that were found.
+        misses (int): The number of keys that were not found.
+    """
+
+    uncounted_prefixes = ("permissions_version:",)
+
+    def __init__(self, *args, **kwargs):
+        self.hits = 0
+        self.misses = 0
+        self.stats_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def init_app(self, app, config=None):
+        if app.config.get("CACHE_TYPE") == "RedisCache" and not app.config.get(
+            "CACHE_REDIS_URL"
+        ):
+            logger.warning(
+                "CACHE_REDIS_URL is not set, so the cache falls back to "
+                "FileSystemCache and is not shared between hosts."
+            )
+            app.config["CACHE_TYPE"] = "FileSystemCache"
+
+        super().init_app(app, config)
+
+    def is_counted(self, key):
+        """
+        Check whether lookups of a key are counted.
+
+        Parameters
+        ----------
+            key (str)
+
+        Returns
+        -------
+            bool
+        """
+        return not key.startswith(self.uncounted_prefixes)
+
+    def count(self, hits, misses):
+        """
+        Add to the hit and miss counts.
+
+        Parameters
+        ----------
+            hits (int)
+            misses (int)
+        """
+        with self.stats_lock:
+            self.hits += hits
+            self.misses += misses
+
+    def get(self, key, *args, **kwargs):
+        value = super().get(key, *args, **kwargs)
+        if self.is_counted(key):
+            self.count(value is not None, value is None)
+        return value
+
+    def get_many(self, *keys):
+        values = super().get_many(*keys)
+        counted = [
+            value
+            for key, value in zip(keys, values, strict=True)
+            if self.is_counted(key)
+        ]
+        hits = sum(value is not None for value in counted)
+        self.count(hits, len(counted) - hits)
+        return values
+
+    def get_stats(self):
+        """
+        Get the hit and miss counts of this process.
+
+        Returns
+        -------
+            dict: The cache's backend, hits, misses and hit rate, or None for
+                the hit rate if there have been no lookups.
+        """
+        with self.stats_lock:
+            hits, misses = self.hits, self.misses
+
+        lookups = hits + misses
+        return {
+            "type": current_app.config["CACHE_TYPE"],
+            "hits": hits,
+            "misses": misses,
+            "hitRate": hits / lookups if lookups else None,
+        }
+
+    def reset_stats(self):
+        """Reset the hit and miss counts to zero."""
+        with self.stats_lock:
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,127 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import numpy as np
+import pandas as pd
+
+# The media type of responses that are encoded as columns
+COLUMNAR_MIMETYPE = "application/vnd.ditti.columnar+json"
+
+
+def encode_columnar(records, fields, time_fields=()):
+    """
+    Encode records as parallel columns.
+
+    Each field is encoded as its own column so that key names are sent once
+    rather than once per record. Timestamp fields are encoded as milliseconds
+    since the epoch, each relative to the previous non-null timestamp, and
+    the indices of null timestamps are listed separately. Other fields are
+    dictionary-encoded: each distinct value is sent once and the column holds
+    indices into the list of distinct values, or -1 for null.
+
+    Parameters
+    ----------
+    records : iterable of dict
+        The records to encode.
+    fields : list of str
+        The fields of each record to encode.
+    time_fields : iterable of str, optional
+        The fields that hold ISO 8601 timestamps.
+
+    Returns
+    -------
+    dict
+        {
+            length: the number of records,
+            columns: {
+                field: {
+                    encoding: "dictionary",
+                    dictionary: list of the distinct values,
+                    indices: list of int
+                } | {
+                    encoding: "delta",
+                    unit: "ms",
+                    values: list of int,
+                    nulls: list of the indices of null timestamps
+                },
+                ...
+            }
+        }
+    """
+    columns = {field: [] for field in fields}
+    length = 0
+    for record in records:
+        for field in fields:
+            columns[field].append(record.get(field))
+        length += 1
+
+    encoded = {}
+    for field, values in columns.items():
+        if field in time_fields:
+            encoded[field] = encode_deltas(values)
+        else:
+            encoded[field] = encode_dictionary(values)
+
+    return {"length": length, "columns": encoded}
+
+
+def encode_dictionary(values):
+    """
+    Dictionary-encode a column of values.
+
+    Parameters
+    ----------
+    values : list
+
+    Returns
+    -------
+    dict
+    """
+    indices, dictionary = pd.factorize(pd.Series(values, dtype=object))
+    return {
+        "encoding": "dictionary",
+        "dictionary": dictionary.tolist(),
+        "indices": indices.tolist(),
+    }
+
+
+def encode_deltas(values):
+    """
+    Delta-encode a column of ISO 8601 timestamps as epoch milliseconds.
+
+    A null timestamp is encoded as a delta of 0 and its index is listed in
+    `nulls`, so that it does not change the deltas of the timestamps after it.
+
+    Parameters
+    ----------
+    values : list of str or None
+
+    Returns
+    -------
+    dict
+    """
+    times = pd.to_datetime(
+        pd.Series(values, dtype=object), utc=True, format="ISO8601"
+    )
+    valid = times.notna().to_numpy()
+    milliseconds = times.to_numpy(dtype="datetime64[ms]").astype(np.int64)
+
+    # Null timestamps repeat the last timestamp before them, or the epoch
+    last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(valid)), -1))
+    filled = np.where(last_valid >= 0, milliseconds[last_valid], 0)
+
+    return {
+        "encoding": "delta",
+        "unit": "ms",
+        "values": np.diff(filled, prepend=0).tolist(),
+        "nulls": np.flatnonzero(~valid).tolist(),
+    }
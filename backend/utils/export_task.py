@@ -0,0 +1,317 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import logging
+import posixpath
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from backend.extensions import db
+from backend.models import ExportTask
+from backend.utils.aws import registry
+from backend.utils.fitbit_export import (
+    EXPORT_FORMATS,
+    export_file,
+    get_download_name,
+    iter_sleep_levels,
+    select_study_sleep_levels,
+)
+
+logger = logging.getLogger(__name__)
+
+# Progress is saved once every this many rows
+PROGRESS_INTERVAL = 10_000
+
+# Seconds that the download URL of a finished export is valid for
+DOWNLOAD_URL_EXPIRES_IN = 3600
+
+# Runs exports in the background when they are not run on Lambda
+executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="export-task")
+
+
+def create_export_task(study_id, account_id, export_format):
+    """
+    Create a new ExportTask and run it in the background.
+
+    Parameters
+    ----------
+        study_id (int): The primary key of the study to export.
+        account_id (int): The primary key of the account requesting the
+            export.
+        export_format (str): One of `EXPORT_FORMATS`.
+
+    Returns
+    -------
+        ExportTask: The task, or None if it could not be created.
+    """
+    try:
+        now = datetime.now(UTC)
+        export_task = ExportTask(
+            status="Pending",
+            study_id=study_id,
+            account_id=account_id,
+            format=export_format,
+            rows_done=0,
+            created_on=now,
+            updated_on=now,
+        )
+        db.session.add(export_task)
+        db.session.commit()
+
+        submit_export_task(export_task.id)
+
+        return export_task
+    except Exception as e:
+        logger.error(f"Error creating export task: {e}")
+        traceback_str = traceback.format_exc()
+        logger.error(traceback_str)
+        db.session.rollback()
+        return None
+
+
+def submit_export_task(task_id):
+    """
+    Run an ExportTask in the background.
+
+    If `EXPORT_TASK_RUNNER` is "lambda", this Lambda function is invoked
+    asynchronously to run the task, which avoids the time limits of API
+    Gateway. Otherwise the task is run in a local thread pool.
+
+    Parameters
+    ----------
+        task_id: The database ID of the ExportTask to run.
+
+    Returns
+    -------
+        concurrent.futures.Future: The task's future if it is run in the
+            thread pool, or None.
+    """
+    try:
+        if current_app.config["EXPORT_TASK_RUNNER"] == "lambda":
+            function_name = current_app.config.get("EXPORT_FUNCTION_NAME")
+            if not function_name:
+                raise ValueError("EXPORT_FUNCTION_NAME is not configured.")
+
+            # Zappa runs the function named by "command" with the event
+            payload = {
+                "command": "backend.utils.export_task.handle_export_event",
+                "task_id": task_id,
+            }
+
+            registry.get_client("lambda").invoke(
+                FunctionName=function_name,
+                InvocationType="Event",  # Asynchronous invocation
+                Payload=json.dumps(payload).encode("utf-8"),
+            )
+
+            logger.info(f"Lambda invoked for export task {task_id}.")
+            return None
+
+        app = current_app._get_current_object()
+        return executor.submit(run_export_task_in_app, app, task_id)
+
+    except Exception as e:
+        logger.error(f"Failed to submit export task: {e}")
+        traceback_str = traceback.format_exc()
+        logger.error(traceback_str)
+        fail_export_task(task_id, e)
+        return None
+
+
+def handle_export_event(event, context):  # noqa: ARG001
+    """
+    Run the ExportTask of a Lambda event sent by `submit_export_task`.
+
+    Parameters
+    ----------
+        event (dict): The event, which holds the task's "task_id".
+        context: The Lambda context.
+    """
+    # The app imports this module through its views
+    from backend.app import create_app
+
+    run_export_task_in_app(create_app(), event["task_id"])
+
+
+def run_export_task_in_app(app, task_id):
+    """
+    Run an ExportTask in a new app context.
+
+    Parameters
+    ----------
+        app (Flask): The app to run the task in.
+        task_id: The database ID of the ExportTask to run.
+
+    Returns
+    -------
+        ExportTask: The task, or None if it does not exist.
+    """
+    with app.app_context():
+        return run_export_task(task_id)
+
+
+def run_export_task(task_id):
+    """
+    Export a study's Fitbit data to S3.
+
+    Rows are streamed from the database into a spooled temporary file, which
+    is then uploaded to `AWS_EXPORT_BUCKET`. The number of rows exported is
+    saved every `PROGRESS_INTERVAL` rows.
+
+    Parameters
+    ----------
+        task_id: The database ID of the ExportTask to run.
+
+    Returns
+    -------
+        ExportTask: The task, or None if it does not exist.
+    """
+    export_task = db.session.get(ExportTask, task_id)
+    if export_task is None:
+        logger.error(f"Export task {task_id} not found.")
+        return None
+
+    try:
+        study = export_task.study
+        stmt = select_study_sleep_levels(study.ditti_id)
+
+        # Count the rows so that progress can be reported
+        export_task.status = "InProgress"
+        export_task.rows_total = db.session.scalar(
+            select(func.count()).select_from(stmt.order_by(None).subquery())
+        )
+        db.session.commit()
+
+        rows = track_progress(task_id, iter_sleep_levels(stmt))
+        download_name = get_download_name(study.acronym, export_task.format)
+        key = f"exports/{task_id}/{download_name}"
+
+        with export_file(rows, export_task.format) as file:
+            registry.get_client("s3").upload_fileobj(
+                file,
+                current_app.config["AWS_EXPORT_BUCKET"],
+                key,
+                ExtraArgs={"ContentType": EXPORT_FORMATS[export_task.format]},
+            )
+
+        export_task.status = "Success"
+        export_task.file_key = key
+        export_task.completed_on = datetime.now(UTC)
+        db.session.commit()
+
+        logger.info(f"Export task {task_id} uploaded to {key}.")
+        return export_task
+
+    except Exception as e:
+        logger.error(f"Export task {task_id} failed: {e}")
+        traceback_str = traceback.format_exc()
+        logger.error(traceback_str)
+        return fail_export_task(task_id, e)
+
+
+def track_progress(task_id, rows):
+    """
+    Save the number of rows of an ExportTask that are exported as they are read.
+
+    Parameters
+    ----------
+        task_id: The database ID of the ExportTask.
+        rows (iterable of tuple): The rows being exported.
+
+    Yields
+    ------
+        tuple: Each row.
+    """
+    rows_done = 0
+    for rows_done, row in enumerate(rows, start=1):
+        yield row
+        if rows_done % PROGRESS_INTERVAL == 0:
+            save_progress(task_id, rows_done)
+
+    save_progress(task_id, rows_done)
+
+
+def save_progress(task_id, rows_done):
+    """
+    Save the number of rows of an ExportTask that have been exported.
+
+    Progress is saved on a separate connection, since committing the session
+    would close the server-side cursor that rows are read from.
+
+    Parameters
+    ----------
+        task_id: The database ID of the ExportTask.
+        rows_done (int)
+    """
+    with db.engine.begin() as connection:
+        connection.execute(
+            update(ExportTask)
+            .where(ExportTask.id == task_id)
+            .values(rows_done=rows_done, updated_on=func.now())
+        )
+
+
+def fail_export_task(task_id, error):
+    """
+    Mark an ExportTask as failed.
+
+    Parameters
+    ----------
+        task_id: The database ID of the ExportTask.
+        error (Exception): The error that the task failed with.
+
+    Returns
+    -------
+        ExportTask: The task, or None if it does not exist.
+    """
+    db.session.rollback()
+    export_task = db.session.get(ExportTask, task_id)
+    if export_task:
+        export_task.status = "Failed"
+        export_task.error_code = str(error)
+        export_task.updated_on = datetime.now(UTC)
+        db.session.commit()
+
+    return export_task
+
+
+def get_download_url(export_task):
+    """
+    Get a presigned URL to download the file of a finished ExportTask.
+
+    Parameters
+    ----------
+        export_task (ExportTask)
+
+    Returns
+    -------
+        str: The URL, which is valid for `DOWNLOAD_URL_EXPIRES_IN` seconds, or
+            None if the task has not finished.
+    """
+    if export_task.status != "Success" or not export_task.file_key:
+        return None
+
+    filename = posixpath.basename(export_task.file_key)
+    return registry.get_client("s3").generate_presigned_url(
+        "get_object",
+        Params={
+            "Bucket": current_app.config["AWS_EXPORT_BUCKET"],
+            "Key": export_task.file_key,
+            "ResponseContentDisposition": f'attachment; filename="{filename}"',
+        },
+        ExpiresIn=DOWNLOAD_URL_EXPIRES_IN,
+    )
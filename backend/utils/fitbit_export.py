@@ -0,0 +1,399 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import csv
+import io
+import itertools
+import string
+import tempfile
+import zlib
+from datetime import datetime
+
+import xlsxwriter
+from sqlalchemy import func, select
+
+from backend.extensions import db
+from backend.models import SleepLevel, SleepLog, StudySubject
+
+# The header of each exported column
+EXPORT_COLUMNS = [
+    "Ditti ID",
+    "Sleep Log Date",
+    "Sleep Level Timestamp",
+    "Sleep Level Level",
+    "Sleep Level Length (s)",
+]
+
+XLSX_MIMETYPE = (
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+)
+
+# The mimetype of each export format, keyed by its file extension
+EXPORT_FORMATS = {
+    "xlsx": XLSX_MIMETYPE,
+    "csv": "text/csv",
+    "csv.gz": "application/gzip",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# The most rows an Excel worksheet can hold, including the header
+XLSX_MAX_ROWS = 1_048_576
+
+# The number of rows fetched from the server-side cursor at a time
+BATCH_SIZE = 5000
+
+# Exports larger than this many bytes are spooled to disk
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# Streamed CSV is sent in chunks of at least this many bytes
+CSV_CHUNK_SIZE = 64 * 1024
+
+
+def select_sleep_levels(*whereclause):
+    """
+    Build a query for the sleep levels of one or more study subjects.
+
+    Parameters
+    ----------
+    whereclause : sqlalchemy.sql.ColumnElement
+        The criteria that select the study subjects to export.
+
+    Returns
+    -------
+    sqlalchemy.sql.Select
+        Selects one row for each of `EXPORT_COLUMNS`, ordered by Ditti ID and
+        sleep level timestamp.
+    """
+    return (
+        select(
+            StudySubject.ditti_id,
+            SleepLog.date_of_sleep,
+            SleepLevel.date_time,
+            SleepLevel.level,
+            SleepLevel.seconds,
+        )
+        .join(SleepLog, SleepLog.study_subject_id == StudySubject.id)
+        .join(SleepLevel, SleepLevel.sleep_log_id == SleepLog.id)
+        .where(*whereclause)
+        .order_by(StudySubject.ditti_id, SleepLevel.date_time)
+    )
+
+
+def select_study_sleep_levels(ditti_prefix):
+    """
+    Build a query for the sleep levels of every study subject in a study.
+
+    Parameters
+    ----------
+    ditti_prefix : str
+        The study's Ditti ID prefix.
+
+    Returns
+    -------
+    sqlalchemy.sql.Select
+    """
+    # The prefix is matched through idx_study_subject_ditti_id_pattern. The
+    # digit check keeps e.g. "FOO001" out of study "FO"
+    return select_sleep_levels(
+        StudySubject.ditti_id.startswith(ditti_prefix, autoescape=True),
+        func.substr(StudySubject.ditti_id, len(ditti_prefix) + 1, 1).in_(
+            list(string.digits)
+        ),
+    )
+
+
+def get_download_name(name, export_format):
+    """
+    Get the timestamped filename of an export.
+
+    Parameters
+    ----------
+    name : str
+        The Ditti ID or study acronym to name the file after.
+    export_format : str
+        One of `EXPORT_FORMATS`.
+
+    Returns
+    -------
+    str
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    return f"{name}_Fitbit_{timestamp}.{export_format}"
+
+
+def iter_sleep_levels(stmt, batch_size=BATCH_SIZE):
+    """
+    Stream the rows of a sleep level query.
+
+    Rows are read from a server-side cursor `batch_size` rows at a time, so
+    only one batch is held in memory.
+
+    Parameters
+    ----------
+    stmt : sqlalchemy.sql.Select
+        A query built with `select_sleep_levels`.
+    batch_size : int, optional
+
+    Yields
+    ------
+    tuple
+        The value of each of `EXPORT_COLUMNS`.
+    """
+    result = db.session.execute(stmt, execution_options={"yield_per": batch_size})
+
+    try:
+        for ditti_id, date_of_sleep, date_time, level, seconds in result:
+            yield ditti_id, date_of_sleep, date_time, level.value, seconds
+
+    finally:
+        result.close()
+
+
+def write_xlsx(rows, file, sheet_name="Participant Data"):
+    """
+    Write rows to an Excel workbook in constant memory.
+
+    Each row is flushed to a temporary file as soon as it is written, so
+    memory use does not grow with the number of rows.
+
+    Parameters
+    ----------
+    rows : iterable of tuple
+        The value of each of `EXPORT_COLUMNS`.
+    file : file-like object
+        A seekable binary file to write the workbook to.
+    sheet_name : str, optional
+    """
+    workbook = xlsxwriter.Workbook(file, {"constant_memory": True})
+
+    try:
+        header_format = workbook.add_format(
+            {"bold": True, "border": 1, "align": "center", "valign": "top"}
+        )
+        date_format = workbook.add_format({"num_format": "yyyy-mm-dd"})
+        datetime_format = workbook.add_format(
+            {"num_format": "yyyy-mm-dd hh:mm:ss"}
+        )
+
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, EXPORT_COLUMNS, header_format)
+
+        for i, (ditti_id, date_of_sleep, date_time, level, seconds) in enumerate(
+            rows, start=1
+        ):
+            if i == XLSX_MAX_ROWS:
+                raise ValueError(
+                    "Too many rows for an Excel file. Export as CSV or Parquet."
+                )
+
+            worksheet.write_string(i, 0, ditti_id)
+            worksheet.write_datetime(i, 1, date_of_sleep, date_format)
+            worksheet.write_datetime(i, 2, date_time, datetime_format)
+            worksheet.write_string(i, 3, level)
+            worksheet.write_number(i, 4, seconds)
+
+    finally:
+        workbook.close()
+
+
+def write_parquet(rows, file, batch_size=BATCH_SIZE):
+    """
+    Write rows to a Parquet file one row group at a time.
+
+    Only one batch of `batch_size` rows is held in memory.
+
+    Parameters
+    ----------
+    rows : iterable of tuple
+        The value of each of `EXPORT_COLUMNS`.
+    file : file-like object
+        A binary file to write the Parquet file to.
+    batch_size : int, optional
+        The number of rows in each row group.
+    """
+    # pyarrow is large and only needed for Parquet exports
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            (EXPORT_COLUMNS[0], pa.string()),
+            (EXPORT_COLUMNS[1], pa.date32()),
+            (EXPORT_COLUMNS[2], pa.timestamp("us")),
+            (EXPORT_COLUMNS[3], pa.string()),
+            (EXPORT_COLUMNS[4], pa.int64()),
+        ]
+    )
+
+    with pq.ParquetWriter(file, schema) as writer:
+        for batch in itertools.batched(rows, batch_size):
+            columns = zip(*batch, strict=True)
+            writer.write_batch(
+                pa.record_batch(
+                    [
+                        pa.array(column, type=field.type)
+                        for column, field in zip(columns, schema, strict=True)
+                    ],
+                    schema=schema,
+                )
+            )
+
+
+def iter_csv(rows, compress=False):
+    """
+    Encode rows as CSV as they are read.
+
+    Parameters
+    ----------
+    rows : iterable of tuple
+        The value of each of `EXPORT_COLUMNS`.
+    compress : bool, optional
+        Whether to gzip the CSV as it is encoded.
+
+    Yields
+    ------
+    bytes
+        Chunks of the CSV of at least `CSV_CHUNK_SIZE` bytes, except the last.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def flush():
+        chunk = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(chunk) if compressor else chunk
+
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CSV_CHUNK_SIZE:
+            chunk = flush()
+            if chunk:
+                yield chunk
+
+    chunk = flush()
+    if compressor:
+        chunk += compressor.flush()
+    yield chunk
+
+
+def write_csv(rows, file, compress=False):
+    """
+    Write rows to a CSV file.
+
+    Parameters
+    ----------
+    rows : iterable of tuple
+        The value of each of `EXPORT_COLUMNS`.
+    file : file-like object
+        A binary file to write the CSV to.
+    compress : bool, optional
+        Whether to gzip the CSV.
+    """
+    for chunk in iter_csv(rows, compress):
+        file.write(chunk)
+
+
+def spool(write, rows, *args):
+    """
+    Write rows to a spooled temporary file.
+
+    The file is held in memory until it exceeds `SPOOL_MAX_SIZE` bytes, after
+    which it is moved to disk.
+
+    Parameters
+    ----------
+    write : callable
+        A function like `write_xlsx` that writes rows to a file.
+    rows : iterable of tuple
+        The value of each of `EXPORT_COLUMNS`.
+    args : tuple
+        Additional arguments to `write`.
+
+    Returns
+    -------
+    tempfile.SpooledTemporaryFile
+        The file, seeked to its start. The file is deleted when it is closed.
+    """
+    # The caller closes the file once it is sent
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)  # noqa: SIM115
+
+    try:
+        write(rows, file, *args)
+    except BaseException:
+        file.close()
+        raise
+
+    file.seek(0)
+    return file
+
+
+def export_xlsx(rows, sheet_name="Participant Data"):
+    """
+    Write rows to an Excel workbook in a spooled temporary file.
+
+    Parameters
+    ----------
+    rows : iterable of tuple
+        The value of each of `EXPORT_COLUMNS`.
+    sheet_name : str, optional
+
+    Returns
+    -------
+    tempfile.SpooledTemporaryFile
+        The workbook, seeked to its start.
+    """
+    return spool(write_xlsx, rows, sheet_name)
+
+
+def export_parquet(rows):
+    """
+    Write rows to a Parquet file in a spooled temporary file.
+
+    Parameters
+    ----------
+    rows : iterable of tuple
+        The value of each of `EXPORT_COLUMNS`.
+
+    Returns
+    -------
+    tempfile.SpooledTemporaryFile
+        The Parquet file, seeked to its start.
+    """
+    return spool(write_parquet, rows)
+
+
+def export_file(rows, export_format):
+    """
+    Write rows to a spooled temporary file in any export format.
+
+    Parameters
+    ----------
+    rows : iterable of tuple
+        The value of each of `EXPORT_COLUMNS`.
+    export_format : str
+        One of `EXPORT_FORMATS`.
+
+    Returns
+    -------
+    tempfile.SpooledTemporaryFile
+        The file, seeked to its start.
+    """
+    if export_format == "xlsx":
+        return export_xlsx(rows)
+
+    if export_format == "parquet":
+        return export_parquet(rows)
+
+    return spool(write_csv, rows, export_format == "csv.gz")
@@ -0,0 +1,65 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+def build_index(rows, key):
+    """
+    Build a hash index on the small side of a join.
+
+    Parameters
+    ----------
+    rows : iterable of dict
+        The rows to index, e.g., users or audio files.
+    key : str
+        The attribute to index the rows by. Rows without it are skipped and,
+        if several rows share a value, the last one is kept.
+
+    Returns
+    -------
+    dict
+        Maps each value of `key` to its row.
+    """
+    return {row[key]: row for row in rows if row.get(key) is not None}
+
+
+def hash_join(rows, *joins):
+    """
+    Inner-join a stream of rows against one or more hash indexes.
+
+    Rows are probed against each index one at a time as they are read, so only
+    the indexes are held in memory. Rows with no match in any one of the
+    indexes are dropped.
+
+    Parameters
+    ----------
+    rows : iterable of dict
+        The large side of the join, e.g., taps.
+    joins : tuple of (str, dict)
+        The attribute of each row that holds the foreign key and the index
+        built with `build_index` to look it up in.
+
+    Yields
+    ------
+    tuple
+        Each row followed by its match in each index, in the order the indexes
+        were given.
+    """
+    for row in rows:
+        matches = []
+        for foreign_key, index in joins:
+            match = index.get(row.get(foreign_key))
+            if match is None:
+                break
+            matches.append(match)
+
+        else:
+            yield (row, *matches)
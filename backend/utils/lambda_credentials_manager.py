@@ -12,11 +12,14 @@
 
 import json
 import logging
+import threading
+import time
 
-import boto3
 from botocore.credentials import Credentials
 from botocore.exceptions import ClientError
 
+from backend.utils.aws import registry
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,9 +28,23 @@ class LambdaCredentialsManager:
     Manage AWS credentials for the Lambda execution user.
 
     Retrieves shared Lambda credentials for SigV4 authentication
-    using AWS Secrets Manager.
+    using AWS Secrets Manager. Credentials are cached for `ttl` seconds, after
+    which the next call fetches the secret again. If the fetch fails the stale
+    credentials are kept.
+
+    Use `get_credentials_manager` to share one manager, and therefore its
+    cached credentials, between requests.
+
+    Vars
+    ----
+        ttl (float): seconds before the credentials are fetched again
+        min_refresh_interval (float): the least number of seconds between
+            fetches that check for rotated credentials
     """
 
+    ttl = 900
+    min_refresh_interval = 30
+
     def __init__(self, secret_name: str, region_name: str = "us-east-1"):
         """
         Initialize the Secrets Manager client and sets the secret name and region.
@@ -39,14 +56,19 @@ class LambdaCredentialsManager:
         """
         self.secret_name = secret_name
         self.region_name = region_name
-        self.client = boto3.client("secretsmanager", region_name=self.region_name)
+        self.client = registry.get_client(
+            "secretsmanager", region_name=self.region_name
+        )
         self.credentials = None  # Cache credentials after retrieval
+        self.version_id = None
+        self.fetched_at = None
+        self.lock = threading.Lock()
 
     def get_credentials(self) -> Credentials:
         """
         Retrieve AWS credentials from Secrets Manager.
 
-        Caches credentials after the first retrieval.
+        Caches credentials for `ttl` seconds after each retrieval.
 
         Returns
         -------
@@ -55,12 +77,101 @@ class LambdaCredentialsManager:
 
         Raises
         ------
-            Exception: If unable to retrieve or parse the secret.
+            Exception: If unable to retrieve or parse the secret and no
+                credentials are cached.
         """
-        if self.credentials:
+        fetched_at = self.fetched_at
+        if fetched_at is not None and time.monotonic() - fetched_at < self.ttl:
             logger.debug("Using cached Lambda credentials.")
             return self.credentials
 
+        return self.refresh(fetched_at)
+
+    def refresh_if_rotated(self) -> bool:
+        """
+        Fetch the secret again to check whether the credentials were rotated.
+
+        Call this when a signature does not match the cached credentials. The
+        secret is fetched no more than once every `min_refresh_interval`
+        seconds.
+
+        Returns
+        -------
+            bool: Whether the credentials changed.
+        """
+        fetched_at = self.fetched_at
+        if (
+            fetched_at is not None
+            and time.monotonic() - fetched_at < self.min_refresh_interval
+        ):
+            return False
+
+        credentials = self.credentials
+        return self.refresh(fetched_at) is not credentials
+
+    def refresh(self, seen) -> Credentials:
+        """
+        Fetch the credentials unless another request already did.
+
+        Parameters
+        ----------
+            seen (float): The `fetched_at` time of the credentials the caller
+                found stale, or None
+
+        Returns
+        -------
+            Credentials: The current credentials.
+        """
+        with self.lock:
+            if self.fetched_at != seen:
+                # Another request refreshed the credentials while this one waited
+                return self.credentials
+
+            try:
+                credentials, version_id = self.fetch_credentials()
+            except Exception:
+                if self.credentials is None:
+                    raise
+
+                logger.warning("Using stale Lambda credentials.")
+                # Try again after `min_refresh_interval` rather than on every
+                # request
+                self.fetched_at = (
+                    time.monotonic() - self.ttl + self.min_refresh_interval
+                )
+                return self.credentials
+
+            # Keep the same object if nothing changed so that callers can tell
+            # whether the credentials were rotated
+            if self.credentials is None or (
+                credentials.access_key,
+                credentials.secret_key,
+            ) != (self.credentials.access_key, self.credentials.secret_key):
+                if self.credentials is not None:
+                    logger.info(
+                        "Lambda execution credentials were rotated to secret "
+                        f"version {version_id}."
+                    )
+                self.credentials = credentials
+
+            self.version_id = version_id
+
+            self.fetched_at = time.monotonic()
+            return self.credentials
+
+    def fetch_credentials(self):
+        """
+        Fetch and parse the secret.
+
+        Returns
+        -------
+            tuple of (Credentials, str): The credentials and the version ID of
+                the secret.
+
+        Raises
+        ------
+            Exception: If unable to retrieve or parse the secret.
+        """
         try:
             response = self.client.get_secret_value(SecretId=self.secret_name)
             secret_string = response.get("SecretString")
@@ -84,12 +195,12 @@ class LambdaCredentialsManager:
                     "Access Key ID or Secret Access Key missing in the secret."
                 )
 
-            self.credentials = Credentials(access_key, secret_key)
+            credentials = Credentials(access_key, secret_key)
             logger.info(
                 "Successfully retrieved and cached Lambda execution "
                 "credentials from Secrets Manager."
             )
-            return self.credentials
+            return credentials, response.get("VersionId")
 
         except ClientError as e:
             logger.error(f"Error retrieving secret '{self.secret_name}': {e}")
@@ -102,3 +213,33 @@ class LambdaCredentialsManager:
         except Exception as e:
             logger.error(f"Unexpected error retrieving credentials: {e}")
             raise e
+
+
+# Managers shared between requests, keyed by secret name and region
+managers = {}
+managers_lock = threading.Lock()
+
+
+def get_credentials_manager(
+    secret_name: str, region_name: str = "us-east-1"
+) -> LambdaCredentialsManager:
+    """
+    Get the shared credentials manager of a secret.
+
+    Parameters
+    ----------
+        secret_name (str): The name of the secret to retrieve.
+        region_name (str): AWS region where the secret is stored.
+
+    Returns
+    -------
+        LambdaCredentialsManager
+    """
+    key = secret_name, region_name
+    with managers_lock:
+        manager = managers.get(key)
+        if manager is None:
+            manager = LambdaCredentialsManager(secret_name, region_name)
+            managers[key] = manager
+
+    return manager
@@ -16,13 +16,13 @@ import traceback
 from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 
-import boto3
 import requests
 from flask import current_app
 from sqlalchemy import or_
 
 from backend.extensions import db
 from backend.models import LambdaTask
+from backend.utils.aws import registry
 
 logger = logging.getLogger(__name__)
 
@@ -109,7 +109,7 @@ def invoke_lambda_task(function_id):
     """
     try:
         if current_app.config["ENV"] in {"staging", "production", "testing"}:
-            client = boto3.client("lambda")
+            client = registry.get_client("lambda")
 
             # Retrieve the Lambda function name from configuration
             function_name = current_app.config.get("LAMBDA_FUNCTION_NAME")
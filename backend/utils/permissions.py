@@ -0,0 +1,195 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from flask import current_app
+
+from backend.extensions import cache
+
+# The version that is bumped when access groups, roles or studies change
+GLOBAL_VERSION_KEY = "permissions_version:*"
+
+# The key in app.extensions that compiled permission sets are held under
+EXTENSION_KEY = "permission_sets"
+
+# The most permission sets held in memory at once by each app
+PERMISSION_SETS_MAXSIZE = 1024
+
+
+def get_version_key(account_id):
+    """
+    Get the cache key of an account's permissions version.
+
+    Parameters
+    ----------
+    account_id : int
+
+    Returns
+    -------
+    str
+    """
+    return f"permissions_version:{account_id}"
+
+
+def get_version(key):
+    """
+    Get the current value of a permissions version.
+
+    Versions are random tokens rather than integers so that a version that is
+    evicted from the cache and recreated never matches an old one.
+
+    Parameters
+    ----------
+    key : str
+
+    Returns
+    -------
+    str
+    """
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=0)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_version(key):
+    """
+    Invalidate every permission set that was compiled under a version.
+
+    Parameters
+    ----------
+    key : str
+    """
+    cache.set(key, uuid.uuid4().hex, timeout=0)
+
+
+def invalidate_account_permissions(*account_ids):
+    """
+    Invalidate the compiled permissions of one or more accounts.
+
+    Call this when an account's access groups or study roles change.
+
+    Parameters
+    ----------
+    account_ids : int
+    """
+    for account_id in account_ids:
+        bump_version(get_version_key(account_id))
+
+
+def invalidate_all_permissions():
+    """
+    Invalidate the compiled permissions of every account.
+
+    Call this when access groups, roles or studies change, since these can
+    grant or revoke permissions for any number of accounts.
+    """
+    bump_version(GLOBAL_VERSION_KEY)
+
+
+def get_permission_sets():
+    """
+    Get the compiled permission sets of the current app.
+
+    Returns
+    -------
+    tuple of (collections.OrderedDict, threading.Lock)
+    """
+    extension = current_app.extensions.get(EXTENSION_KEY)
+
+    if extension is None:
+        extension = current_app.extensions.setdefault(
+            EXTENSION_KEY, (OrderedDict(), threading.Lock())
+        )
+
+    return extension
+
+
+def get_permission_set(account, app_id, study_id=None):
+    """
+    Get an account's compiled permissions for an app and study.
+
+    Permission sets are compiled with a single query and held in memory for
+    `PERMISSION_SET_TTL` seconds, or until the account's permissions version or
+    the global permissions version is bumped. The TTL bounds how long another
+    process can serve revoked permissions if it does not see a version bump,
+    e.g., because the cache backend is not shared. The least recently used set
+    is evicted once `PERMISSION_SETS_MAXSIZE` sets are held.
+
+    Parameters
+    ----------
+    account : backend.models.Account
+    app_id : int or str
+        The app's primary key.
+    study_id : int or str, optional
+        The study's primary key.
+
+    Returns
+    -------
+    frozenset of (str, str)
+        The (action, resource) definition of each permission.
+    """
+    version = (
+        get_version(GLOBAL_VERSION_KEY),
+        get_version(get_version_key(account.id)),
+    )
+
+    key = (account.id, str(app_id), str(study_id) if study_id else None)
+    permission_sets, lock = get_permission_sets()
+
+    now = time.monotonic()
+
+    with lock:
+        entry = permission_sets.get(key)
+        if entry is not None and entry[0] == version and entry[1] > now:
+            permission_sets.move_to_end(key)
+            return entry[2]
+
+    permissions = account.compile_permissions(app_id, study_id)
+    expires_at = now + current_app.config["PERMISSION_SET_TTL"]
+
+    with lock:
+        permission_sets[key] = version, expires_at, permissions
+        permission_sets.move_to_end(key)
+        while len(permission_sets) > PERMISSION_SETS_MAXSIZE:
+            permission_sets.popitem(last=False)
+
+    return permissions
+
+
+def has_permission(permissions, action, resource):
+    """
+    Check whether a compiled permission set allows an action on a resource.
+
+    Parameters
+    ----------
+    permissions : frozenset of (str, str)
+    action : str
+    resource : str
+
+    Returns
+    -------
+    bool
+    """
+    return (
+        (action, resource) in permissions
+        or (action, "*") in permissions
+        or ("*", resource) in permissions
+        or ("*", "*") in permissions
+    )
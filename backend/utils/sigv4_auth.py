@@ -10,7 +10,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import hashlib
+import hmac
 import logging
+import threading
 import traceback
 from functools import wraps
 
@@ -18,10 +21,88 @@ from botocore.auth import SigV4Auth
 from botocore.awsrequest import AWSRequest
 from flask import abort, current_app, request
 
-from .lambda_credentials_manager import LambdaCredentialsManager
+from .lambda_credentials_manager import get_credentials_manager
 
 logger = logging.getLogger(__name__)
 
+# Signing keys keyed by secret key, date, region and service
+signing_keys = {}
+signing_keys_lock = threading.Lock()
+
+
+def hmac_sha256(key, msg):
+    """Get the HMAC-SHA256 digest of a string."""
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+def get_signing_key(secret_key, date, region, service):
+    """
+    Get the SigV4 signing key derived from a secret key.
+
+    Deriving a signing key takes four HMACs, and a key is valid for every
+    request signed on the same date, so keys are derived once per date,
+    region and service. Keys of earlier dates are discarded.
+
+    Parameters
+    ----------
+    secret_key : str
+    date : str
+        The date the request was signed on, formatted as YYYYMMDD.
+    region : str
+    service : str
+
+    Returns
+    -------
+    bytes
+    """
+    key = secret_key, date, region, service
+    signing_key = signing_keys.get(key)
+
+    if signing_key is None:
+        k_date = hmac_sha256(f"AWS4{secret_key}".encode(), date)
+        k_region = hmac_sha256(k_date, region)
+        k_service = hmac_sha256(k_region, service)
+        signing_key = hmac_sha256(k_service, "aws4_request")
+
+        with signing_keys_lock:
+            for stale in [k for k in signing_keys if k[1] != date]:
+                del signing_keys[stale]
+            signing_keys[key] = signing_key
+
+    return signing_key
+
+
+class CachedSigV4Auth(SigV4Auth):
+    """SigV4Auth that reuses signing keys rather than deriving them each time."""
+
+    def signature(self, string_to_sign, request):
+        signing_key = get_signing_key(
+            self.credentials.secret_key,
+            request.context["timestamp"][0:8],
+            self._region_name,
+            self._service_name,
+        )
+        return self._sign(signing_key, string_to_sign, hex=True)
+
+
+def sign(aws_request, credentials, service, region):
+    """
+    Sign a request and get its Authorization header.
+
+    Parameters
+    ----------
+    aws_request : botocore.awsrequest.AWSRequest
+    credentials : botocore.credentials.Credentials
+    service : str
+    region : str
+
+    Returns
+    -------
+    str
+    """
+    CachedSigV4Auth(credentials, service, region).add_auth(aws_request)
+    return aws_request.headers.get("Authorization")
+
 
 def sigv4_required(func):
     """
@@ -88,10 +169,10 @@ def sigv4_required(func):
                 method=request.method, url=full_url, data=body, headers=headers
             )
 
-            # Initialize LambdaCredentialsManager
+            # Get the shared credentials, which are cached between requests
             secret_name = "lambda-execution-user-credentials"  # noqa: S105
             region = current_app.config.get("LAMBDA_AWS_REGION", "us-east-1")
-            credentials_manager = LambdaCredentialsManager(
+            credentials_manager = get_credentials_manager(
                 secret_name=secret_name, region_name=region
             )
             credentials = credentials_manager.get_credentials()
@@ -99,11 +180,9 @@ def sigv4_required(func):
             service = "execute-api"
 
             # Sign the request using the shared credentials
-            SigV4Auth(credentials, service, region).add_auth(aws_request)
-
-            # Calculate Authorization header
-            signed_headers = dict(aws_request.headers)
-            calculated_authorization = signed_headers.get("Authorization")
+            calculated_authorization = sign(
+                aws_request, credentials, service, region
+            )
 
             # Compare the calculated signature with the one provided
             provided_authorization = authorization
@@ -112,6 +191,15 @@ def sigv4_required(func):
                 logger.warning("Authorization header missing after signing.")
                 abort(401, description="Invalid Authorization header.")
 
+            # The credentials may have been rotated since they were cached
+            if (
+                provided_authorization != calculated_authorization
+                and credentials_manager.refresh_if_rotated()
+            ):
+                calculated_authorization = sign(
+                    aws_request, credentials_manager.credentials, service, region
+                )
+
             if provided_authorization != calculated_authorization:
                 logger.warning("Signature mismatch.")
                 abort(401, description="Invalid signature.")
@@ -0,0 +1,185 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import pandas as pd
+
+# The pandas frequency each bin granularity is floored to
+GRANULARITIES = {"hour": "h", "day": "D"}
+
+
+def format_timestamp(timestamp):
+    """
+    Format a datetime like the timestamps on DynamoDB.
+
+    Tap timestamps are stored as UTC strings with millisecond precision, which
+    sort chronologically.
+
+    Parameters
+    ----------
+    timestamp : datetime.datetime
+        A timezone-aware datetime.
+
+    Returns
+    -------
+    str
+    """
+    timestamp = timestamp.astimezone(UTC)
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def get_timezone(name):
+    """
+    Get a timezone by its IANA name.
+
+    Parameters
+    ----------
+    name : str
+        The name of the timezone, e.g., "America/New_York".
+
+    Returns
+    -------
+    zoneinfo.ZoneInfo
+
+    Raises
+    ------
+    ValueError
+        If the timezone does not exist.
+    """
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as err:
+        raise ValueError(f"Invalid timezone: {name}") from err
+
+
+def parse_timestamp(value, name):
+    """
+    Parse an ISO 8601 timestamp into the format of tap timestamps.
+
+    Parameters
+    ----------
+    value : str
+        The timestamp to parse. Timestamps without an offset are in UTC.
+    name : str
+        The name of the option the timestamp was passed as, for error
+        messages.
+
+    Returns
+    -------
+    str
+        The timestamp in UTC, formatted like the timestamps on DynamoDB.
+
+    Raises
+    ------
+    ValueError
+        If the timestamp is invalid.
+    """
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError as err:
+        raise ValueError(
+            f"Invalid {name}. Expected an ISO 8601 timestamp."
+        ) from err
+
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=UTC)
+
+    return format_timestamp(timestamp)
+
+
+def get_summary_range(start_date_str, end_date_str, timezone):
+    """
+    Get the range of tap timestamps that fall on a range of local dates.
+
+    Parameters
+    ----------
+    start_date_str : str
+        The first date in 'YYYY-MM-DD' format.
+    end_date_str : str
+        The last date in 'YYYY-MM-DD' format, inclusive.
+    timezone : zoneinfo.ZoneInfo
+        The timezone the dates are in.
+
+    Returns
+    -------
+    tuple of (str, str)
+        The first timestamp in the range and the first timestamp after it,
+        formatted like the timestamps on DynamoDB.
+
+    Raises
+    ------
+    ValueError
+        If the dates are invalid or the end date is before the start date.
+    """
+    try:
+        start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+        end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
+    except (TypeError, ValueError) as err:
+        raise ValueError(
+            "Invalid start_date or end_date. Expected YYYY-MM-DD."
+        ) from err
+
+    if end_date < start_date:
+        raise ValueError("end_date cannot be earlier than start_date.")
+
+    start = start_date.replace(tzinfo=timezone)
+    end = (end_date + timedelta(days=1)).replace(tzinfo=timezone)
+
+    return format_timestamp(start), format_timestamp(end)
+
+
+def bin_taps(records, granularity, timezone):
+    """
+    Count taps per participant in hourly or daily bins.
+
+    Timestamps are converted to the given timezone before they are binned, so
+    each bin starts on a local hour or midnight. Only bins with at least one
+    tap are returned.
+
+    Parameters
+    ----------
+    records : iterable of (str, str)
+        The Ditti ID of the participant and the UTC timestamp of each tap.
+    granularity : str
+        The size of each bin, "hour" or "day".
+    timezone : zoneinfo.ZoneInfo
+        The timezone to bin taps in.
+
+    Returns
+    -------
+    list of dict
+        The Ditti ID, local start time and tap count of each bin, ordered by
+        Ditti ID and time.
+    """
+    df = pd.DataFrame.from_records(records, columns=["dittiId", "time"])
+    if df.empty:
+        return []
+
+    # bin by local wall-clock time so that bins are not split across changes
+    # to daylight saving time
+    time = (
+        pd.to_datetime(df["time"], utc=True, format="ISO8601")
+        .dt.tz_convert(timezone)
+        .dt.tz_localize(None)
+        .dt.floor(GRANULARITIES[granularity])
+    )
+
+    counts = (
+        df.groupby(["dittiId", time.rename("time")])
+        .size()
+        .reset_index(name="count")
+    )
+    counts["time"] = counts["time"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+
+    return counts.to_dict("records")
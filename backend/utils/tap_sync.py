@@ -0,0 +1,297 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import logging
+from datetime import UTC, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.extensions import db
+from backend.models import AudioTap, SyncCheckpoint, Tap
+from backend.utils.aws import Query
+from backend.utils.tap_summary import format_timestamp
+
+logger = logging.getLogger(__name__)
+
+# The local table each DynamoDB table is copied to, and the column each
+# DynamoDB attribute is copied into
+SYNC_TABLES = {
+    "Tap": {
+        "model": Tap,
+        "columns": {
+            "id": "id",
+            "tapUserId": "user_id",
+            "time": "time",
+            "timeZone": "timezone",
+            "createdAt": "created_at",
+        },
+    },
+    "AudioTap": {
+        "model": AudioTap,
+        "columns": {
+            "id": "id",
+            "audioTapUserId": "user_id",
+            "audioTapAudioFileId": "audio_file_id",
+            "time": "time",
+            "timeZone": "timezone",
+            "action": "action",
+            "createdAt": "created_at",
+        },
+    },
+}
+
+# Items are re-read from this long before the high-water mark, so that items
+# written out of order or made visible late are not missed
+SYNC_OVERLAP = timedelta(minutes=5)
+
+
+def get_sync_start(high_water_mark):
+    """
+    Get the `createdAt` timestamp to read new items from.
+
+    Parameters
+    ----------
+    high_water_mark : str or None
+        The latest `createdAt` timestamp that has been copied.
+
+    Returns
+    -------
+    str or None
+        The timestamp to read from, or None if the table has never been copied.
+    """
+    if high_water_mark is None:
+        return None
+
+    return format_timestamp(
+        datetime.fromisoformat(high_water_mark) - SYNC_OVERLAP
+    )
+
+
+def sync_table(table_key, full=False):
+    """
+    Copy new items from a DynamoDB table to its local table.
+
+    Only items created since the table's high-water mark (less a short overlap)
+    are read and items that have already been copied are skipped, so the sync
+    can be run repeatedly. The high-water mark is advanced only once every new
+    item has been copied.
+
+    Items that are marked as deleted on DynamoDB are deleted from the local
+    table. Items without a `createdAt` timestamp cannot be found by the
+    high-water mark, so they are copied only by the first sync and by full
+    syncs, which read every item.
+
+    Parameters
+    ----------
+    table_key : str
+        The short name of the DynamoDB table (Tap or AudioTap).
+    full : bool, optional
+        Whether to read every item instead of only new ones, default False.
+
+    Returns
+    -------
+    int
+        The number of new items copied.
+    """
+    model = SYNC_TABLES[table_key]["model"]
+    columns = SYNC_TABLES[table_key]["columns"]
+    projection = [*columns, "_deleted"]
+
+    checkpoint = db.session.get(SyncCheckpoint, table_key)
+    if checkpoint is None:
+        checkpoint = SyncCheckpoint(table_key=table_key)
+        db.session.add(checkpoint)
+
+    start = get_sync_start(checkpoint.high_water_mark)
+    if full or start is None:
+        query = Query(table_key, projection=projection, include_deleted=True)
+    else:
+        # Deleted items are read whenever they were created, since deleting an
+        # item does not change its createdAt timestamp
+        query = Query(
+            table_key,
+            '(createdAt>=$start)OR~~"_deleted"',
+            projection=projection,
+            params={"start": start},
+            include_deleted=True,
+        )
+
+    segments = current_app.config["DYNAMODB_SCAN_SEGMENTS"]
+    high_water_mark = checkpoint.high_water_mark
+    copied = 0
+    deleted = 0
+    undated = 0
+
+    for page in query.iter_pages(segments=segments):
+        deleted_ids = [
+            item["id"] for item in page["Items"] if item.get("_deleted")
+        ]
+        if deleted_ids:
+            statement = delete(model).where(model.id.in_(deleted_ids))
+            deleted += db.session.execute(statement).rowcount
+
+        rows = [
+            {column: item.get(key) for key, column in columns.items()}
+            for item in page["Items"]
+            if not item.get("_deleted")
+        ]
+
+        # skip items that cannot be joined with a user
+        rows = [row for row in rows if row["user_id"] is not None]
+        if not rows:
+            continue
+
+        statement = (
+            insert(model)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+        copied += db.session.execute(statement).rowcount
+
+        created = [row["created_at"] for row in rows if row["created_at"]]
+        undated += len(rows) - len(created)
+        if created:
+            high_water_mark = max(high_water_mark or "", *created)
+
+    checkpoint.high_water_mark = high_water_mark
+    checkpoint.synced_on = datetime.now(UTC)
+    db.session.commit()
+
+    logger.info(
+        f"Copied {copied} new items from {table_key} and deleted {deleted}."
+    )
+    if undated:
+        logger.warning(
+            f"{undated} items from {table_key} have no createdAt and are copied"
+            " only by full syncs."
+        )
+
+    return copied
+
+
+def sync_taps(full=False):
+    """
+    Copy new items from every DynamoDB tap table to its local table.
+
+    The local tables are only as current as the last sync, so this must be run
+    on a schedule when `LOCAL_TAPS` is set, e.g., with the `sync-taps` command
+    from cron or with `handle_sync_event` from a scheduled Lambda event.
+
+    Parameters
+    ----------
+    full : bool, optional
+        Whether to read every item instead of only new ones, default False.
+
+    Returns
+    -------
+    dict
+        The number of new items copied from each table.
+    """
+    return {
+        table_key: sync_table(table_key, full=full) for table_key in SYNC_TABLES
+    }
+
+
+def handle_sync_event(event, context):  # noqa: ARG001
+    """
+    Sync the local tap tables from a scheduled Lambda event.
+
+    Parameters
+    ----------
+    event : dict
+        The event, which may set "full" to read every item.
+    context
+        The Lambda context.
+    """
+    # The app imports this module through its commands
+    from backend.app import create_app
+
+    with create_app().app_context():
+        sync_taps(full=event.get("full", False))
+
+
+def iter_local_items(
+    table_key,
+    user_ids,
+    start=None,
+    end=None,
+    before=None,
+    newest_first=False,
+    chunk_size=1000,
+):
+    """
+    Read the local copy of a DynamoDB table for a set of users.
+
+    Rows are read from the table's user index with a server-side cursor and
+    yielded as items with the same attribute names as on DynamoDB.
+
+    Parameters
+    ----------
+    table_key : str
+        The short name of the DynamoDB table (Tap or AudioTap).
+    user_ids : iterable of str
+        The DynamoDB IDs of the users to read items for.
+    start : str, optional
+        Read only items with a `time` at or after this timestamp.
+    end : str, optional
+        Read only items with a `time` before this timestamp.
+    before : tuple of (str or None, str), optional
+        Read only items that sort before this `time` and ID when reading newest
+        first, for resuming after the last item that was read. The time is None
+        if that item had no time.
+    newest_first : bool, optional
+        Whether to read items in descending order of `time` and ID, with items
+        without a `time` first, default False. Otherwise items are read in no
+        particular order.
+    chunk_size : int, optional
+        The number of rows to fetch from the database at a time, default 1000.
+
+    Yields
+    ------
+    dict
+        Each item belonging to one of the users.
+    """
+    model = SYNC_TABLES[table_key]["model"]
+    columns = SYNC_TABLES[table_key]["columns"]
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    statement = select(
+        *(getattr(model, column) for column in columns.values())
+    ).where(model.user_id.in_(user_ids))
+    if start is not None:
+        statement = statement.where(model.time >= start)
+    if end is not None:
+        statement = statement.where(model.time < end)
+    if before is not None:
+        before_time, before_id = before
+        if before_time is None:
+            # items without a time are read first, so every item with a time
+            # is still to be read
+            statement = statement.where(
+                or_(model.time.is_not(None), model.id < before_id)
+            )
+        else:
+            statement = statement.where(
+                tuple_(model.time, model.id) < tuple_(before_time, before_id)
+            )
+    if newest_first:
+        statement = statement.order_by(
+            model.time.desc().nulls_first(), model.id.desc()
+        )
+    statement = statement.execution_options(yield_per=chunk_size)
+
+    for row in db.session.execute(statement):
+        yield dict(zip(columns, row, strict=True))
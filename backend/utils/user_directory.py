@@ -0,0 +1,253 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import re
+
+from boto3.dynamodb.conditions import Key
+from flask import current_app
+
+from backend.extensions import cache
+from backend.utils.aws import Loader, Query
+
+# The attributes of each user that are kept in the directory
+USER_DIRECTORY_ATTRIBUTES = [
+    "id",
+    "user_permission_id",
+    "tap_permission",
+    "information",
+    "exp_time",
+    "team_email",
+    "createdAt",
+]
+
+# Returns the users of every study whose Ditti ID prefix is in $prefixes
+STUDY_USERS_QUERY = "user_permission_idBEGINS$prefixes"
+
+# The directory entry that holds every user
+ALL_USERS = "*"
+
+
+def get_cache_key(prefix):
+    """
+    Get the cache key of the directory entry for a study.
+
+    Parameters
+    ----------
+    prefix : str
+        The study's Ditti ID prefix, or `ALL_USERS`.
+
+    Returns
+    -------
+    str
+    """
+    return f"user_directory:{prefix}"
+
+
+def get_missing_key(user_permission_id):
+    """
+    Get the cache key that records that no user has a Ditti ID.
+
+    Parameters
+    ----------
+    user_permission_id : str
+
+    Returns
+    -------
+    str
+    """
+    return f"user_directory_missing:{user_permission_id}"
+
+
+def get_all_users():
+    """
+    Get every user.
+
+    Returns
+    -------
+    list of dict
+    """
+    key = get_cache_key(ALL_USERS)
+    users = cache.get(key)
+
+    if users is None:
+        users = Query("User", projection=USER_DIRECTORY_ATTRIBUTES).scan()[
+            "Items"
+        ]
+        cache.set(key, users, timeout=current_app.config["USER_DIRECTORY_TTL"])
+
+    return users
+
+
+def get_study_users(prefixes):
+    """
+    Get the users of a set of studies.
+
+    Each study's users are cached separately, so that only the studies that are
+    not cached are read from DynamoDB, in a single scan.
+
+    Parameters
+    ----------
+    prefixes : iterable of str
+        The Ditti ID prefix of each study.
+
+    Returns
+    -------
+    list of dict
+        Each user whose Ditti ID begins with one of the prefixes.
+    """
+    prefixes = list(dict.fromkeys(prefixes))
+    if not prefixes:
+        return []
+
+    cached = cache.get_many(*(get_cache_key(prefix) for prefix in prefixes))
+    directory = {
+        prefix: users
+        for prefix, users in zip(prefixes, cached, strict=True)
+        if users is not None
+    }
+
+    missing = [prefix for prefix in prefixes if prefix not in directory]
+    if missing:
+        items = Query(
+            "User",
+            STUDY_USERS_QUERY,
+            projection=USER_DIRECTORY_ATTRIBUTES,
+            params={"prefixes": missing},
+        ).scan()["Items"]
+
+        fetched = {prefix: [] for prefix in missing}
+        for item in items:
+            user_permission_id = item.get("user_permission_id", "")
+            for prefix in missing:
+                if user_permission_id.startswith(prefix):
+                    fetched[prefix].append(item)
+
+        cache.set_many(
+            {get_cache_key(prefix): users for prefix, users in fetched.items()},
+            timeout=current_app.config["USER_DIRECTORY_TTL"],
+        )
+        directory.update(fetched)
+
+    # a user can belong to more than one study if their prefixes overlap
+    users = {}
+    for prefix in prefixes:
+        for user in directory[prefix]:
+            users[user["id"]] = user
+
+    return list(users.values())
+
+
+def invalidate_users(*user_permission_ids):
+    """
+    Remove the directory entries that hold any of the given users.
+
+    This must be called whenever a user is created or edited.
+
+    Parameters
+    ----------
+    user_permission_ids : str
+        The Ditti IDs of the users. Empty values are ignored.
+    """
+    keys = {get_cache_key(ALL_USERS)}
+
+    # any prefix of a user's Ditti ID can be the prefix of a study they are in
+    for user_permission_id in user_permission_ids:
+        if user_permission_id:
+            keys.add(get_missing_key(user_permission_id))
+            keys.update(
+                get_cache_key(user_permission_id[:i])
+                for i in range(1, len(user_permission_id) + 1)
+            )
+
+    # delete keys one at a time, as delete_many stops at the first missing key
+    for key in keys:
+        cache.delete(key)
+
+
+def find_user(user_permission_id):
+    """
+    Find a user by their Ditti ID with a constant number of reads.
+
+    If the User table has a global secondary index on `user_permission_id`
+    (`AWS_USER_PERMISSION_ID_INDEX`), the user is read from it. Otherwise the
+    user's primary key is looked up in the user directory and the user is read
+    with GetItem. If the directory's entry for the user's study was cached and
+    turns out to be stale, it is refreshed once. Ditti IDs that are not found
+    are remembered for `USER_DIRECTORY_TTL` seconds, so that repeated lookups
+    of unknown IDs do not rescan the User table.
+
+    Parameters
+    ----------
+    user_permission_id : str
+        The user's Ditti ID.
+
+    Returns
+    -------
+    dict or None
+        The user, or None if no user has the Ditti ID.
+    """
+    loader = Loader("User")
+    loader.load_table()
+
+    index = current_app.config["AWS_USER_PERMISSION_ID_INDEX"]
+    if index:
+        res = loader.table.query(
+            IndexName=index,
+            KeyConditionExpression=Key("user_permission_id").eq(
+                user_permission_id
+            ),
+        )
+        return next(
+            (item for item in res["Items"] if not item.get("_deleted")), None
+        )
+
+    # the study's prefix is the Ditti ID without its digits
+    prefix = re.sub(r"[\d]+", "", user_permission_id)
+    missing_key = get_missing_key(user_permission_id)
+    if cache.get(missing_key) is not None:
+        return None
+
+    cached = cache.has(get_cache_key(prefix))
+
+    while True:
+        user = next(
+            (
+                user
+                for user in get_study_users([prefix])
+                if user.get("user_permission_id") == user_permission_id
+            ),
+            None,
+        )
+
+        if user is not None:
+            item = loader.table.get_item(
+                Key={"id": user["id"]}, ConsistentRead=True
+            ).get("Item")
+
+            if (
+                item is not None
+                and item.get("user_permission_id") == user_permission_id
+                and not item.get("_deleted")
+            ):
+                return item
+
+        if not cached:
+            cache.set(
+                missing_key,
+                True,
+                timeout=current_app.config["USER_DIRECTORY_TTL"],
+            )
+            return None
+
+        # the cached entry may be stale, so read it from DynamoDB once more
+        invalidate_users(user_permission_id)
+        cached = False
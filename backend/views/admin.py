@@ -20,7 +20,12 @@ from sqlalchemy import tuple_
 
 from backend.auth.controllers import ResearcherAuthController
 from backend.auth.decorators import researcher_auth_required
-from backend.extensions import db
+from backend.auth.utils.identity import (
+    PARTICIPANT,
+    RESEARCHER,
+    invalidate_identity,
+)
+from backend.extensions import cache, db
 from backend.models import (
     AboutSleepTemplate,
     AccessGroup,
@@ -41,6 +46,10 @@ from backend.models import (
     StudySubject,
 )
 from backend.utils.db import populate_model
+from backend.utils.permissions import (
+    invalidate_account_permissions,
+    invalidate_all_permissions,
+)
 from backend.utils.sanitization import sanitize_quill_html
 
 blueprint = Blueprint("admin", __name__, url_prefix="/admin")
@@ -406,6 +415,8 @@ def account_edit():
 
         # Commit database changes
         db.session.commit()
+        invalidate_account_permissions(edited_account.id)
+        invalidate_identity(RESEARCHER, edited_account.email)
 
         # Update Cognito user
         auth_controller = ResearcherAuthController()
@@ -480,6 +491,8 @@ def account_archive():
         # Archive account in database
         archived_account.is_archived = True
         db.session.commit()
+        invalidate_account_permissions(archived_account.id)
+        invalidate_identity(RESEARCHER, archived_account.email)
 
         # Disable account in Cognito
         auth_controller = ResearcherAuthController()
@@ -752,6 +765,7 @@ def study_archive():
         study = db.session.get(Study, study_id)
         study.is_archived = True
         db.session.commit()
+        invalidate_all_permissions()
         msg = "Study Archived Successfully"
 
     except Exception:
@@ -880,6 +894,7 @@ def access_group_create():
 
         db.session.add(access_group)
         db.session.commit()
+        invalidate_all_permissions()
         msg = "Access Group Created Successfully"
 
     except Exception:
@@ -969,6 +984,8 @@ def access_group_edit():
                 db.session.add(new_join)
 
         db.session.commit()
+
+        invalidate_all_permissions()
         msg = "Access Group Edited Successfully"
 
     except Exception:
@@ -1017,6 +1034,7 @@ def access_group_archive():
         access_group = db.session.get(AccessGroup, access_group_id)
         access_group.is_archived = True
         db.session.commit()
+        invalidate_all_permissions()
         msg = "Access Group Archived Successfully"
 
     except Exception:
@@ -1140,6 +1158,7 @@ def role_create():
 
         db.session.add(role)
         db.session.commit()
+        invalidate_all_permissions()
         msg = "Role Created Successfully"
 
     except Exception:
@@ -1220,6 +1239,7 @@ def role_edit():
 
         db.session.add(role)
         db.session.commit()
+        invalidate_all_permissions()
         msg = "Role Edited Successfully"
 
     except Exception:
@@ -1268,6 +1288,7 @@ def role_archive():
         role = db.session.get(Role, role_id)
         role.is_archived = True
         db.session.commit()
+        invalidate_all_permissions()
         msg = "Role Archived Successfully"
 
     except Exception:
@@ -1953,6 +1974,7 @@ def study_subject_archive():
 
         study_subject.is_archived = True
         db.session.commit()
+        invalidate_identity(PARTICIPANT, study_subject.ditti_id.lower())
         msg = "Study Subject Archived Successfully"
 
     except Exception:
@@ -2041,6 +2063,9 @@ def study_subject_edit():
                 400,
             )
 
+        # Both the old and new Ditti IDs must be invalidated once committed
+        ditti_ids = [study_subject.ditti_id.lower()]
+
         # Update ditti_id if provided
         if data and "ditti_id" in data:
             new_ditti_id = data["ditti_id"]
@@ -2213,6 +2238,8 @@ def study_subject_edit():
                     db.session.add(new_join_api)
 
         db.session.commit()
+        ditti_ids.append(study_subject.ditti_id.lower())
+        invalidate_identity(PARTICIPANT, *ditti_ids)
         msg = "Study Subject Edited Successfully"
 
     except Exception:
@@ -2489,3 +2516,24 @@ def api_archive():
         )
 
     return jsonify({"msg": msg})
+
+
+@blueprint.route("/cache")
+@researcher_auth_required("View", "Admin Dashboard")
+def cache_stats():
+    """
+    Get the hit and miss counts of the cache.
+
+    The cache's backend is shared by every process, but the counts are kept by
+    the process that serves this request only.
+
+    Response syntax (200)
+    ---------------------
+    {
+        type: str,
+        hits: int,
+        misses: int,
+        hitRate: float or null
+    }
+    """
+    return jsonify(cache.get_stats())
@@ -12,7 +12,6 @@
 
 import logging
 
-import boto3
 from botocore.exceptions import ClientError
 from flask import Blueprint, current_app, request
 
@@ -23,6 +22,7 @@ from backend.auth.utils.responses import (
     create_error_response,
     create_success_response,
 )
+from backend.utils.aws import registry
 
 blueprint = Blueprint(
     "participant_auth", __name__, url_prefix="/auth/participant"
@@ -147,7 +147,7 @@ def register_participant():
             - 400 Bad Request: Missing required fields.
             - 500 Internal Server Error: AWS Cognito or other server-side errors.
     """
-    client = boto3.client("cognito-idp")
+    client = registry.get_client("cognito-idp")
     data = request.json.get("data", {})
 
     try:
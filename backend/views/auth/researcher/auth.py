@@ -173,7 +173,7 @@ def get_access(account):
     study_id = request.args.get("study")
     action = request.args.get("action")
     resource = request.args.get("resource")
-    permissions = account.get_permissions(app_id, study_id)
+    permissions = account.get_permission_set(app_id, study_id)
 
     try:
         account.validate_ask(action, resource, permissions)
@@ -10,27 +10,402 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import base64
 import json
 import logging
 import os
 import re
 import traceback
 from contextlib import suppress
-from functools import reduce
+from itertools import islice
+from typing import NamedTuple
 
-import boto3
-import pandas as pd
 from botocore.exceptions import ClientError, NoCredentialsError
-from flask import Blueprint, current_app, jsonify, make_response, request
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    make_response,
+    request,
+    stream_with_context,
+)
 
 from backend.auth.decorators import researcher_auth_required
 from backend.extensions import db
 from backend.models import JoinAccountStudy, Study
-from backend.utils.aws import MutationClient, Query, Updater
+from backend.utils.aws import MutationClient, Query, Updater, registry
+from backend.utils.columnar import COLUMNAR_MIMETYPE, encode_columnar
+from backend.utils.join import build_index, hash_join
+from backend.utils.tap_summary import (
+    GRANULARITIES,
+    bin_taps,
+    get_summary_range,
+    get_timezone,
+    parse_timestamp,
+)
+from backend.utils.tap_sync import iter_local_items
+from backend.utils.user_directory import (
+    find_user,
+    get_all_users,
+    get_study_users,
+    invalidate_users,
+)
 
 blueprint = Blueprint("aws", __name__, url_prefix="/aws")
 logger = logging.getLogger(__name__)
 
+# The fields of each record returned by the tap views
+TAP_FIELDS = ["dittiId", "time", "timezone"]
+AUDIO_TAP_FIELDS = ["dittiId", "time", "timezone", "action", "audioFileTitle"]
+
+# The number of taps returned per page by default and at most
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
+# The attributes read from each DynamoDB table by the views below
+TAP_ATTRIBUTES = ["id", "tapUserId", "time", "timeZone"]
+AUDIO_FILE_ATTRIBUTES = ["id", "title"]
+AUDIO_TAP_ATTRIBUTES = [
+    "id",
+    "audioTapUserId",
+    "audioTapAudioFileId",
+    "time",
+    "timeZone",
+    "action",
+]
+
+
+def stream_json_array(records, chunk_size=1000):
+    """
+    Stream an iterable of records as a JSON array.
+
+    Records are serialized as they are produced and sent in chunks, so the
+    full response is never held in memory. The first record is read before
+    the response is returned so that errors raised while reading it result in
+    an error response rather than a truncated one.
+
+    Parameters
+    ----------
+    records : iterable of dict
+        The records to serialize.
+    chunk_size : int, optional
+        The number of records to send in each chunk, default 1000.
+
+    Returns
+    -------
+    flask.Response
+        A streamed JSON response.
+    """
+    records = iter(records)
+    first = next(records, None)
+
+    def generate():
+        yield "["
+        if first is None:
+            yield "]"
+            return
+
+        separator = ""
+        chunk = [current_app.json.dumps(first)]
+        for record in records:
+            chunk.append(current_app.json.dumps(record))
+            if len(chunk) == chunk_size:
+                yield separator + ",".join(chunk)
+                separator = ","
+                chunk = []
+
+        if chunk:
+            yield separator + ",".join(chunk)
+
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
+def get_visible_users(account):
+    """
+    Get the users of every study an account can view.
+
+    If the account has permission to view all studies, every user is returned.
+    Otherwise, only users of the studies the account has access to are
+    returned. Users are read from the user directory, which is only refreshed
+    from DynamoDB when its entries expire or are invalidated.
+
+    Parameters
+    ----------
+    account : Account
+        The authenticated researcher account. The app is read from the
+        request's `app` argument.
+
+    Returns
+    -------
+    list of dict
+        Each user, with the attributes in `USER_DIRECTORY_ATTRIBUTES`.
+    """
+    try:
+        # if the user has permission to view all studies, get all users
+        app_id = request.args["app"]
+        permissions = account.get_permission_set(app_id)
+        account.validate_ask("View", "All Studies", permissions)
+        return get_all_users()
+
+    except ValueError:
+        # get users only for the studies the user as access to
+        studies = (
+            Study.query.join(JoinAccountStudy)
+            .filter(JoinAccountStudy.account_id == account.id)
+            .all()
+        )
+
+        return get_study_users(s.ditti_id for s in studies)
+
+
+class TapOptions(NamedTuple):
+    """The time window and paging options of a request for taps."""
+
+    start: str | None = None
+    end: str | None = None
+    limit: int | None = None
+    cursor: dict | None = None
+    columnar: bool = False
+
+
+def encode_cursor(item):
+    """
+    Encode an opaque cursor for resuming after an item.
+
+    Parameters
+    ----------
+    item : dict
+        The last item that was returned.
+
+    Returns
+    -------
+    str
+    """
+    key = json.dumps({"id": item["id"], "time": item.get("time")})
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor that was returned with a page of items.
+
+    Parameters
+    ----------
+    cursor : str
+
+    Returns
+    -------
+    dict
+        The ID and time of the last item that was returned. The time is None
+        if the item had no time.
+
+    Raises
+    ------
+    ValueError
+        If the cursor is invalid.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError as err:
+        raise ValueError("Invalid cursor.") from err
+
+    if (
+        not isinstance(key, dict)
+        or not isinstance(key.get("id"), str)
+        or "time" not in key
+        or not isinstance(key["time"], str | None)
+    ):
+        raise ValueError("Invalid cursor.")
+
+    return key
+
+
+def get_tap_options():
+    """
+    Read the time window and paging options of a request for taps.
+
+    Returns
+    -------
+    TapOptions
+
+    Raises
+    ------
+    ValueError
+        If any option is invalid.
+    """
+    start = request.args.get("start")
+    if start is not None:
+        start = parse_timestamp(start, "start")
+
+    end = request.args.get("end")
+    if end is not None:
+        end = parse_timestamp(end, "end")
+
+    limit = request.args.get("limit")
+    cursor = request.args.get("cursor")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(
+                f"Invalid limit. Expected an integer from 1 to {MAX_PAGE_SIZE}."
+            )
+
+    elif cursor is not None:
+        limit = DEFAULT_PAGE_SIZE
+
+    if cursor is not None:
+        cursor = decode_cursor(cursor)
+
+    # encode the response as columns if asked to by the query or Accept header
+    best = request.accept_mimetypes.best_match(
+        ["application/json", COLUMNAR_MIMETYPE]
+    )
+    columnar = (
+        request.args.get("format") == "columnar" or best == COLUMNAR_MIMETYPE
+    )
+
+    return TapOptions(start, end, limit, cursor, columnar)
+
+
+def get_time_range_query(start=None, end=None):
+    """
+    Get a query for items with a `time` in [start, end).
+
+    Parameters
+    ----------
+    start : str, optional
+    end : str, optional
+
+    Returns
+    -------
+    tuple of (str, dict)
+        The query and its parameters, or (None, None) if neither bound is set.
+    """
+    conditions = []
+    params = {}
+
+    if start is not None:
+        conditions.append("(time>=$start)")
+        params["start"] = start
+
+    if end is not None:
+        conditions.append("(time<<$end)")
+        params["end"] = end
+
+    if not conditions:
+        return None, None
+
+    return "AND".join(conditions), params
+
+
+def iter_taps(table_key, projection, user_ids, options):
+    """
+    Read the taps within a time window.
+
+    The time window is applied by DynamoDB, or by the database when LOCAL_TAPS
+    is enabled. When paging, local taps are read newest first and DynamoDB taps
+    are read in table order, so that the cursor can resume where the last page
+    ended.
+
+    Taps read from DynamoDB are not filtered by user, so they must be joined
+    with the users they are returned for.
+
+    Parameters
+    ----------
+    table_key : str
+        The short name of the DynamoDB table (Tap or AudioTap).
+    projection : list of str
+        The attributes to read from DynamoDB.
+    user_ids : iterable of str
+        The IDs of the users to read local taps for.
+    options : TapOptions
+
+    Returns
+    -------
+    iterator of dict
+    """
+    paged = options.limit is not None
+
+    if current_app.config["LOCAL_TAPS"]:
+        before = None
+        if options.cursor is not None:
+            before = (options.cursor["time"], options.cursor["id"])
+
+        return iter_local_items(
+            table_key,
+            user_ids,
+            start=options.start,
+            end=options.end,
+            before=before,
+            newest_first=paged,
+        )
+
+    query, params = get_time_range_query(options.start, options.end)
+    kwargs = {}
+    if options.cursor is not None:
+        kwargs["ExclusiveStartKey"] = {"id": options.cursor["id"]}
+
+    # a paged scan must be read in order for the cursor to resume it
+    segments = 1 if paged else current_app.config["DYNAMODB_SCAN_SEGMENTS"]
+    return Query(
+        table_key, query, projection=projection, params=params
+    ).iter_items(segments=segments, **kwargs)
+
+
+def respond_with_taps(rows, to_record, fields, options):
+    """
+    Stream every tap, or return one page of taps and a cursor for the next.
+
+    When columnar encoding is requested, the records are encoded with
+    `encode_columnar` and returned whole rather than streamed.
+
+    Parameters
+    ----------
+    rows : iterator of tuple
+        The taps to return, joined with `hash_join`. The first element of each
+        row is the tap.
+    to_record : callable
+        Converts a row into the record that is returned for it.
+    fields : list of str
+        The fields of each record.
+    options : TapOptions
+
+    Returns
+    -------
+    flask.Response
+    """
+    if options.limit is None:
+        records = (to_record(*row) for row in rows)
+        if not options.columnar:
+            return stream_json_array(records)
+
+        payload = encode_columnar(records, fields, time_fields=["time"])
+        return Response(
+            current_app.json.dumps(payload), mimetype=COLUMNAR_MIMETYPE
+        )
+
+    page = list(islice(rows, options.limit))
+    cursor = None
+    if len(page) == options.limit:
+        cursor = encode_cursor(page[-1][0])
+
+    records = [to_record(*row) for row in page]
+    if not options.columnar:
+        return jsonify({"items": records, "cursor": cursor})
+
+    payload = {
+        "items": encode_columnar(records, fields, time_fields=["time"]),
+        "cursor": cursor,
+    }
+    return Response(current_app.json.dumps(payload), mimetype=COLUMNAR_MIMETYPE)
+
 
 @blueprint.route("/get-taps")
 @researcher_auth_required("View", "Ditti App Dashboard")
@@ -42,50 +417,69 @@ def get_taps(account):
     return all tap data. Otherwise, this will return tap data for only the
     studies the user has access to
 
+    If `limit` or `cursor` is passed, one page of taps is returned along with a
+    cursor for the next page, which is null once every tap has been returned.
+
     Options
     -------
     app: 2
+    start: iso-formatted timestamp (optional, inclusive)
+    end: iso-formatted timestamp (optional, exclusive)
+    limit: int (optional, 1 to 10000)
+    cursor: str (optional)
+    format: "columnar" (optional)
 
     Response Syntax (200)
     ---------------------
     [
         {
-            user_permission_id: str,
-            time: iso-formatted timestamp
+            dittiId: str,
+            time: iso-formatted timestamp,
+            timezone: str
         },
         ...
     ]
 
+    Response Syntax (200, paged)
+    ----------------------------
+    {
+        items: [...],
+        cursor: str | null
+    }
+
+    Response Syntax (200, columnar)
+    -------------------------------
+    Returned if `format` is "columnar" or the Accept header prefers
+    application/vnd.ditti.columnar+json. Records (or `items`, if paged) are
+    encoded with `backend.utils.columnar.encode_columnar`:
+    {
+        length: int,
+        columns: {
+            dittiId: {encoding: "dictionary", dictionary: [...], indices: [...]},
+            time: {encoding: "delta", unit: "ms", values: [...], nulls: [...]},
+            timezone: {encoding: "dictionary", dictionary: [...], indices: [...]}
+        }
+    }
+
+    Response syntax (400)
+    ---------------------
+    {
+        msg: a formatted message describing the invalid option
+    }
+
     Response syntax (500)
     ---------------------
     {
         msg: "Query failed due to internal server error."
     }
     """
-
-    # add expressions to the query to return all taps for multiple studies
-    def f(left, right):
-        q = f'user_permission_idBEGINS"{right}"'
-        return left + ("OR" if left else "") + q
-
     try:
-        # if the user has permission to view all studies, get all users
-        app_id = request.args["app"]
-        permissions = account.get_permissions(app_id)
-        account.validate_ask("View", "All Studies", permissions)
-        users = Query("User").scan()["Items"]
-
-    except ValueError:
-        # get users only for the studies the user as access to
-        studies = (
-            Study.query.join(JoinAccountStudy)
-            .filter(JoinAccountStudy.account_id == account.id)
-            .all()
-        )
+        options = get_tap_options()
+    except ValueError as e:
+        return make_response({"msg": str(e)}, 400)
 
-        prefixes = [s.ditti_id for s in studies]
-        query = reduce(f, prefixes, "")
-        users = Query("User", query).scan()["Items"]
+    try:
+        users = get_visible_users(account)
 
     except Exception:
         exc = traceback.format_exc()
@@ -95,28 +489,102 @@ def get_taps(account):
             {"msg": "Query failed due to internal server error."}, 500
         )
 
-    # get all taps
-    taps = Query("Tap").scan()["Items"]
-    df_users = pd.DataFrame(users, columns=["id", "user_permission_id"]).rename(
-        columns={"user_permission_id": "dittiId"}
-    )
+    # index users by ID and join each tap with its user
+    users = build_index(users, "id")
+    taps = iter_taps("Tap", TAP_ATTRIBUTES, users, options)
+    rows = hash_join(taps, ("tapUserId", users))
 
-    df_taps = pd.DataFrame(
-        taps, columns=["tapUserId", "time", "timeZone"]
-    ).rename(columns={"tapUserId": "id", "timeZone": "timezone"})
+    def to_record(tap, user):
+        # Old versions of the app record UTC timestamps
+        # Fill missing timezone values with the UTC timezone
+        timezone = tap.get("timeZone")
+        if timezone is None:
+            timezone = "GMT Universal Coordinated Time"
 
-    # Old versions of the app record UTC timestamps
-    # Fill missing timezone values with the UTC timezone
-    df_taps["timezone"] = df_taps["timezone"].fillna(
-        "GMT Universal Coordinated Time"
-    )
+        return {
+            "dittiId": user.get("user_permission_id"),
+            "time": tap.get("time"),
+            "timezone": timezone,
+        }
 
-    # merge on only the users that were returned earlier
-    res = (
-        pd.merge(df_users, df_taps, on="id").drop("id", axis=1).to_dict("records")
-    )
+    return respond_with_taps(rows, to_record, TAP_FIELDS, options)
 
-    return jsonify(res)
+
+@blueprint.route("/get-tap-summary")
+@researcher_auth_required("View", "Ditti App Dashboard")
+def get_tap_summary(account):
+    """
+    Get the number of taps by each user per hour or per day.
+
+    Taps are binned by local time in the requested timezone. Only bins with at
+    least one tap are returned.
+
+    Options
+    -------
+    app: 2
+    granularity: "hour" | "day"
+    start_date: str (YYYY-MM-DD)
+    end_date: str (YYYY-MM-DD, inclusive)
+    timezone: str (IANA name, default "UTC")
+
+    Response Syntax (200)
+    ---------------------
+    [
+        {
+            dittiId: str,
+            time: local start time of the bin (YYYY-MM-DDTHH:MM:SS),
+            count: int
+        },
+        ...
+    ]
+
+    Response syntax (400)
+    ---------------------
+    {
+        msg: a formatted message describing the invalid option
+    }
+
+    Response syntax (500)
+    ---------------------
+    {
+        msg: "Query failed due to internal server error."
+    }
+    """
+    granularity = request.args.get("granularity", "day")
+    if granularity not in GRANULARITIES:
+        return make_response({"msg": f"Invalid granularity: {granularity}"}, 400)
+
+    try:
+        timezone = get_timezone(request.args.get("timezone", "UTC"))
+        start, end = get_summary_range(
+            request.args.get("start_date"),
+            request.args.get("end_date"),
+            timezone,
+        )
+    except ValueError as e:
+        return make_response({"msg": str(e)}, 400)
+
+    try:
+        # index users by ID and join each tap with its user
+        users = build_index(get_visible_users(account), "id")
+        taps = iter_taps(
+            "Tap", TAP_ATTRIBUTES, users, TapOptions(start=start, end=end)
+        )
+
+        records = (
+            (user.get("user_permission_id"), tap["time"])
+            for tap, user in hash_join(taps, ("tapUserId", users))
+        )
+
+        return jsonify(bin_taps(records, granularity, timezone))
+
+    except Exception:
+        exc = traceback.format_exc()
+        logger.warning(exc)
+
+        return make_response(
+            {"msg": "Query failed due to internal server error."}, 500
+        )
 
 
 @blueprint.route("/get-audio-taps")
@@ -125,7 +593,8 @@ def get_audio_taps(account):
     """
     Get audio taps data from the database.
 
-    Retrieves audio tap data for studies the researcher has access to.
+    Retrieves audio tap data for studies the researcher has access to. Takes
+    the same time window and paging options as `get_taps`.
 
     Parameters
     ----------
@@ -137,30 +606,13 @@ def get_audio_taps(account):
     flask.Response
         JSON response containing audio taps data.
     """
-
-    # add expressions to the query to return all taps for multiple studies
-    def f(left, right):
-        q = f'user_permission_idBEGINS"{right}"'
-        return left + ("OR" if left else "") + q
-
     try:
-        # if the user has permission to view all studies, get all users
-        app_id = request.args["app"]
-        permissions = account.get_permissions(app_id)
-        account.validate_ask("View", "All Studies", permissions)
-        users = Query("User").scan()["Items"]
-
-    except ValueError:
-        # get users only for the studies the user as access to
-        studies = (
-            Study.query.join(JoinAccountStudy)
-            .filter(JoinAccountStudy.account_id == account.id)
-            .all()
-        )
+        options = get_tap_options()
+    except ValueError as e:
+        return make_response({"msg": str(e)}, 400)
 
-        prefixes = [s.ditti_id for s in studies]
-        query = reduce(f, prefixes, "")
-        users = Query("User", query).scan()["Items"]
+    try:
+        users = get_visible_users(account)
 
     except Exception:
         exc = traceback.format_exc()
@@ -170,46 +622,28 @@ def get_audio_taps(account):
             {"msg": "Query failed due to internal server error."}, 500
         )
 
-    # Get all audio files
-    audio_files = Query("AudioFile").scan()["Items"]
-
-    # Get all taps
-    audio_taps = Query("AudioTap").scan()["Items"]
-
-    df_users = pd.DataFrame(users, columns=["id", "user_permission_id"]).rename(
-        columns={"id": "userId", "user_permission_id": "dittiId"}
+    # index users and audio files by ID and join each audio tap with both
+    users = build_index(users, "id")
+    audio_files = build_index(
+        Query("AudioFile", projection=AUDIO_FILE_ATTRIBUTES).iter_items(), "id"
     )
-
-    df_audio_files = pd.DataFrame(audio_files, columns=["id", "title"]).rename(
-        columns={"id": "audioFileId", "title": "audioFileTitle"}
-    )
-
-    df_audio_taps = pd.DataFrame(
+    audio_taps = iter_taps("AudioTap", AUDIO_TAP_ATTRIBUTES, users, options)
+    rows = hash_join(
         audio_taps,
-        columns=[
-            "audioTapUserId",
-            "audioTapAudioFileId",
-            "time",
-            "timeZone",
-            "action",
-        ],
-    ).rename(
-        columns={
-            "audioTapUserId": "userId",
-            "audioTapAudioFileId": "audioFileId",
-            "timeZone": "timezone",
-        }
+        ("audioTapUserId", users),
+        ("audioTapAudioFileId", audio_files),
     )
 
-    # Merge on only the users that were returned earlier
-    res = (
-        df_users.merge(df_audio_taps, on="userId")
-        .merge(df_audio_files, on="audioFileId")
-        .drop(["userId", "audioFileId"], axis=1)
-        .to_dict("records")
-    )
+    def to_record(audio_tap, user, audio_file):
+        return {
+            "dittiId": user.get("user_permission_id"),
+            "time": audio_tap.get("time"),
+            "timezone": audio_tap.get("timeZone"),
+            "action": audio_tap.get("action"),
+            "audioFileTitle": audio_file.get("title"),
+        }
 
-    return jsonify(res)
+    return respond_with_taps(rows, to_record, AUDIO_TAP_FIELDS, options)
 
 
 @blueprint.route("/get-users")
@@ -247,11 +681,6 @@ def get_users(account):
     }
     """
 
-    # add expressions to the query to return all users for multiple studies
-    def f(left, right):
-        q = f'user_permission_idBEGINS"{right}"'
-        return left + ("OR" if left else "") + q
-
     # gets only useful user data
     def map_users(user):
         # if information is empty, use an empty string instead of None
@@ -266,25 +695,8 @@ def get_users(account):
             "createdAt": user["createdAt"],
         }
 
-    users = None
-
     try:
-        # if the user has permission to view all studies, get all studies
-        app_id = request.args["app"]
-        permissions = account.get_permissions(app_id)
-        account.validate_ask("View", "All Studies", permissions)
-        users = Query("User").scan()["Items"]
-        res = map(map_users, users)
-
-        return jsonify(list(res))
-
-    except ValueError:
-        # get only the studies the user has access to
-        studies = (
-            Study.query.join(JoinAccountStudy)
-            .filter(JoinAccountStudy.account_id == account.id)
-            .all()
-        )
+        users = get_visible_users(account)
 
     except Exception:
         exc = traceback.format_exc()
@@ -294,18 +706,7 @@ def get_users(account):
             {"msg": "Query failed due to internal server error."}, 500
         )
 
-    # get all users for the studies that were returned earlier
-    prefixes = [s.ditti_id for s in studies]
-
-    # If no studies were found, return an empty list
-    if not prefixes:
-        return jsonify([])
-
-    query = reduce(f, prefixes, "")
-    users = Query("User", query).scan()["Items"]
-    res = map(map_users, users)
-
-    return jsonify(list(res))
+    return jsonify(list(map(map_users, users)))
 
 
 @blueprint.route("/user/create", methods=["POST"])
@@ -362,6 +763,10 @@ def user_create():
             {"msg": "User creation failed due to internal server error."}, 500
         )
 
+    finally:
+        create = request.json.get("create") or {}
+        invalidate_users(create.get("user_permission_id"))
+
     return jsonify({"msg": msg})
 
 
@@ -446,16 +851,14 @@ def user_edit():
     if study and study_ditti_id != study.ditti_id:
         return jsonify({"msg": f"Invalid study Ditti ID: {study_ditti_id}"})
 
-    query = f'user_permission_id=="{user_permission_id}"'
-    res = Query("User", query).scan()
-
     # if the ditti id does not exist
-    if not res["Items"]:
+    user = find_user(user_permission_id)
+    if user is None:
         return jsonify({"msg": f"Ditti ID not found: {user_permission_id}"})
 
     try:
         updater = Updater("User")
-        updater.set_key_from_query(query)
+        updater.set_key({"id": user["id"]})
         updater.set_expression(request_data.get("edit"))
         updater.update()
 
@@ -467,6 +870,11 @@ def user_edit():
             {"msg": "User edit failed due to internal server error."}, 500
         )
 
+    finally:
+        # the user's Ditti ID may have been edited
+        edit = request_data.get("edit") or {}
+        invalidate_users(user_permission_id, edit.get("user_permission_id"))
+
     return jsonify({"msg": msg})
 
 
@@ -567,6 +975,10 @@ def audio_file_create():
         ]
     }
 
+    Audio files are created in chunks, which are posted to AppSync
+    concurrently. If any audio file is not created, the others are still
+    created and the failures are listed in the response.
+
     Response syntax (200)
     ---------------------
     {
@@ -578,6 +990,17 @@ def audio_file_create():
     {
         msg: "Creation of audio file failed due to internal server error."
     }
+    or
+    {
+        msg: "Creation of {n} of {total} audio files failed.",
+        errors: [
+            {
+                fileName: str,
+                error: str
+            },
+            ...
+        ]
+    }
     """
     msg = "Audio File Created Successfully"
 
@@ -590,12 +1013,7 @@ def audio_file_create():
 
         client = MutationClient()
         client.open_connection()
-        client.set_mutation_v2(items)
-        res = client.post_mutation()
-        data = json.loads(res)
-
-        if "data" not in data or not data["data"]:
-            raise Exception(data["errors"][0]["message"])
+        results = client.post_mutations_v2(items)
 
     except Exception:
         exc = traceback.format_exc()
@@ -608,6 +1026,22 @@ def audio_file_create():
             500,
         )
 
+    errors = [
+        {"fileName": result.item.get("fileName"), "error": result.error}
+        for result in results
+        if result.error is not None
+    ]
+    if errors:
+        logger.warning(f"Audio file creation failed: {errors}")
+        return make_response(
+            {
+                "msg": f"Creation of {len(errors)} of {len(results)} audio "
+                "files failed.",
+                "errors": errors,
+            },
+            500,
+        )
+
     return jsonify({"msg": msg})
 
 
@@ -648,15 +1082,15 @@ def audio_file_delete():
         # Get the audio file
         audio_file_id = request.json["id"]
         version = request.json["_version"]
-        audio_file = Query("AudioFile", f'id=="{audio_file_id}"').scan()["Items"][
-            0
-        ]
+        audio_file = Query(
+            "AudioFile", "id==$id", params={"id": audio_file_id}
+        ).scan()["Items"][0]
 
         # Try deleting the audio file from S3
         try:
             key = audio_file["fileName"]
             bucket = os.getenv("AWS_AUDIO_FILE_BUCKET")
-            client = boto3.client("s3")
+            client = registry.get_client("s3")
             deleted = client.delete_object(Bucket=bucket, Key=key)["DeleteMarker"]
 
             # Return an error if the audio file was not deleted
@@ -733,7 +1167,7 @@ def audio_file_generate_presigned_urls():
     }
     """
     try:
-        client = boto3.client("s3")
+        client = registry.get_client("s3")
         files = request.json["files"]
         urls = []
 
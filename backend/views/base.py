@@ -78,10 +78,10 @@ def touch():
     available = True
 
     if current_app.config["ENV"] == "production":
-        import boto3
+        from backend.utils.aws import registry
 
         # get the database's status
-        client = boto3.client("rds")
+        client = registry.get_client("rds")
         rds_id = os.getenv("AWS_DB_INSTANCE_IDENTIFIER")
         rds_res = client.describe_db_instances(DBInstanceIdentifier=rds_id)
         status = rds_res["DBInstances"][0]["DBInstanceStatus"]
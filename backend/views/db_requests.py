@@ -17,6 +17,7 @@ from flask import Blueprint, jsonify, make_response, request
 from sqlalchemy.sql import tuple_
 
 from backend.auth.decorators import researcher_auth_required
+from backend.auth.utils.identity import RESEARCHER, invalidate_identity
 from backend.extensions import db
 from backend.models import (
     AboutSleepTemplate,
@@ -92,7 +93,7 @@ def get_studies(account):
 
         # Two-tiered access control: permission-based or direct association
         try:
-            permissions = account.get_permissions(app_id)
+            permissions = account.get_permission_set(app_id)
             account.validate_ask("View", "All Studies", permissions)
             # User has global study access permission
             q = Study.query.filter(~Study.is_archived)
@@ -137,7 +138,7 @@ def get_study_details(account):
 
     try:
         # Check for global study access permission first
-        permissions = account.get_permissions(app_id)
+        permissions = account.get_permission_set(app_id)
         account.validate_ask("View", "All Studies", permissions)
         # Global access path: direct study lookup
         study = Study.query.get(study_id)
@@ -186,7 +187,7 @@ def get_study_contacts(account):
 
     try:
         # Dual access paths based on permissions
-        permissions = account.get_permissions(app_id)
+        permissions = account.get_permission_set(app_id)
         account.validate_ask("View", "All Studies", permissions)
         # For global access, retrieve study directly
         study = Study.query.get(study_id)
@@ -260,6 +261,7 @@ def edit_account_details(account):
         # Update the account in the database
         populate_model(account, account_data)
         db.session.commit()
+        invalidate_identity(RESEARCHER, account.email)
 
         # Synchronize changes with Cognito user pool
         from backend.auth.controllers.researcher import ResearcherAuthController
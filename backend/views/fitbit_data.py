@@ -10,14 +10,20 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import io
+import itertools
 import logging
 import traceback
-from datetime import datetime
 
-import pandas as pd
-from flask import Blueprint, jsonify, make_response, request, send_file
-from sqlalchemy import select, text
+from flask import (
+    Blueprint,
+    Response,
+    jsonify,
+    make_response,
+    request,
+    send_file,
+    stream_with_context,
+)
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 
 from backend.auth.decorators import (
@@ -25,13 +31,23 @@ from backend.auth.decorators import (
     researcher_auth_required,
 )
 from backend.extensions import cache, db
-from backend.models import SleepLevel, SleepLog, Study, StudySubject
+from backend.models import ExportTask, Study, StudySubject
+from backend.utils.export_task import create_export_task, get_download_url
 from backend.utils.fitbit_data import (
     cache_key_admin,
     cache_key_participant,
     get_fitbit_data_for_subject,
     validate_date_range,
 )
+from backend.utils.fitbit_export import (
+    EXPORT_FORMATS,
+    export_file,
+    get_download_name,
+    iter_csv,
+    iter_sleep_levels,
+    select_sleep_levels,
+    select_study_sleep_levels,
+)
 
 admin_fitbit_blueprint = Blueprint(
     "admin_fitbit_data", __name__, url_prefix="/admin/fitbit_data"
@@ -44,6 +60,55 @@ participant_fitbit_blueprint = Blueprint(
 logger = logging.getLogger(__name__)
 
 
+def get_export_format():
+    """
+    Get the export format of a download request.
+
+    Returns
+    -------
+        str: The `format` query parameter, default "xlsx", or None if it is
+            not one of `EXPORT_FORMATS`.
+    """
+    export_format = request.args.get("format", "xlsx")
+    return export_format if export_format in EXPORT_FORMATS else None
+
+
+def make_export_response(rows, name, export_format):
+    """
+    Export rows as a downloadable file.
+
+    CSV is streamed to the client as rows are read from the database. Excel
+    and Parquet files are written to a spooled temporary file first.
+
+    Parameters
+    ----------
+        rows (iterable of tuple): The rows to export.
+        name (str): The Ditti ID or study acronym to name the file after.
+        export_format (str): One of `EXPORT_FORMATS`.
+
+    Returns
+    -------
+        Response: The file as an attachment.
+    """
+    download_name = get_download_name(name, export_format)
+    mimetype = EXPORT_FORMATS[export_format]
+
+    if export_format in ("csv", "csv.gz"):
+        chunks = iter_csv(rows, compress=export_format == "csv.gz")
+        response = Response(stream_with_context(chunks), mimetype=mimetype)
+        response.headers.set(
+            "Content-Disposition", "attachment", filename=download_name
+        )
+        return response
+
+    return send_file(
+        export_file(rows, export_format),
+        as_attachment=True,
+        download_name=download_name,
+        mimetype=mimetype,
+    )
+
+
 @admin_fitbit_blueprint.route("/<string:ditti_id>", methods=["GET"])
 @researcher_auth_required("View", "Wearable Dashboard")
 @researcher_auth_required("View", "Wearable Data")
@@ -191,13 +256,17 @@ def participant_get_fitbit_data(ditti_id: str):
 @researcher_auth_required("View", "Wearable Data")
 def download_fitbit_participant(ditti_id: str):
     """
-    Download Fitbit API data for a single study participant as an Excel file.
+    Download Fitbit API data for a single study participant.
 
     This endpoint retrieves all Fitbit-related data for a participant identified
     by their Ditti ID (`ditti_id`). The data includes details such as sleep logs
-    and sleep levels, formatted for analysis in an Excel file. The Excel file is
-    generated with a timestamped filename and returned to the client
-    as a downloadable file.
+    and sleep levels, formatted for analysis in an Excel, CSV or Parquet file.
+    The file is generated with a timestamped filename and returned to the
+    client as a downloadable file.
+
+    Query Parameters:
+        format (str, optional): One of "xlsx" (default), "csv", "csv.gz" or
+            "parquet".
 
     Parameters
     ----------
@@ -205,28 +274,22 @@ def download_fitbit_participant(ditti_id: str):
 
     Returns
     -------
-        Response: A downloadable Excel file containing
+        Response: A downloadable file containing
             the participant's data or an error response in case of failure.
+        HTTP 400: If there are too many rows for an Excel file.
     """
+    export_format = get_export_format()
+    if export_format is None:
+        return make_response({"msg": "Invalid format."}, 400)
+
     try:
-        stmt = (
-            select(
-                StudySubject.ditti_id.label("Ditti ID"),
-                SleepLog.date_of_sleep.label("Sleep Log Date"),
-                SleepLevel.date_time.label("Sleep Level Timestamp"),
-                SleepLevel.level.label("Sleep Level Level"),
-                SleepLevel.seconds.label("Sleep Level Length (s)"),
-            )
-            .join(SleepLog, SleepLog.study_subject_id == StudySubject.id)
-            .join(SleepLevel, SleepLevel.sleep_log_id == SleepLog.id)
-            .where(StudySubject.ditti_id == ditti_id)
-            .order_by(StudySubject.ditti_id, SleepLevel.date_time)
-        )
+        stmt = select_sleep_levels(StudySubject.ditti_id == ditti_id)
 
-        # Execute the query and fetch the results
-        results = db.session.execute(stmt).all()
+        # Stream the results and check that there is at least one row
+        rows = iter_sleep_levels(stmt)
+        first = next(rows, None)
 
-        if len(results) == 0:
+        if first is None:
             return make_response(
                 {"msg": f"Participant with Ditti ID {ditti_id} not found."}, 200
             )
@@ -238,30 +301,15 @@ def download_fitbit_participant(ditti_id: str):
         )
 
     try:
-        # Convert the results to a Pandas DataFrame
-        data = [
-            {**dict(row), "Sleep Level Level": row["Sleep Level Level"].value}
-            for row in results
-        ]
-        df = pd.DataFrame(data)
-
-        # Save the DataFrame to a BytesIO object as an Excel file
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            df.to_excel(writer, index=False, sheet_name="Participant Data")
-        output.seek(0)
-
-        # Generate a timestamped filename
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-
-        # Return the Excel file as a response
-        return send_file(
-            output,
-            as_attachment=True,
-            download_name=f"{ditti_id}_Fitbit_{timestamp}.xlsx",
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        # Write the rows to the file as they are read
+        return make_export_response(
+            itertools.chain([first], rows), ditti_id, export_format
         )
 
+    except ValueError as ve:
+        # Too many rows for the requested format
+        return make_response({"msg": str(ve)}, 400)
+
     except Exception:
         logger.error(traceback.format_exc())
         return make_response("Internal server error when processing data.", 500)
@@ -270,26 +318,44 @@ def download_fitbit_participant(ditti_id: str):
 @admin_fitbit_blueprint.route("/download/study/<int:study_id>", methods=["GET"])
 @researcher_auth_required("View", "Wearable Dashboard")
 @researcher_auth_required("View", "Wearable Data")
-def download_fitbit_study(study_id: int):
+def download_fitbit_study(study_id: int, account):
     """
-    Download all participant Fitbit API data for a study as an Excel file.
+    Download all participant Fitbit API data for a study.
 
     This endpoint retrieves all Fitbit-related data for participants within a
     study identified by its unique `study_id`. The data includes details such as
     sleep logs and sleep levels for all participants with Ditti IDs that match
-    the study's prefix. The results are formatted for analysis in an Excel file.
-    The file is generated with a timestamped filename and returned to the client
-    as a downloadable file.
+    the study's prefix. The results are formatted for analysis in an Excel, CSV
+    or Parquet file. Excel files hold at most about one million rows, so use
+    CSV or Parquet for large studies. The file is generated with a timestamped
+    filename and returned to the client as a downloadable file.
+
+    Large studies can instead be exported in the background by passing
+    `async=true`. The export is written to S3 and its progress and download
+    URL are returned by `get_export_task`.
+
+    Query Parameters:
+        format (str, optional): One of "xlsx" (default), "csv", "csv.gz" or
+            "parquet".
+        async (str, optional): "true" to export in the background.
 
     Parameters
     ----------
         study_id (int): The unique identifier for the study.
+        account (Account): The authenticated account,
+            passed from researcher_auth_required.
 
     Returns
     -------
-        Response: A downloadable Excel file containing the study's
+        Response: A downloadable file containing the study's
         participants' data or an error response in case of failure.
+        HTTP 202: The background export task, if `async=true`.
+        HTTP 400: If there are too many rows for an Excel file.
     """
+    export_format = get_export_format()
+    if export_format is None:
+        return make_response({"msg": "Invalid format."}, 400)
+
     try:
         stmt = select(Study.ditti_id, Study.acronym).where(Study.id == study_id)
 
@@ -303,22 +369,19 @@ def download_fitbit_study(study_id: int):
         ditti_prefix = result.ditti_id
         acronym = result.acronym
 
-        stmt = (
-            select(
-                StudySubject.ditti_id.label("Ditti ID"),
-                SleepLog.date_of_sleep.label("Sleep Log Date"),
-                SleepLevel.date_time.label("Sleep Level Timestamp"),
-                SleepLevel.level.label("Sleep Level Level"),
-                SleepLevel.seconds.label("Sleep Level Length (s)"),
+        if request.args.get("async", "false").lower() == "true":
+            export_task = create_export_task(study_id, account.id, export_format)
+            if export_task is None:
+                return make_response({"msg": "Failed to start export."}, 500)
+
+            return make_response(
+                {"msg": "Export started.", "task": export_task.meta}, 202
             )
-            .join(SleepLog, SleepLog.study_subject_id == StudySubject.id)
-            .join(SleepLevel, SleepLevel.sleep_log_id == SleepLog.id)
-            # Return only exact ditti_prefix matches
-            .where(text(f"study_subject.ditti_id ~ '^{ditti_prefix}[0-9]'"))
-            .order_by(StudySubject.ditti_id, SleepLevel.date_time)
-        )
 
-        results = db.session.execute(stmt).all()
+        stmt = select_study_sleep_levels(ditti_prefix)
+
+        rows = iter_sleep_levels(stmt)
+        first = next(rows, None)
 
     except Exception:
         logger.error(traceback.format_exc())
@@ -327,30 +390,53 @@ def download_fitbit_study(study_id: int):
         )
 
     try:
-        # Convert the results to a Pandas DataFrame
-        data = [
-            {**dict(row), "Sleep Level Level": row["Sleep Level Level"].value}
-            for row in results
-        ]
-        df = pd.DataFrame(data)
-
-        # Save the DataFrame to a BytesIO object as an Excel file
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            df.to_excel(writer, index=False, sheet_name="Participant Data")
-        output.seek(0)
-
-        # Generate a timestamped filename
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-
-        # Return the Excel file as a response
-        return send_file(
-            output,
-            as_attachment=True,
-            download_name=f"{acronym}_Fitbit_{timestamp}.xlsx",
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        # Write the rows to the file as they are read
+        return make_export_response(
+            [] if first is None else itertools.chain([first], rows),
+            acronym,
+            export_format,
         )
 
+    except ValueError as ve:
+        # Too many rows for the requested format
+        return make_response({"msg": str(ve)}, 400)
+
     except Exception:
         logger.error(traceback.format_exc())
         return make_response("Internal server error when processing data.", 500)
+
+
+@admin_fitbit_blueprint.route("/export/<int:task_id>", methods=["GET"])
+@researcher_auth_required("View", "Wearable Dashboard")
+@researcher_auth_required("View", "Wearable Data")
+def get_export_task(task_id: int, account):
+    """
+    Get the progress of a background study export.
+
+    Parameters
+    ----------
+        task_id (int): The ID of the export task.
+        account (Account): The authenticated account,
+            passed from researcher_auth_required.
+
+    Returns
+    -------
+        JSON Response: The task and, once it succeeds, a presigned URL to
+            download the exported file.
+        HTTP 404: If the task does not exist or belongs to another account.
+        HTTP 500: If a server error occurs.
+    """
+    try:
+        export_task = db.session.get(ExportTask, task_id)
+        if export_task is None or export_task.account_id != account.id:
+            return make_response(
+                {"msg": f"Export task with ID {task_id} not found."}, 404
+            )
+
+        return jsonify(
+            {"task": export_task.meta, "url": get_download_url(export_task)}
+        )
+
+    except Exception:
+        logger.error(traceback.format_exc())
+        return make_response({"msg": "Unexpected server error."}, 500)
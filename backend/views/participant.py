@@ -12,7 +12,6 @@
 
 import logging
 
-import boto3
 from flask import Blueprint, current_app, jsonify, make_response, request
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -20,6 +19,7 @@ from backend.auth.decorators import (
     participant_auth_required,
     researcher_auth_required,
 )
+from backend.auth.utils.identity import PARTICIPANT, invalidate_identity
 from backend.extensions import db, tm
 from backend.models import (
     Api,
@@ -27,6 +27,7 @@ from backend.models import (
     JoinStudySubjectStudy,
     StudySubject,
 )
+from backend.utils.aws import registry
 from backend.utils.serialization import serialize_participant
 
 blueprint = Blueprint("participant", __name__, url_prefix="/participant")
@@ -356,9 +357,10 @@ def delete_participant(ditti_id: str):
 
         # Commit the changes
         db.session.commit()
+        invalidate_identity(PARTICIPANT, study_subject.ditti_id.lower())
 
         # Delete user from AWS Cognito
-        client = boto3.client("cognito-idp")
+        client = registry.get_client("cognito-idp")
         try:
             # Requires aws.cognito.signin.user.admin OpenID Connect scope
             client.admin_delete_user(
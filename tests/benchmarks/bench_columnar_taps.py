@@ -0,0 +1,76 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Payload size and parse time of row and columnar tap responses.
+
+Run with `python -m tests.benchmarks.bench_columnar_taps`. Taps are generated
+for a study of 200 participants across a handful of timezones, roughly one
+tap a minute for each participant while they are active.
+"""
+
+import json
+import timeit
+from datetime import UTC, datetime, timedelta
+
+from backend.utils.columnar import encode_columnar
+
+PARTICIPANTS = 200
+TAPS = 200_000
+TIMEZONES = [
+    "America/New_York",
+    "America/Chicago",
+    "America/Los_Angeles",
+    "GMT Universal Coordinated Time",
+]
+FIELDS = ["dittiId", "time", "timezone"]
+
+
+def generate_taps():
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    taps = []
+
+    for i in range(TAPS):
+        participant = i % PARTICIPANTS
+        # spread taps within each minute so that deltas are not uniform
+        jitter = (i * 7919 % 1000) / 1000
+        time = start + timedelta(seconds=60 * (i // PARTICIPANTS) + jitter)
+        taps.append(
+            {
+                "dittiId": f"FO{participant:03d}",
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+                "timezone": TIMEZONES[participant % len(TIMEZONES)],
+            }
+        )
+
+    return taps
+
+
+def main():
+    taps = generate_taps()
+    rows = json.dumps(taps)
+    columns = json.dumps(encode_columnar(taps, FIELDS, time_fields=["time"]))
+
+    rows_parse = min(timeit.repeat(lambda: json.loads(rows), number=1, repeat=5))
+    columns_parse = min(
+        timeit.repeat(lambda: json.loads(columns), number=1, repeat=5)
+    )
+
+    print(f"taps:                     {TAPS}")
+    print(f"rows payload:             {len(rows) / 1e6:.2f} MB")
+    print(f"columnar payload:         {len(columns) / 1e6:.2f} MB")
+    print(f"rows parse:               {rows_parse * 1000:.1f} ms")
+    print(f"columnar parse:           {columns_parse * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Per-page overhead of DynamoDB scans with and without the resource registry.
+
+Run with `python -m tests.benchmarks.bench_dynamodb_registry`. Each page is a
+scan of a single-item table against moto, so the timings are dominated by the
+cost of setting up the request rather than by DynamoDB itself.
+"""
+
+import os
+import timeit
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ["AWS_TABLENAME_USER"] = "benchmark_table_user"
+
+import boto3
+from moto import mock_aws
+
+from backend.utils.aws import Connection, Scanner, registry
+
+PAGES = 200
+
+
+def scan_with_new_connection():
+    connection = Connection()
+    connection.open_connection("dynamodb")
+    Scanner("User").scan(connection=connection)
+
+
+def scan_with_registry():
+    Scanner("User").scan()
+
+
+def main():
+    with mock_aws():
+        client = boto3.client("dynamodb")
+        client.create_table(
+            TableName="benchmark_table_user",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        client.put_item(TableName="benchmark_table_user", Item={"id": {"S": "1"}})
+
+        registry.clear()
+        before = timeit.timeit(scan_with_new_connection, number=PAGES)
+        after = timeit.timeit(scan_with_registry, number=PAGES)
+
+    print(f"pages per run:            {PAGES}")
+    print(f"new resource per page:    {before / PAGES * 1000:.2f} ms/page")
+    print(f"registry resource:        {after / PAGES * 1000:.2f} ms/page")
+    print(f"resources constructed:    {registry.constructions}")
+
+
+if __name__ == "__main__":
+    main()
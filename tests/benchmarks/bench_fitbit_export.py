@@ -0,0 +1,126 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Time and peak memory of exporting a study's sleep levels in each format.
+
+Run with `python -m tests.benchmarks.bench_fitbit_export`. Rows are generated
+for a synthetic study of 100 participants with 30 nights of sleep levels each,
+and are read lazily as if from a server-side cursor. The DataFrame export
+loads every row into a list of dicts and a DataFrame before writing the
+workbook to memory, as the download views used to. The other exports write
+each row to a constant memory workbook, CSV or Parquet row group as it is
+read. Time is measured without tracing memory.
+"""
+
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import pandas as pd
+
+from backend.utils.fitbit_export import (
+    EXPORT_COLUMNS,
+    export_parquet,
+    export_xlsx,
+    iter_csv,
+)
+
+PARTICIPANTS = 100
+NIGHTS = 30
+LEVELS = 30
+LEVEL_NAMES = ["wake", "light", "deep", "rem"]
+
+
+def generate_rows():
+    for participant in range(PARTICIPANTS):
+        ditti_id = f"FO{participant:03d}"
+        for night in range(NIGHTS):
+            date_of_sleep = date(2025, 1, 1) + timedelta(days=night)
+            start = datetime(2025, 1, 1, 23) + timedelta(days=night)
+            for i in range(LEVELS):
+                yield (
+                    ditti_id,
+                    date_of_sleep,
+                    start + timedelta(seconds=30 * i),
+                    LEVEL_NAMES[(participant + i) % len(LEVEL_NAMES)],
+                    30 * (1 + i % 10),
+                )
+
+
+def export_dataframe(rows):
+    data = [dict(zip(EXPORT_COLUMNS, row, strict=True)) for row in rows]
+    df = pd.DataFrame(data)
+
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False, sheet_name="Participant Data")
+    output.seek(0)
+    return output
+
+
+def export_csv(rows, compress=False):
+    # Write to disk as if each chunk were sent to the client
+    output = tempfile.TemporaryFile()  # noqa: SIM115
+    for chunk in iter_csv(rows, compress=compress):
+        output.write(chunk)
+    output.seek(0)
+    return output
+
+
+def export_csv_gz(rows):
+    return export_csv(rows, compress=True)
+
+
+EXPORTS = {
+    "xlsx (dataframe)": export_dataframe,
+    "xlsx": export_xlsx,
+    "csv": export_csv,
+    "csv.gz": export_csv_gz,
+    "parquet": export_parquet,
+}
+
+
+def measure(export):
+    start = time.perf_counter()
+    with export(generate_rows()) as output:
+        size = output.seek(0, io.SEEK_END)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    with export(generate_rows()):
+        _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak, size
+
+
+def main():
+    print(f"rows:                     {PARTICIPANTS * NIGHTS * LEVELS}")
+    print(f"{'format':<18}{'time':>8}{'peak':>12}{'size':>12}")
+    for name, export in EXPORTS.items():
+        elapsed, peak, size = measure(export)
+        print(
+            f"{name:<18}{elapsed:>7.1f}s{peak / 1e6:>9.1f} MB"
+            f"{size / 1e6:>9.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
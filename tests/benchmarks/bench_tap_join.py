@@ -0,0 +1,136 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Memory and latency of joining audio taps with users and audio files.
+
+Run with `python -m tests.benchmarks.bench_tap_join`. The pandas path builds a
+frame for each table and merges them before converting the result to records,
+as `get_audio_taps` used to. The hash join indexes users and audio files and
+streams audio taps through the indexes, as it does now. Peak memory is
+measured with tracemalloc and excludes the input rows.
+"""
+
+import time
+import tracemalloc
+
+import pandas as pd
+
+from backend.utils.join import build_index, hash_join
+
+USERS = 1_000
+AUDIO_FILES = 50
+AUDIO_TAPS = 200_000
+
+
+def generate():
+    users = [
+        {"id": f"user-{i}", "user_permission_id": f"FO{i:04d}"}
+        for i in range(USERS)
+    ]
+    audio_files = [
+        {"id": f"file-{i}", "title": f"Audio file {i}"}
+        for i in range(AUDIO_FILES)
+    ]
+    audio_taps = [
+        {
+            "id": f"tap-{i}",
+            "audioTapUserId": f"user-{i % USERS}",
+            "audioTapAudioFileId": f"file-{i % AUDIO_FILES}",
+            "time": "2025-01-01T09:00:00.000Z",
+            "timeZone": "America/New_York",
+            "action": "play",
+        }
+        for i in range(AUDIO_TAPS)
+    ]
+
+    return users, audio_files, audio_taps
+
+
+def join_with_pandas(users, audio_files, audio_taps):
+    users = pd.DataFrame(users)
+    audio_files = pd.DataFrame(audio_files)
+    audio_taps = pd.DataFrame(audio_taps)
+
+    df = audio_taps.merge(
+        users, how="inner", left_on="audioTapUserId", right_on="id"
+    ).merge(
+        audio_files,
+        how="inner",
+        left_on="audioTapAudioFileId",
+        right_on="id",
+    )
+    df = df[["user_permission_id", "time", "timeZone", "action", "title"]]
+    df.columns = ["dittiId", "time", "timezone", "action", "audioFileTitle"]
+
+    count = 0
+    for _ in df.to_dict("records"):
+        count += 1
+
+    return count
+
+
+def join_with_hash_join(users, audio_files, audio_taps):
+    rows = hash_join(
+        iter(audio_taps),
+        ("audioTapUserId", build_index(users, "id")),
+        ("audioTapAudioFileId", build_index(audio_files, "id")),
+    )
+
+    records = (
+        {
+            "dittiId": user["user_permission_id"],
+            "time": audio_tap["time"],
+            "timezone": audio_tap["timeZone"],
+            "action": audio_tap["action"],
+            "audioFileTitle": audio_file["title"],
+        }
+        for audio_tap, user, audio_file in rows
+    )
+
+    count = 0
+    for _ in records:
+        count += 1
+
+    return count
+
+
+def measure(join, *tables):
+    # time the join without tracing, which slows down allocations
+    start = time.perf_counter()
+    count = join(*tables)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    join(*tables)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return count, elapsed, peak
+
+
+def main():
+    tables = generate()
+
+    for name, join in [
+        ("pandas merge", join_with_pandas),
+        ("hash join", join_with_hash_join),
+    ]:
+        count, elapsed, peak = measure(join, *tables)
+        print(
+            f"{name:<14} {count} records  {elapsed * 1000:7.1f} ms  "
+            f"peak {peak / 1e6:6.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
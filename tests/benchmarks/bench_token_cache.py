@@ -0,0 +1,98 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Per-request cost of validating an ID token with and without the claims cache.
+
+Run with `python -m tests.benchmarks.bench_token_cache`. Each request validates
+the same RS256-signed ID token, as a dashboard does when it fires many API
+calls at once. The user pool's public key is already in the JWKS cache, so
+the timings cover decoding and verifying the token but not fetching keys.
+"""
+
+import os
+import time
+import timeit
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from flask import Flask
+
+from backend.auth.providers.cognito.base import CognitoAuthBase
+from backend.auth.utils.tokens import JwksEntry, claims_cache, jwks_cache
+
+REQUESTS = 2000
+REGION = "us-east-1"
+USER_POOL_ID = "benchmark-pool"
+CLIENT_ID = "benchmark-client"
+ISSUER = f"https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}"
+JWKS_URL = f"{ISSUER}/.well-known/jwks.json"
+
+
+def make_token(private_key):
+    now = int(time.time())
+    return jwt.encode(
+        {
+            "sub": "benchmark-user",
+            "email": "benchmark@example.com",
+            "token_use": "id",
+            "iss": ISSUER,
+            "aud": CLIENT_ID,
+            "iat": now,
+            "exp": now + 3600,
+        },
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "benchmark-kid"},
+    )
+
+
+def main():
+    app = Flask(__name__)
+    app.config.update(
+        COGNITO_RESEARCHER_REGION=REGION,
+        COGNITO_RESEARCHER_USER_POOL_ID=USER_POOL_ID,
+        COGNITO_RESEARCHER_CLIENT_ID=CLIENT_ID,
+    )
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwks_cache.entries[JWKS_URL] = JwksEntry(
+        {"benchmark-kid": private_key.public_key()}, time.monotonic()
+    )
+    token = make_token(private_key)
+    auth = CognitoAuthBase("researcher")
+
+    def validate_uncached():
+        claims_cache.clear()
+        success, _ = auth.validate_token_for_authenticated_route(token)
+        assert success
+
+    def validate_cached():
+        success, _ = auth.validate_token_for_authenticated_route(token)
+        assert success
+
+    with app.app_context():
+        before = min(timeit.repeat(validate_uncached, number=REQUESTS, repeat=3))
+        validate_uncached()
+        after = min(timeit.repeat(validate_cached, number=REQUESTS, repeat=3))
+
+    print(f"requests per run:         {REQUESTS}")
+    print(f"without claims cache:     {before / REQUESTS * 1e6:.1f} us/request")
+    print(f"with claims cache:        {after / REQUESTS * 1e6:.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
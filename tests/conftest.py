@@ -43,6 +43,7 @@ from backend.models import (
     init_api,
     init_db,
 )
+from backend.utils.aws import registry
 from tests.testing_utils import (
     create_joins,
     create_tables,
@@ -54,6 +55,14 @@ blueprint = Blueprint("test", __name__, url_prefix="/test")
 
 
 # Infrastructure fixtures
+@pytest.fixture(autouse=True)
+def clear_registry():
+    """Do not share boto3 clients, which may be mocks, between tests."""
+    registry.clear()
+    yield
+    registry.clear()
+
+
 @pytest.fixture
 def with_mocked_tables():
     """
@@ -62,6 +71,9 @@ def with_mocked_tables():
     Creates test tables and populates sample data, yielding the boto3 client.
     """
     with mock_aws():
+        # Do not reuse resources created outside of this mock
+        registry.clear()
+
         client = boto3.client("dynamodb")
         client.create_table(
             TableName="testing_table_user",
@@ -86,6 +98,77 @@ def with_mocked_tables():
         yield client
 
 
+@pytest.fixture
+def with_mocked_taps(with_mocked_tables, monkeypatch):
+    """Create mocked Tap, AudioFile and AudioTap tables with sample data."""
+    client = with_mocked_tables
+    monkeypatch.setenv("AWS_TABLENAME_AUDIO_FILE", "testing_table_audio_file")
+    monkeypatch.setenv("AWS_TABLENAME_AUDIO_TAP", "testing_table_audio_tap")
+
+    for table in (
+        "testing_table_tap",
+        "testing_table_audio_file",
+        "testing_table_audio_tap",
+    ):
+        client.create_table(
+            TableName=table,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+    # The researcher has access to study FO only
+    client.put_item(
+        TableName="testing_table_user",
+        Item={
+            "id": {"S": "2"},
+            "user_permission_id": {"S": "FO001"},
+            "tap_permission": {"BOOL": True},
+            "information": {"S": ""},
+            "exp_time": {"S": "2026-01-01T00:00:00.000Z"},
+            "team_email": {"S": "foo@email.com"},
+            "createdAt": {"S": "2025-01-01T00:00:00.000Z"},
+        },
+    )
+
+    taps = [
+        ("1", "2", "2025-01-01T09:00:00.000Z", "America/New_York"),
+        ("2", "2", "2025-01-01T10:00:00.000Z", None),
+        ("3", "1", "2025-01-01T11:00:00.000Z", "America/New_York"),
+    ]
+    for tap_id, user_id, time, timezone in taps:
+        item = {
+            "id": {"S": tap_id},
+            "tapUserId": {"S": user_id},
+            "time": {"S": time},
+            "createdAt": {"S": time},
+        }
+        if timezone is not None:
+            item["timeZone"] = {"S": timezone}
+        client.put_item(TableName="testing_table_tap", Item=item)
+
+    client.put_item(
+        TableName="testing_table_audio_file",
+        Item={"id": {"S": "1"}, "title": {"S": "foo"}},
+    )
+    audio_taps = [("1", "2", "1"), ("2", "1", "1"), ("3", "2", "2")]
+    for audio_tap_id, user_id, audio_file_id in audio_taps:
+        client.put_item(
+            TableName="testing_table_audio_tap",
+            Item={
+                "id": {"S": audio_tap_id},
+                "audioTapUserId": {"S": user_id},
+                "audioTapAudioFileId": {"S": audio_file_id},
+                "time": {"S": "2025-01-01T09:00:00.000Z"},
+                "timeZone": {"S": "America/New_York"},
+                "action": {"S": "play"},
+                "createdAt": {"S": f"2025-01-01T09:00:0{audio_tap_id}.000Z"},
+            },
+        )
+
+    return client
+
+
 # App and client fixtures
 @pytest.fixture
 def app(with_mocked_tables):
@@ -195,6 +278,9 @@ def base_cognito_auth():
     without requiring any actual AWS configuration.
     """
     from backend.auth.providers.cognito.base import CognitoAuthBase
+    from backend.auth.utils.tokens import claims_cache
+
+    claims_cache.clear()
 
     class TestCognitoAuth(CognitoAuthBase):
         """Test implementation of CognitoAuthBase for testing."""
@@ -160,6 +160,58 @@ class TestAccount:
         baz = foo.get_permissions(bar.id)
         foo.validate_ask("qux", "qaz", baz)
 
+    def test_compile_permissions(self, app):
+        q1 = Account.email == "bar@email.com"
+        q2 = AccessGroup.name == "bar"
+        q3 = Study.name == "bar"
+        foo = Account.query.filter(q1).first()
+        bar = AccessGroup.query.filter(q2).first()
+        baz = Study.query.filter(q3).first()
+
+        qux = foo.compile_permissions(bar.id, baz.id)
+        assert qux == {x.definition for x in foo.get_permissions(bar.id, baz.id)}
+        assert qux == {("bar", "baz"), ("bar", "qux")}
+
+        qux = foo.compile_permissions(bar.id)
+        assert qux == {x.definition for x in foo.get_permissions(bar.id)}
+
+    def test_compile_permissions_archived_study(self, app):
+        q1 = Account.email == "bar@email.com"
+        q2 = AccessGroup.name == "bar"
+        q3 = Study.name == "bar"
+        foo = Account.query.filter(q1).first()
+        bar = AccessGroup.query.filter(q2).first()
+        baz = Study.query.filter(q3).first()
+        baz.is_archived = True
+        db.session.commit()
+
+        qux = foo.compile_permissions(bar.id, baz.id)
+        assert qux == {x.definition for x in foo.get_permissions(bar.id, baz.id)}
+
+    def test_validate_ask_permission_set(self, app):
+        q1 = Account.email == "foo@email.com"
+        q2 = AccessGroup.name == "foo"
+        q3 = Study.name == "foo"
+        foo = Account.query.filter(q1).first()
+        bar = AccessGroup.query.filter(q2).first()
+        baz = Study.query.filter(q3).first()
+        qux = foo.get_permission_set(bar.id, baz.id)
+        foo.validate_ask("foo", "baz", qux)
+
+        with pytest.raises(ValueError, match="Unauthorized Ask"):
+            foo.validate_ask("bar", "baz", qux)
+
+    def test_validate_ask_permission_set_wildcard(self, app):
+        init_admin_app()
+        init_admin_group()
+        init_admin_account()
+        q1 = Account.email == "testing"
+        q2 = AccessGroup.name == "Admin"
+        foo = Account.query.filter(q1).first()
+        bar = AccessGroup.query.filter(q2).first()
+        baz = foo.get_permission_set(bar.id)
+        foo.validate_ask("qux", "qaz", baz)
+
 
 class TestDeletions:
     def test_delete_access_group(self, app):
@@ -10,8 +10,14 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import itertools
 import os
-from datetime import UTC, datetime, timedelta
+import threading
+import zipfile
+from datetime import UTC, date, datetime, timedelta
+from xml.etree import ElementTree
+
+import requests
 
 from backend.extensions import db
 from backend.models import (
@@ -29,9 +35,15 @@ from backend.models import (
     JoinStudySubjectStudy,
     Permission,
     Role,
+    SleepCategoryTypeEnum,
+    SleepLevel,
+    SleepLevelEnum,
+    SleepLog,
+    SleepLogTypeEnum,
     Study,
     StudySubject,
 )
+from backend.utils.tap_summary import format_timestamp
 
 # Validate the SQLAlchemy URI
 uri = os.getenv("FLASK_DB")
@@ -530,3 +542,169 @@ def mock_boto3_client(service_name, mock_methods=None):
     patcher.start()
 
     return mock_client
+
+
+# AppSync fakes
+AUDIO_FILE = {
+    "availability": "all",
+    "bucket": "bucket",
+    "category": "category",
+    "fileName": "foo.mp3",
+    "studies": "FO",
+    "length": "60",
+    "title": "foo",
+}
+
+
+class FakeAppSyncSession:
+    """
+    Respond to batched createAudioFile mutations like AppSync.
+
+    Items whose file name is in `fail` are rejected. A chunk containing the last
+    of them fails as a whole, as if the request had timed out.
+    """
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.bodies = []
+        self.lock = threading.Lock()
+
+    def request(self, method, url, json):
+        with self.lock:
+            self.bodies.append(json)
+
+        variables = json["variables"]
+        names = sorted(
+            (int(key[len("fileName") :]), value)
+            for key, value in variables.items()
+            if key.startswith("fileName")
+        )
+
+        if self.fail and max(self.fail) in dict(names).values():
+            raise requests.exceptions.Timeout("Request failed")
+
+        data = {}
+        errors = []
+        for index, name in names:
+            alias = f"CreateAudioFileOperation{index}"
+            if name in self.fail:
+                data[alias] = None
+                errors.append({"path": [alias], "message": f"Invalid {name}"})
+            else:
+                data[alias] = {"id": f"id-{name}"}
+
+        return FakeResponse({"data": data, "errors": errors})
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+def create_sleep_levels(ditti_id, nights=2, levels=3):
+    """
+    Create a study subject with a sleep log and sleep levels for each night.
+
+    Returns the number of sleep levels created.
+    """
+    study_subject = StudySubject(ditti_id=ditti_id)
+    db.session.add(study_subject)
+    db.session.flush()
+
+    for night in range(nights):
+        date_of_sleep = date(2025, 1, 1) + timedelta(days=night)
+        sleep_log = SleepLog(
+            study_subject_id=study_subject.id,
+            log_id=study_subject.id * 1000 + night,
+            date_of_sleep=date_of_sleep,
+            log_type=SleepLogTypeEnum.auto_detected,
+            type=SleepCategoryTypeEnum.stages,
+        )
+        db.session.add(sleep_log)
+        db.session.flush()
+
+        start = datetime(2025, 1, 1, 23) + timedelta(days=night)
+        for i in range(levels):
+            db.session.add(
+                SleepLevel(
+                    sleep_log_id=sleep_log.id,
+                    date_time=start + timedelta(minutes=30 * i),
+                    level=SleepLevelEnum.light,
+                    seconds=1800,
+                )
+            )
+
+    db.session.commit()
+    return nights * levels
+
+
+def read_xlsx(file):
+    """Read the rows of the first worksheet of an Excel file as strings."""
+    x = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+    # The workbooks are written by the tests themselves
+    with zipfile.ZipFile(file) as workbook:
+        strings = []
+        if "xl/sharedStrings.xml" in workbook.namelist():
+            root = ElementTree.fromstring(workbook.read("xl/sharedStrings.xml"))  # noqa: S314
+            strings = [si.findtext(f"{x}t") for si in root.iter(f"{x}si")]
+
+        sheet = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))  # noqa: S314
+
+    rows = []
+    for row in sheet.iter(f"{x}row"):
+        values = []
+        for cell in row.iter(f"{x}c"):
+            if cell.get("t") == "s":
+                values.append(strings[int(cell.findtext(f"{x}v"))])
+            elif cell.get("t") == "inlineStr":
+                values.append(cell.findtext(f"{x}is/{x}t"))
+            else:
+                values.append(cell.findtext(f"{x}v"))
+        rows.append(values)
+
+    return rows
+
+
+def decode_columnar(payload):
+    """
+    Decode records that were encoded with `encode_columnar`.
+
+    Timestamps are decoded in the format of tap timestamps on DynamoDB.
+
+    Parameters
+    ----------
+        payload (dict): The encoded records.
+
+    Returns
+    -------
+        list of dict: The records.
+    """
+    epoch = datetime(1970, 1, 1, tzinfo=UTC)
+    columns = {}
+    for field, column in payload["columns"].items():
+        if column["encoding"] == "delta":
+            nulls = set(column["nulls"])
+            columns[field] = [
+                None
+                if i in nulls
+                else format_timestamp(epoch + timedelta(milliseconds=value))
+                for i, value in enumerate(itertools.accumulate(column["values"]))
+            ]
+        else:
+            dictionary = column["dictionary"]
+            columns[field] = [
+                dictionary[index] if index >= 0 else None
+                for index in column["indices"]
+            ]
+
+    return [
+        {field: values[i] for field, values in columns.items()}
+        for i in range(payload["length"])
+    ]
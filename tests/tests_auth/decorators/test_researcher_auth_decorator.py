@@ -451,3 +451,54 @@ class TestResearcherAuthDecorator:
             assert data["account_id"] == 123
             assert data["msg"] == "OK"
             assert data["other_param"] == "test value"
+
+    @patch("backend.auth.decorators.researcher.get_token_from_request")
+    @patch("backend.auth.decorators.researcher.ResearcherAuthController")
+    def test_stacked_decorators_share_context(
+        self, MockController, mock_get_token, test_app
+    ):
+        """Test stacked checks authenticate and load permissions once."""
+        mock_get_token.return_value = "valid-token"
+        mock_controller = MagicMock()
+        MockController.return_value = mock_controller
+
+        mock_account = MagicMock()
+        mock_account.get_permission_set.return_value = frozenset()
+        mock_account.validate_ask.return_value = None
+        mock_controller.get_user_from_token.return_value = (mock_account, None)
+
+        # The view does not take the account, so it is not passed through kwargs
+        @researcher_auth_required("View", "Admin Dashboard")
+        @researcher_auth_required("View", "Ditti App Dashboard")
+        @researcher_auth_required("Edit", "Accounts")
+        def test_func():
+            return jsonify({"msg": "OK"})
+
+        with test_app.test_request_context("/test-func?app=2&study=1"):
+            response = test_func()
+
+        assert response.status_code == 200
+        mock_controller.get_user_from_token.assert_called_once()
+        mock_account.get_permission_set.assert_called_once_with("2", "1")
+        assert mock_account.validate_ask.call_count == 3
+
+    def test_signature_inspected_at_decoration(self, test_app):
+        """Test function signatures are not inspected on each request."""
+
+        @researcher_auth_required
+        def test_func(account):
+            return jsonify({"account_id": account.id})
+
+        mock_account = MagicMock()
+        mock_account.id = 123
+
+        with (
+            test_app.test_request_context("/test-func"),
+            patch(
+                "backend.auth.decorators.researcher.inspect.signature"
+            ) as mock_signature,
+        ):
+            response = test_func(account=mock_account)
+
+        assert response.get_json() == {"account_id": 123}
+        mock_signature.assert_not_called()
@@ -10,11 +10,15 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
 from unittest.mock import MagicMock, patch
 
+import jwt
 import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
 
 from backend.auth.providers.cognito.constants import AUTH_ERROR_MESSAGES
+from backend.auth.utils.tokens import JwksCache
 
 
 # Use the base_cognito_auth fixture from conftest.py
@@ -369,3 +373,94 @@ def test_validate_token_invalid_signature(
     # Verify
     assert success is False
     assert result == AUTH_ERROR_MESSAGES["auth_failed"]
+
+
+def test_validate_token_for_authenticated_route_caches_claims(
+    app, app_context, cognito_auth
+):
+    """Test a token is only verified on its first request."""
+    app.config.update(
+        TEST_COGNITO_REGION="us-east-1",
+        TEST_COGNITO_USER_POOL_ID="test-pool",
+        TEST_COGNITO_CLIENT_ID="test-client-id",
+    )
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    now = int(time.time())
+    token = jwt.encode(
+        {
+            "sub": "test-user-id",
+            "token_use": "id",
+            "iss": "https://cognito-idp.us-east-1.amazonaws.com/test-pool",
+            "aud": "test-client-id",
+            "iat": now,
+            "exp": now + 3600,
+        },
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "test-kid"},
+    )
+
+    with (
+        patch(
+            "backend.auth.providers.cognito.base.jwks_cache.get_key",
+            return_value=private_key.public_key(),
+        ) as mock_get_key,
+        patch("jwt.decode", wraps=jwt.decode) as mock_decode,
+    ):
+        first = cognito_auth.validate_token_for_authenticated_route(token)
+        second = cognito_auth.validate_token_for_authenticated_route(token)
+
+    assert first == second == (True, first[1])
+    assert first[1]["sub"] == "test-user-id"
+    mock_get_key.assert_called_once()
+    assert mock_decode.call_count == 2
+
+    # A tampered token is not served from the cache
+    success, result = cognito_auth.validate_token_for_authenticated_route(
+        token + "x"
+    )
+    assert success is False
+
+
+@pytest.mark.parametrize(
+    ("jwks", "message"),
+    [
+        (None, AUTH_ERROR_MESSAGES["system_error"]),
+        ({"keys": []}, AUTH_ERROR_MESSAGES["auth_failed"]),
+    ],
+)
+def test_validate_token_for_authenticated_route_no_key(
+    app, app_context, cognito_auth, jwks, message
+):
+    """Test a failed JWKS fetch is reported apart from an unknown key ID."""
+    app.config.update(
+        TEST_COGNITO_REGION="us-east-1",
+        TEST_COGNITO_USER_POOL_ID="test-pool",
+        TEST_COGNITO_CLIENT_ID="test-client-id",
+    )
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    now = int(time.time())
+    token = jwt.encode(
+        {
+            "sub": "test-user-id",
+            "token_use": "id",
+            "iss": "https://cognito-idp.us-east-1.amazonaws.com/test-pool",
+            "aud": "test-client-id",
+            "iat": now,
+            "exp": now + 3600,
+        },
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "test-kid"},
+    )
+
+    with (
+        patch("backend.auth.providers.cognito.base.jwks_cache", JwksCache()),
+        patch("backend.auth.utils.tokens.get_cognito_jwks", return_value=jwks),
+    ):
+        success, result = cognito_auth.validate_token_for_authenticated_route(
+            token
+        )
+
+    assert success is False
+    assert result == message
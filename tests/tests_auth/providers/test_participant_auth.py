@@ -19,7 +19,7 @@ from backend.auth.providers.cognito.constants import AUTH_ERROR_MESSAGES
 
 # Use the participant_auth_fixture from conftest.py
 @pytest.fixture
-def participant_auth(participant_auth_fixture):
+def participant_auth(participant_auth_fixture, app_context):
     """Return a participant auth instance."""
     return participant_auth_fixture
 
@@ -144,9 +144,8 @@ def test_get_study_subject_from_token(
     mock_validate.assert_called_once_with(
         mock_auth_test_data["fake_tokens"]["id_token"]
     )
-    # Use the positional args format instead of named kwargs
     participant_auth.get_study_subject_from_ditti_id.assert_called_once_with(
-        "ditti_12345", False
+        "ditti_12345", include_archived=True
     )
 
 
@@ -185,7 +184,7 @@ def test_get_study_subject_from_token_archived(
         mock_auth_test_data["fake_tokens"]["id_token"]
     )
     participant_auth.get_study_subject_from_ditti_id.assert_called_once_with(
-        "ditti_12345", False
+        "ditti_12345", include_archived=True
     )
 
 
@@ -251,7 +250,7 @@ def test_get_study_subject_from_token_not_found(
         mock_auth_test_data["fake_tokens"]["id_token"]
     )
     participant_auth.get_study_subject_from_ditti_id.assert_called_once_with(
-        "ditti_12345", False
+        "ditti_12345", include_archived=True
     )
 
 
@@ -17,7 +17,9 @@ from flask import Flask
 
 from backend.auth.utils.auth_helpers import (
     check_permissions,
+    get_auth_context,
     get_token_from_request,
+    set_auth_context,
 )
 
 
@@ -61,7 +63,7 @@ def test_check_permissions_allowed(mock_app):
     with mock_app.test_request_context(json={"resource": "Accounts"}):
         # Mock an account with sufficient permissions
         account = MagicMock()
-        account.get_permissions.return_value = ["some_permissions"]
+        account.get_permission_set.return_value = ["some_permissions"]
         # No exception means permission granted
         account.validate_ask.return_value = None
 
@@ -74,7 +76,7 @@ def test_check_permissions_allowed(mock_app):
         assert response is None
 
         # Verify correct permission checks were performed
-        account.get_permissions.assert_called_once()
+        account.get_permission_set.assert_called_once()
         account.validate_ask.assert_called_once_with(
             "Create", "Accounts", ["some_permissions"]
         )
@@ -85,7 +87,7 @@ def test_check_permissions_denied(mock_app):
     with mock_app.test_request_context(json={"resource": "Accounts"}):
         # Mock an account with insufficient permissions
         account = MagicMock()
-        account.get_permissions.return_value = ["some_permissions"]
+        account.get_permission_set.return_value = ["some_permissions"]
         account.validate_ask.side_effect = ValueError("Insufficient permissions")
         account.__str__.return_value = "user@example.com"
 
@@ -99,7 +101,39 @@ def test_check_permissions_denied(mock_app):
         assert response.status_code == 403
 
         # Verify correct permission checks were performed
-        account.get_permissions.assert_called_once()
+        account.get_permission_set.assert_called_once()
         account.validate_ask.assert_called_once_with(
             "Delete", "Accounts", ["some_permissions"]
         )
+
+
+def test_check_permissions_shares_context(mock_app):
+    """Test repeated checks in one request load permissions once."""
+    with mock_app.test_request_context(
+        method="POST", json={"app": 1, "study": 2}
+    ):
+        account = MagicMock()
+        account.get_permission_set.return_value = frozenset()
+        account.validate_ask.return_value = None
+
+        assert check_permissions(account, "View", "Admin Dashboard")[0]
+        assert check_permissions(account, "Edit", "Accounts")[0]
+
+        account.get_permission_set.assert_called_once_with(1, 2)
+        assert account.validate_ask.call_count == 2
+        assert get_auth_context().account is account
+
+
+def test_auth_context_is_request_scoped(mock_app):
+    """Test an auth context does not outlive its request."""
+    account = MagicMock()
+
+    with mock_app.app_context():
+        with mock_app.test_request_context():
+            assert get_auth_context() is None
+            context = set_auth_context(account)
+            assert get_auth_context() is context
+
+        # g is shared with the next request when the app context is reused
+        with mock_app.test_request_context():
+            assert get_auth_context() is None
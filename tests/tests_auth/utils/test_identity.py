@@ -0,0 +1,157 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import event
+
+from backend.auth.providers.cognito.participant import ParticipantAuth
+from backend.auth.providers.cognito.researcher import ResearcherAuth
+from backend.auth.utils.identity import (
+    PARTICIPANT,
+    RESEARCHER,
+    cache_identity,
+    get_cached_identity,
+    invalidate_identity,
+)
+from backend.extensions import db
+from backend.models import Account, StudySubject, init_study_subject
+
+VALIDATE = (
+    "backend.auth.providers.cognito.base.CognitoAuthBase."
+    "validate_token_for_authenticated_route"
+)
+
+
+@pytest.fixture
+def statements(app_context):
+    """Record the SQL statements that are executed."""
+    executed = []
+
+    def record(_conn, _cursor, statement, *_args):
+        executed.append(statement)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def end_request():
+    """Discard the session, as at the end of a request."""
+    db.session.remove()
+
+
+def test_cache_identity(app_context):
+    account = Account.query.filter_by(email="foo@email.com").first()
+    cache_identity(RESEARCHER, account.email, account)
+    end_request()
+
+    cached = get_cached_identity(RESEARCHER, "foo@email.com")
+    assert cached is not account
+    assert cached.id == account.id
+    assert cached in db.session
+
+    invalidate_identity(RESEARCHER, "foo@email.com")
+    assert get_cached_identity(RESEARCHER, "foo@email.com") is None
+
+
+def test_cache_identity_unpicklable(app_context):
+    cache_identity(RESEARCHER, "foo@email.com", MagicMock())
+    assert get_cached_identity(RESEARCHER, "foo@email.com") is None
+
+
+@patch(VALIDATE, return_value=(True, {"email": "foo@email.com"}))
+def test_researcher_identity_cached(mock_validate, statements):
+    auth = ResearcherAuth()
+    account, _ = auth.get_account_from_token("token")
+    account_id = account.id
+    end_request()
+
+    statements.clear()
+    account, error = auth.get_account_from_token("token")
+
+    assert error is None
+    assert account.id == account_id
+    assert account.email == "foo@email.com"
+    assert statements == []
+
+
+@patch(VALIDATE, return_value=(True, {"email": "foo@email.com"}))
+def test_researcher_identity_archived(mock_validate, app_context):
+    auth = ResearcherAuth()
+    account, _ = auth.get_account_from_token("token")
+    account.is_archived = True
+    db.session.commit()
+
+    # Stale until the account is invalidated
+    end_request()
+    assert auth.get_account_from_token("token")[0] is not None
+
+    invalidate_identity(RESEARCHER, "foo@email.com")
+    account, error = auth.get_account_from_token("token")
+    assert account is None
+    assert error == "Account unavailable. Please contact support."
+
+
+@patch(VALIDATE, return_value=(True, {"cognito:username": "Test001"}))
+def test_participant_identity_cached(mock_validate, statements):
+    init_study_subject("test001")
+    end_request()
+
+    auth = ParticipantAuth()
+    assert auth.get_study_subject_from_token("token")[0].ditti_id == "test001"
+    end_request()
+
+    statements.clear()
+    study_subject, error = auth.get_study_subject_from_token("token")
+
+    assert error is None
+    assert study_subject.ditti_id == "test001"
+    assert statements == []
+
+
+def test_account_archive_invalidates_identity(app, client, app_context):
+    from tests.testing_utils import mock_researcher_auth_for_testing
+
+    account = Account.query.filter_by(email="foo@email.com").first()
+    cache_identity(RESEARCHER, account.email, account)
+
+    headers = mock_researcher_auth_for_testing(client, is_admin=True)
+    response = client.post(
+        "/admin/account/archive",
+        json={"app": 1, "id": account.id},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert get_cached_identity(RESEARCHER, "foo@email.com") is None
+
+
+def test_study_subject_archive_invalidates_identity(app, client, app_context):
+    from tests.testing_utils import mock_researcher_auth_for_testing
+
+    init_study_subject("test001")
+    study_subject = StudySubject.query.filter_by(ditti_id="test001").first()
+    cache_identity(PARTICIPANT, "test001", study_subject)
+
+    headers = mock_researcher_auth_for_testing(client, is_admin=True)
+    response = client.post(
+        "/admin/study_subject/archive",
+        json={"app": 1, "id": study_subject.id},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert get_cached_identity(PARTICIPANT, "test001") is None
+    assert db.session.get(StudySubject, study_subject.id).is_archived
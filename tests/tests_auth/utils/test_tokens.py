@@ -10,15 +10,44 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import json
 import re
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
 from backend.auth.utils.tokens import (
+    ClaimsCache,
+    JwksCache,
     create_code_challenge,
     generate_code_verifier,
     get_cognito_jwks,
+    parse_jwks,
 )
 
+JWKS_URL = "https://example.com/.well-known/jwks.json"
+
+
+def make_jwk(kid):
+    """Make a JWK with a freshly generated RSA public key."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    return {**jwk, "kid": kid, "use": "sig", "alg": "RS256"}
+
+
+@pytest.fixture(scope="module")
+def jwks():
+    return {"keys": [make_jwk("kid-1"), make_jwk("kid-2")]}
+
+
+@pytest.fixture
+def cache():
+    return JwksCache()
+
 
 def test_generate_code_verifier():
     """Test PKCE code verifier meets OAuth 2.0 RFC 7636 requirements."""
@@ -55,8 +84,6 @@ def test_create_code_challenge():
 @patch("requests.get")
 def test_get_cognito_jwks(mock_get):
     """Test successful JWKS retrieval and response parsing."""
-    get_cognito_jwks.cache_clear()
-
     mock_response = MagicMock()
     mock_response.ok = True
     mock_response.status_code = 200
@@ -84,8 +111,6 @@ def test_get_cognito_jwks(mock_get):
 @patch("requests.get")
 def test_get_cognito_jwks_error(mock_get):
     """Test JWKS retrieval gracefully handles HTTP errors."""
-    get_cognito_jwks.cache_clear()
-
     mock_response = MagicMock()
     mock_response.ok = False
     mock_response.status_code = 404
@@ -99,32 +124,151 @@ def test_get_cognito_jwks_error(mock_get):
     )
 
 
-@patch("requests.get")
-def test_get_cognito_jwks_caching(mock_get):
-    """Test JWKS responses are properly cached to minimize HTTP requests."""
-    get_cognito_jwks.cache_clear()
+def test_parse_jwks(jwks):
+    """Test JWKS keys are parsed into public keys by key ID."""
+    keys = parse_jwks({"keys": [*jwks["keys"], {"kid": "bad", "n": "x"}]})
 
-    mock_response = MagicMock()
-    mock_response.ok = True
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "keys": [
-            {
-                "kid": "test-kid",
-                "kty": "RSA",
-                "n": "test-n",
-                "e": "AQAB",
-                "use": "sig",
-            }
-        ]
-    }
-    mock_get.return_value = mock_response
+    assert set(keys) == {"kid-1", "kid-2"}
+    assert (
+        keys["kid-1"].public_numbers()
+        == RSAAlgorithm.from_jwk(jwks["keys"][0]).public_numbers()
+    )
 
-    # Multiple calls should use cached response
-    jwks1 = get_cognito_jwks("https://example.com/.well-known/jwks.json")
-    jwks2 = get_cognito_jwks("https://example.com/.well-known/jwks.json")
 
-    mock_get.assert_called_once_with(
-        "https://example.com/.well-known/jwks.json", timeout=30
+@patch("backend.auth.utils.tokens.get_cognito_jwks")
+def test_jwks_cache_get_key(mock_get_jwks, cache, jwks):
+    """Test keys are fetched once per pool and parsed once."""
+    mock_get_jwks.return_value = jwks
+    other_url = "https://example.com/other/.well-known/jwks.json"
+
+    key = cache.get_key(JWKS_URL, "kid-1")
+    assert cache.get_key(JWKS_URL, "kid-1") is key
+    assert cache.get_key(JWKS_URL, "kid-2") is not None
+
+    # Alternating between pools does not evict either
+    cache.get_key(other_url, "kid-1")
+    assert cache.get_key(JWKS_URL, "kid-1") is key
+
+    assert mock_get_jwks.call_count == 2
+
+
+@patch("backend.auth.utils.tokens.get_cognito_jwks")
+def test_jwks_cache_unknown_kid(mock_get_jwks, cache, jwks):
+    """Test an unknown key ID refreshes the keys, but not too often."""
+    mock_get_jwks.return_value = {"keys": jwks["keys"][:1]}
+    assert cache.get_key(JWKS_URL, "kid-2") is None
+    assert not cache.fetch_failed(JWKS_URL)
+    assert mock_get_jwks.call_count == 1
+
+    # Keys fetched within min_refresh_interval are not refreshed
+    mock_get_jwks.return_value = jwks
+    assert cache.get_key(JWKS_URL, "kid-2") is None
+    assert mock_get_jwks.call_count == 1
+
+    # The key has since been rotated in
+    entry = cache.entries[JWKS_URL]
+    cache.entries[JWKS_URL] = entry._replace(
+        fetched_at=entry.fetched_at - cache.min_refresh_interval
     )
-    assert jwks1 == jwks2
+    assert cache.get_key(JWKS_URL, "kid-2") is not None
+    assert mock_get_jwks.call_count == 2
+
+
+@patch("backend.auth.utils.tokens.get_cognito_jwks")
+def test_jwks_cache_stale_fallback(mock_get_jwks, cache, jwks):
+    """Test expired keys are refreshed, and kept if the refresh fails."""
+    mock_get_jwks.return_value = jwks
+    key = cache.get_key(JWKS_URL, "kid-1")
+
+    entry = cache.entries[JWKS_URL]
+    cache.entries[JWKS_URL] = entry._replace(
+        fetched_at=time.monotonic() - cache.ttl
+    )
+
+    mock_get_jwks.return_value = None
+    assert cache.get_key(JWKS_URL, "kid-1") is key
+    assert mock_get_jwks.call_count == 2
+
+    mock_get_jwks.return_value = jwks
+    assert cache.get_key(JWKS_URL, "kid-1") is not key
+    assert mock_get_jwks.call_count == 3
+    assert time.monotonic() - cache.entries[JWKS_URL].fetched_at < cache.ttl
+
+
+@patch("backend.auth.utils.tokens.get_cognito_jwks")
+def test_jwks_cache_first_fetch_fails(mock_get_jwks, cache, jwks):
+    """Test a failed first fetch is not cached."""
+    mock_get_jwks.return_value = None
+    assert cache.get_key(JWKS_URL, "kid-1") is None
+    assert cache.fetch_failed(JWKS_URL)
+
+    mock_get_jwks.return_value = jwks
+    assert cache.get_key(JWKS_URL, "kid-1") is not None
+    assert not cache.fetch_failed(JWKS_URL)
+    assert mock_get_jwks.call_count == 2
+
+
+def test_jwks_cache_single_flight(cache, jwks):
+    """Test concurrent misses share a single fetch."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_get_jwks(jwks_url):
+        calls.append(jwks_url)
+        started.set()
+        release.wait(5)
+        return jwks
+
+    results = []
+    with patch(
+        "backend.auth.utils.tokens.get_cognito_jwks", side_effect=slow_get_jwks
+    ):
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.get_key(JWKS_URL, "kid-1"))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 8
+    assert all(result is results[0] for result in results)
+
+
+def test_claims_cache():
+    """Test verified claims are cached by token hash until they expire."""
+    cache = ClaimsCache()
+    claims = {"sub": "user", "exp": time.time() + 60}
+
+    assert cache.get("POOL", "token") is None
+    cache.set("POOL", "token", claims)
+    assert cache.get("POOL", "token") is claims
+    assert cache.get("OTHER_POOL", "token") is None
+    assert all("token" not in key for key in cache.entries)
+
+    cache.set("POOL", "expired", {"sub": "user", "exp": time.time() - 1})
+    assert cache.get("POOL", "expired") is None
+    assert len(cache.entries) == 1
+
+
+def test_claims_cache_eviction():
+    """Test the least recently used token is evicted when the cache is full."""
+    cache = ClaimsCache()
+    cache.maxsize = 2
+    exp = time.time() + 60
+
+    cache.set("POOL", "a", {"exp": exp})
+    cache.set("POOL", "b", {"exp": exp})
+    cache.get("POOL", "a")
+    cache.set("POOL", "c", {"exp": exp})
+
+    assert cache.get("POOL", "a") is not None
+    assert cache.get("POOL", "b") is None
+    assert cache.get("POOL", "c") is not None
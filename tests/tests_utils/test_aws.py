@@ -10,19 +10,28 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 import requests
 from moto import mock_aws
 
 from backend.utils.aws import (
     Column,
+    Combination,
+    Condition,
     Connection,
     Loader,
     MutationClient,
+    Parameter,
     Query,
+    ResourceRegistry,
     Scanner,
     Updater,
+    registry,
 )
+from tests.testing_utils import AUDIO_FILE, FakeAppSyncSession
 
 
 def assert_expression(exp, name, operator, *args):
@@ -80,6 +89,61 @@ class TestMutationClient:
         ):
             foo.post_mutation()
 
+    def test_open_connection_shared(self):
+        foo = MutationClient()
+        bar = MutationClient()
+        foo.open_connection()
+        bar.open_connection()
+        assert foo.get_connection() is bar.get_connection()
+
+    def test_build_mutation_v2(self):
+        body = MutationClient.build_mutation_v2([AUDIO_FILE, AUDIO_FILE])
+        assert "CreateAudioFileOperation2: createAudioFile" in body["query"]
+        assert body["variables"]["studies1"] == ["FO"]
+        assert body["variables"]["length2"] == 60
+
+    def test_post_mutations_v2(self, monkeypatch):
+        session = FakeAppSyncSession()
+        monkeypatch.setattr(MutationClient, "session", session)
+        items = [{**AUDIO_FILE, "fileName": f"{i}.mp3"} for i in range(5)]
+
+        results = MutationClient().post_mutations_v2(items, chunk_size=2)
+        assert [len(body["variables"]) // 7 for body in session.bodies] == [
+            2,
+            2,
+            1,
+        ]
+        assert [result.item for result in results] == items
+        assert all(result.error is None for result in results)
+        assert sorted(result.id for result in results) == [
+            "id-0.mp3",
+            "id-1.mp3",
+            "id-2.mp3",
+            "id-3.mp3",
+            "id-4.mp3",
+        ]
+
+    def test_post_mutations_v2_partial_failure(self, monkeypatch):
+        session = FakeAppSyncSession(fail={"1.mp3", "4.mp3"})
+        monkeypatch.setattr(MutationClient, "session", session)
+        items = [{**AUDIO_FILE, "fileName": f"{i}.mp3"} for i in range(5)]
+
+        results = MutationClient().post_mutations_v2(items, chunk_size=2)
+        assert [result.error for result in results] == [
+            None,
+            "Invalid 1.mp3",
+            None,
+            None,
+            "Request failed",
+        ]
+        assert results[1].id is None
+
+    def test_post_mutations_v2_invalid_chunk_size(self):
+        with pytest.raises(
+            ValueError, match="chunk_size must be a positive integer"
+        ):
+            MutationClient().post_mutations_v2([AUDIO_FILE], chunk_size=0)
+
     @pytest.mark.skip(reason="Must implement mock for graphql endpoint.")
     def test_post_mutation(self):
         foo = MutationClient()
@@ -135,6 +199,76 @@ class TestConnection:
         assert connection.session.meta.service_name == "dynamodb"
 
 
+@mock_aws
+class TestResourceRegistry:
+    def test_get_resource(self):
+        foo = ResourceRegistry()
+        resource = foo.get_resource("dynamodb")
+        assert resource.meta.service_name == "dynamodb"
+        assert foo.get_resource("dynamodb") is resource
+        assert foo.constructions == 1
+
+    def test_get_table(self):
+        foo = ResourceRegistry()
+        table = foo.get_table("testing_table_user")
+        assert table.name == "testing_table_user"
+        assert foo.get_table("testing_table_user") is table
+        assert foo.constructions == 1
+
+    def test_get_resource_per_thread(self):
+        foo = ResourceRegistry()
+        resource = foo.get_resource("dynamodb")
+        res = {}
+
+        def get():
+            res["resource"] = foo.get_resource("dynamodb")
+
+        thread = threading.Thread(target=get)
+        thread.start()
+        thread.join()
+        assert res["resource"] is not resource
+        assert foo.constructions == 2
+
+    def test_get_client(self):
+        foo = ResourceRegistry()
+        client = foo.get_client("s3")
+        assert client.meta.service_model.service_name == "s3"
+        assert foo.get_client("s3") is client
+        assert foo.constructions == 1
+
+    def test_get_client_config(self):
+        foo = ResourceRegistry()
+        client = foo.get_client("s3")
+        assert client.meta.config.max_pool_connections == 25
+        assert client.meta.config.retries["mode"] == "standard"
+        assert foo.get_client("s3", region_name="us-west-2") is not client
+        assert foo.get_client("s3", max_pool_connections=50) is not client
+        assert foo.constructions == 3
+
+    def test_get_client_shared_across_threads(self):
+        foo = ResourceRegistry()
+        client = foo.get_client("s3")
+        res = {}
+
+        def get():
+            res["client"] = foo.get_client("s3")
+
+        thread = threading.Thread(target=get)
+        thread.start()
+        thread.join()
+        assert res["client"] is client
+        assert foo.constructions == 1
+
+    def test_clear(self):
+        foo = ResourceRegistry()
+        resource = foo.get_resource("dynamodb")
+        client = foo.get_client("s3")
+        foo.clear()
+        assert foo.constructions == 0
+        assert foo.get_resource("dynamodb") is not resource
+        assert foo.get_client("s3") is not client
+
+
 @mock_aws
 class TestLoader:
     def test_get_tablename(self):
@@ -142,6 +276,12 @@ class TestLoader:
         for k, v in loader.config.items():
             assert loader.get_tablename(k) == v
 
+    def test_load_table_from_registry(self):
+        loader = Loader("User")
+        loader.load_table()
+        tablename = loader.get_tablename("User")
+        assert loader.table is registry.get_table(tablename)
+
     def test_load_table(self):
         connection = Connection()
         connection.open_connection("dynamodb")
@@ -167,6 +307,11 @@ class TestUpdater:
         bar = res["Items"][0]["id"]
         assert baz.get_key() == {"id": bar}
 
+    def test_set_key(self):
+        updater = Updater("User")
+        updater.set_key({"id": "1"})
+        assert updater.get_key() == {"id": "1"}
+
     @mock_aws
     def test_set_expression(self):
         foo = Updater()
@@ -268,6 +413,24 @@ class TestScanner:
         assert res["Count"]
         assert res["ResponseMetadata"]["HTTPStatusCode"] == 200
 
+    def test_scan_reuses_resource(self, with_mocked_tables):
+        registry.clear()
+        for _ in range(3):
+            Scanner("User").scan()
+
+        assert registry.constructions == 1
+
+    def test_project(self, with_mocked_tables):
+        res = Scanner("User").project(["id", "user_permission_id"]).scan()
+        assert res["Items"] == [{"id": "1", "user_permission_id": "abc123"}]
+
+    def test_build_projection(self):
+        res = Scanner.build_projection(["id", "time"])
+        assert res == {
+            "ProjectionExpression": "#p0, #p1",
+            "ExpressionAttributeNames": {"#p0": "id", "#p1": "time"},
+        }
+
 
 class TestQuery:
     def test_scan(self, with_mocked_tables):
@@ -276,6 +439,105 @@ class TestQuery:
         assert "Items" in res
         assert len(res["Items"]) == 1
 
+    def test_scan_projection(self, with_mocked_tables):
+        abc123 = 'user_permission_id=="abc123"'
+        res = Query("User", abc123, projection=["id"]).scan()
+        assert res["Items"] == [{"id": "1"}]
+
+    def test_scan_segments(self, with_mocked_tables):
+        for i in range(2, 51):
+            with_mocked_tables.put_item(
+                TableName="testing_table_user",
+                Item={
+                    "id": {"S": str(i)},
+                    "user_permission_id": {"S": f"abc{i:03}"},
+                    "information": {"S": ""},
+                },
+            )
+
+        res = Query("User").scan()
+        parallel = Query("User").scan(segments=4)
+        assert len(parallel["Items"]) == 50
+        assert sorted(item["id"] for item in parallel["Items"]) == sorted(
+            item["id"] for item in res["Items"]
+        )
+        assert parallel["ConsumedCapacity"] >= res["ConsumedCapacity"]
+
+    def test_iter_pages(self, with_mocked_tables):
+        pages = list(Query("User").iter_pages(Limit=1))
+        assert sum(len(page["Items"]) for page in pages) == 1
+        assert all("ConsumedCapacity" in page for page in pages)
+
+    def test_iter_items(self, with_mocked_tables):
+        for i in range(2, 21):
+            with_mocked_tables.put_item(
+                TableName="testing_table_user",
+                Item={"id": {"S": str(i)}, "user_permission_id": {"S": "abc"}},
+            )
+
+        items = list(Query("User").iter_items(segments=4, Limit=2))
+        assert sorted(int(item["id"]) for item in items) == list(range(1, 21))
+
+    def test_iter_items_start_key(self, with_mocked_tables):
+        for i in range(2, 21):
+            with_mocked_tables.put_item(
+                TableName="testing_table_user",
+                Item={"id": {"S": str(i)}, "user_permission_id": {"S": "abc"}},
+            )
+
+        items = list(Query("User").iter_items(Limit=2))
+        resumed = list(
+            Query("User").iter_items(ExclusiveStartKey={"id": items[4]["id"]})
+        )
+        assert resumed == items[5:]
+
+    def test_iter_items_stalled(self, with_mocked_tables, monkeypatch):
+        for i in range(2, 21):
+            with_mocked_tables.put_item(
+                TableName="testing_table_user",
+                Item={"id": {"S": str(i)}, "user_permission_id": {"S": "abc"}},
+            )
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(Query, "executor", executor)
+
+        # A consumer that stops reading does not hold the pool's only thread
+        stalled = Query("User").iter_items(segments=4, Limit=1)
+        assert next(stalled)
+
+        items = list(Query("User").iter_items(segments=4, Limit=1))
+        assert len(items) == 20
+
+        stalled.close()
+        executor.shutdown(wait=True)
+
+    def test_iter_items_reuses_resources(self, with_mocked_tables, monkeypatch):
+        executor = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(Query, "executor", executor)
+        registry.clear()
+
+        list(Query("User").iter_items(segments=4))
+        constructions = registry.constructions
+
+        # Every scan reuses the resources of the shared pool's threads
+        for _ in range(5):
+            list(Query("User").iter_items(segments=4))
+            assert registry.constructions == constructions
+
+        executor.shutdown(wait=True)
+
+    def test_scan_segments_invalid(self, with_mocked_tables):
+        with pytest.raises(
+            ValueError, match="segments must be a positive integer"
+        ):
+            Query("User").scan(segments=0)
+
+        # Raised when the iterator is created rather than when it is read
+        with pytest.raises(ValueError, match="segments"):
+            Query("User").iter_pages(segments=0)
+        with pytest.raises(ValueError, match="segments"):
+            Query("User").iter_items(segments=0)
+
     @mock_aws
     def test_check_query(self):
         invalid = '#user_permission_id=="abc123"'
@@ -306,16 +568,103 @@ class TestQuery:
         )
 
     @mock_aws
-    def test_build_blocks(self):
+    def test_build_query_cached(self):
+        query = 'foo=="bar"'
+        assert Query.build_query(query) is Query.build_query(query)
+
+    @mock_aws
+    def test_build_query_params(self):
+        exp = Query.build_query("fooBEGINS$prefix", {"prefix": "bar"})
+        assert_expression(exp, "foo", "begins_with", "bar")
+
+    @mock_aws
+    def test_build_query_params_list(self):
+        query = "fooBEGINS$prefixes"
+        exp = Query.build_query(query, {"prefixes": ["bar", "baz", "qux"]})
+        exp = exp.get_expression()["values"][0]
+        assert exp.expression_operator == "OR"
+        left, right = exp.get_expression()["values"]
+        assert_expression(right, "foo", "begins_with", "qux")
+        assert left.expression_operator == "OR"
+
+    @mock_aws
+    def test_build_query_include_deleted(self):
+        assert Query.build_query(None, include_deleted=True) is None
+
+        exp = Query.build_query('foo=="bar"', include_deleted=True)
+        assert exp.expression_operator == "="
+        assert exp.get_expression()["values"][0].name == "foo"
+        assert exp.get_expression()["values"][1] == "bar"
+
+    @mock_aws
+    def test_build_query_params_missing(self):
+        with pytest.raises(ValueError, match="Missing query parameter: prefix"):
+            Query.build_query("fooBEGINS$prefix", {})
+
+    @mock_aws
+    def test_tokenize(self):
+        query = '(a=="a"ORbBEGINS$b)AND~"c"'
+        tokens = [
+            ("open", "("),
+            ("key", "a"),
+            ("conditional", "=="),
+            ("value", "a"),
+            ("comparitor", "OR"),
+            ("key", "b"),
+            ("conditional", "BEGINS"),
+            ("parameter", "b"),
+            ("close", ")"),
+            ("comparitor", "AND"),
+            ("conditional", "~"),
+            ("value", "c"),
+        ]
+        assert Query.tokenize(query) == tokens
+
+    @mock_aws
+    def test_tokenize_invalid(self):
+        with pytest.raises(ValueError, match="Expected AND or OR at position 8"):
+            Query.tokenize('foo=="1"XORbar=="2"')
+
+    @mock_aws
+    def test_parse(self):
         query = '(a=="a"ORa=="b")AND(b=="a"AND(b=="b"ORb=="c"))'
-        blocks = ['a=="a"ORa=="b"', 'b=="b"ORb=="c"', 'b=="a"AND$1', "$0AND$2"]
-        assert Query.build_blocks(query) == blocks
+        tree = Combination(
+            "AND",
+            Combination(
+                "OR",
+                Condition("a", "==", ("a",)),
+                Condition("a", "==", ("b",)),
+            ),
+            Combination(
+                "AND",
+                Condition("b", "==", ("a",)),
+                Combination(
+                    "OR",
+                    Condition("b", "==", ("b",)),
+                    Condition("b", "==", ("c",)),
+                ),
+            ),
+        )
+        assert Query.parse(query) == tree
 
     @mock_aws
-    def test_build_expression(self):
-        blocks = ['foo=="bar"']
-        exp = Query.build_expression(blocks)
-        assert_expression(exp, "foo", "=", "bar")
+    def test_parse_left_to_right(self):
+        query = 'a=="a"ORa=="b"ANDfooBETWEEN"1"$stop'
+        tree = Combination(
+            "AND",
+            Combination(
+                "OR",
+                Condition("a", "==", ("a",)),
+                Condition("a", "==", ("b",)),
+            ),
+            Condition("foo", "BETWEEN", ("1", Parameter("stop"))),
+        )
+        assert Query.parse(query) == tree
+
+    @mock_aws
+    def test_parse_unclosed(self):
+        with pytest.raises(ValueError, match="unclosed parenthesis"):
+            Query.parse('(foo=="bar"')
 
     @mock_aws
     def test_get_expression_from_string_eq(self):
@@ -0,0 +1,118 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from functools import partial
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+from flask import Flask
+
+from backend.utils.cache import CountingCache
+
+
+def create_cache(**config):
+    """Create an app with its own cache, like a separate worker process."""
+    app = Flask(__name__)
+    app.config.update(config)
+    cache = CountingCache()
+    cache.init_app(app)
+    return app, cache
+
+
+def test_get_stats():
+    app, cache = create_cache(CACHE_TYPE="SimpleCache")
+
+    with app.app_context():
+        assert cache.get_stats() == {
+            "type": "SimpleCache",
+            "hits": 0,
+            "misses": 0,
+            "hitRate": None,
+        }
+
+        assert cache.get("foo") is None
+        cache.set("foo", {"bar": 1})
+        assert cache.get("foo") == {"bar": 1}
+        assert cache.get_many("foo", "baz", "qux") == [{"bar": 1}, None, None]
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 3
+        assert stats["hitRate"] == pytest.approx(0.4)
+
+        cache.reset_stats()
+        assert cache.get_stats()["hits"] == cache.get_stats()["misses"] == 0
+
+
+def test_get_stats_ignores_permission_versions():
+    app, cache = create_cache(CACHE_TYPE="SimpleCache")
+
+    with app.app_context():
+        cache.set("permissions_version:1", "foo")
+        cache.get("permissions_version:1")
+        cache.get_many("permissions_version:*", "bar")
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 0
+        assert stats["misses"] == 1
+
+
+def test_init_app_redis_fallback(tmp_path, caplog):
+    app, cache = create_cache(CACHE_TYPE="RedisCache", CACHE_DIR=str(tmp_path))
+    assert "CACHE_REDIS_URL is not set" in caplog.text
+
+    with app.app_context():
+        assert cache.get_stats()["type"] == "FileSystemCache"
+        cache.set("foo", {"bar": 1})
+        assert cache.get("foo") == {"bar": 1}
+
+
+def test_filesystem_cache_is_shared(tmp_path):
+    config = {"CACHE_TYPE": "FileSystemCache", "CACHE_DIR": str(tmp_path)}
+    app_1, cache_1 = create_cache(**config)
+    app_2, cache_2 = create_cache(**config)
+
+    with app_1.app_context():
+        cache_1.set("foo", {"bar": 1})
+
+    with app_2.app_context():
+        assert cache_2.get("foo") == {"bar": 1}
+        assert cache_2.get_stats()["hits"] == 1
+        cache_2.clear()
+
+    with app_1.app_context():
+        assert cache_1.get("foo") is None
+        assert cache_1.get_stats()["misses"] == 1
+
+
+def test_redis_cache_is_shared():
+    server = fakeredis.FakeServer()
+    config = {
+        "CACHE_TYPE": "RedisCache",
+        "CACHE_REDIS_URL": "redis://localhost:6379/0",
+        "CACHE_KEY_PREFIX": "ditti:",
+    }
+
+    from_url = partial(fakeredis.FakeRedis.from_url, server=server)
+    with patch("redis.from_url", side_effect=from_url):
+        app_1, cache_1 = create_cache(**config)
+        app_2, cache_2 = create_cache(**config)
+
+    with app_1.app_context():
+        cache_1.set("foo", {"bar": 1})
+
+    with app_2.app_context():
+        assert cache_2.get("foo") == {"bar": 1}
+        assert cache_2.get_stats()["type"] == "RedisCache"
+
+    assert fakeredis.FakeRedis(server=server).keys() == [b"ditti:foo"]
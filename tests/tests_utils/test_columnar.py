@@ -0,0 +1,82 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from backend.utils.columnar import encode_columnar
+from tests.testing_utils import decode_columnar
+
+RECORDS = [
+    {"dittiId": "FO001", "time": "2025-01-01T09:00:00.000Z", "timezone": "A"},
+    {"dittiId": "FO002", "time": "2025-01-01T09:00:01.500Z", "timezone": None},
+    {"dittiId": "FO001", "time": "2025-01-01T08:00:00.000Z", "timezone": "A"},
+]
+
+
+def test_encode_columnar():
+    payload = encode_columnar(RECORDS, ["dittiId", "time", "timezone"], ["time"])
+    assert payload == {
+        "length": 3,
+        "columns": {
+            "dittiId": {
+                "encoding": "dictionary",
+                "dictionary": ["FO001", "FO002"],
+                "indices": [0, 1, 0],
+            },
+            "time": {
+                "encoding": "delta",
+                "unit": "ms",
+                "values": [1735722000000, 1500, -3601500],
+                "nulls": [],
+            },
+            "timezone": {
+                "encoding": "dictionary",
+                "dictionary": ["A"],
+                "indices": [0, -1, 0],
+            },
+        },
+    }
+
+
+def test_encode_columnar_empty():
+    payload = encode_columnar([], ["dittiId", "time"], ["time"])
+    assert payload["length"] == 0
+    assert payload["columns"]["dittiId"]["indices"] == []
+    assert payload["columns"]["time"]["values"] == []
+    assert payload["columns"]["time"]["nulls"] == []
+
+
+def test_encode_columnar_null_times():
+    records = [
+        {"time": None},
+        {"time": "2025-01-01T09:00:00.000Z"},
+        {},
+        {"time": "2025-01-01T09:00:01.000Z"},
+    ]
+    payload = encode_columnar(records, ["time"], ["time"])
+
+    # Nulls do not change the deltas of the timestamps after them
+    assert payload["columns"]["time"] == {
+        "encoding": "delta",
+        "unit": "ms",
+        "values": [0, 1735722000000, 0, 1000],
+        "nulls": [0, 2],
+    }
+    assert decode_columnar(payload) == [
+        {"time": None},
+        {"time": "2025-01-01T09:00:00.000Z"},
+        {"time": None},
+        {"time": "2025-01-01T09:00:01.000Z"},
+    ]
+
+
+def test_decode_columnar():
+    fields = ["dittiId", "time", "timezone"]
+    assert decode_columnar(encode_columnar(RECORDS, fields, ["time"])) == RECORDS
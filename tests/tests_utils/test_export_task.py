@@ -0,0 +1,174 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import csv
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.extensions import db
+from backend.models import Account, ExportTask, Study
+from backend.utils import export_task as export_task_module
+from backend.utils.aws import registry
+from backend.utils.export_task import (
+    create_export_task,
+    get_download_url,
+    run_export_task,
+    submit_export_task,
+)
+from backend.utils.fitbit_export import EXPORT_COLUMNS
+from tests.testing_utils import create_sleep_levels
+
+BUCKET = "testing-exports"
+
+
+@pytest.fixture
+def bucket(app):
+    app.config["AWS_EXPORT_BUCKET"] = BUCKET
+    client = registry.get_client("s3")
+    client.create_bucket(Bucket=BUCKET)
+    return client
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(export_task_module, "executor", executor)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def study(app):
+    for ditti_id in ("FO001", "FO002", "BR001"):
+        create_sleep_levels(ditti_id)
+
+    return Study.query.filter(Study.ditti_id == "FO").first()
+
+
+@pytest.fixture
+def account(app):
+    return Account.query.filter_by(email="foo@email.com").first()
+
+
+def add_export_task(study, account, export_format="csv"):
+    export_task = ExportTask(
+        status="Pending",
+        study_id=study.id,
+        account_id=account.id,
+        format=export_format,
+    )
+    db.session.add(export_task)
+    db.session.commit()
+    return export_task
+
+
+def test_run_export_task(bucket, study, account, monkeypatch):
+    monkeypatch.setattr(export_task_module, "PROGRESS_INTERVAL", 4)
+    save_progress = MagicMock(wraps=export_task_module.save_progress)
+    monkeypatch.setattr(export_task_module, "save_progress", save_progress)
+    export_task = add_export_task(study, account)
+
+    result = run_export_task(export_task.id)
+    assert result.status == "Success"
+    assert result.rows_total == 12
+    assert result.rows_done == 12
+    assert result.completed_on is not None
+    assert result.file_key.startswith(f"exports/{export_task.id}/FOO_Fitbit_")
+
+    # Progress is saved every 4 rows and once more at the end
+    assert [c.args[1] for c in save_progress.call_args_list] == [4, 8, 12, 12]
+
+    obj = bucket.get_object(Bucket=BUCKET, Key=result.file_key)
+    assert obj["ContentType"] == "text/csv"
+    rows = list(csv.reader(io.StringIO(obj["Body"].read().decode())))
+    assert rows[0] == EXPORT_COLUMNS
+    assert {row[0] for row in rows[1:]} == {"FO001", "FO002"}
+
+
+def test_run_export_task_failed(app, study, account):
+    # The bucket does not exist
+    app.config["AWS_EXPORT_BUCKET"] = BUCKET
+    export_task = add_export_task(study, account)
+
+    result = run_export_task(export_task.id)
+    assert result.status == "Failed"
+    assert "NoSuchBucket" in result.error_code
+    assert result.file_key is None
+
+
+def test_run_export_task_not_found(app):
+    assert run_export_task(0) is None
+
+
+def test_create_export_task(bucket, executor, study, account):
+    export_task = create_export_task(study.id, account.id, "parquet")
+    assert export_task.meta["status"] == "Pending"
+    assert export_task.meta["format"] == "parquet"
+
+    executor.shutdown(wait=True)
+    db.session.refresh(export_task)
+    assert export_task.status == "Success"
+    assert export_task.file_key.endswith(".parquet")
+
+
+def test_submit_export_task_thread(bucket, executor, study, account):
+    export_task = add_export_task(study, account)
+
+    submit_export_task(export_task.id).result()
+    db.session.refresh(export_task)
+    assert export_task.status == "Success"
+
+
+def test_submit_export_task_lambda(app, study, account):
+    app.config["EXPORT_TASK_RUNNER"] = "lambda"
+    app.config["EXPORT_FUNCTION_NAME"] = "ditti-backend"
+    export_task = add_export_task(study, account)
+
+    with patch.object(
+        export_task_module.registry, "get_client"
+    ) as mock_get_client:
+        assert submit_export_task(export_task.id) is None
+
+    mock_get_client.assert_called_once_with("lambda")
+    kwargs = mock_get_client.return_value.invoke.call_args.kwargs
+    assert kwargs["FunctionName"] == "ditti-backend"
+    assert kwargs["InvocationType"] == "Event"
+    assert json.loads(kwargs["Payload"]) == {
+        "command": "backend.utils.export_task.handle_export_event",
+        "task_id": export_task.id,
+    }
+
+
+def test_submit_export_task_lambda_not_configured(app, study, account):
+    app.config["EXPORT_TASK_RUNNER"] = "lambda"
+    app.config["EXPORT_FUNCTION_NAME"] = None
+    export_task = add_export_task(study, account)
+
+    assert submit_export_task(export_task.id) is None
+    db.session.refresh(export_task)
+    assert export_task.status == "Failed"
+    assert export_task.error_code == "EXPORT_FUNCTION_NAME is not configured."
+
+
+def test_get_download_url(bucket, study, account):
+    export_task = add_export_task(study, account)
+    assert get_download_url(export_task) is None
+
+    export_task = run_export_task(export_task.id)
+    url = get_download_url(export_task)
+    assert BUCKET in url
+    assert export_task.file_key.split("/")[-1] in url
+    assert "response-content-disposition=attachment" in url
@@ -0,0 +1,184 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import csv
+import gzip
+import io
+from datetime import date, datetime
+
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import text
+
+from backend.extensions import db
+from backend.models import StudySubject
+from backend.utils import fitbit_export
+from backend.utils.fitbit_export import (
+    EXPORT_COLUMNS,
+    export_parquet,
+    export_xlsx,
+    iter_csv,
+    iter_sleep_levels,
+    select_sleep_levels,
+    select_study_sleep_levels,
+    write_parquet,
+    write_xlsx,
+)
+from tests.testing_utils import create_sleep_levels, read_xlsx
+
+ROW = ("FO001", date(2025, 1, 1), datetime(2025, 1, 1, 23), "light", 1800)
+
+
+def test_iter_sleep_levels(app_context):
+    count = create_sleep_levels("FO001")
+    create_sleep_levels("FO002")
+
+    stmt = select_sleep_levels(StudySubject.ditti_id == "FO001")
+    rows = list(iter_sleep_levels(stmt, batch_size=2))
+    assert len(rows) == count
+    assert rows[0] == ROW
+    assert rows == sorted(rows, key=lambda row: row[2])
+
+
+def test_iter_sleep_levels_empty(app_context):
+    stmt = select_sleep_levels(StudySubject.ditti_id == "FO001")
+    assert list(iter_sleep_levels(stmt)) == []
+
+
+def test_select_study_sleep_levels(app_context):
+    for ditti_id in ("FO001", "FO002", "FOO001", "FO", "BR001"):
+        create_sleep_levels(ditti_id, nights=1, levels=1)
+
+    rows = iter_sleep_levels(select_study_sleep_levels("FO"))
+    assert [row[0] for row in rows] == ["FO001", "FO002"]
+
+    # Prefixes are matched literally
+    assert list(iter_sleep_levels(select_study_sleep_levels("F_"))) == []
+    assert list(iter_sleep_levels(select_study_sleep_levels("%"))) == []
+
+
+def test_select_study_sleep_levels_uses_index(app_context):
+    compiled = select_study_sleep_levels("FO").compile(
+        dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    connection = db.session.connection()
+
+    # The tables are too small for the planner to choose an index otherwise
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN {compiled}", compiled.params
+    ).scalars()
+    plan = "\n".join(plan)
+    db.session.rollback()
+
+    # Either an index scan or a bitmap index scan may be chosen
+    assert "idx_study_subject_ditti_id_pattern" in plan
+    assert "~>=~ 'FO'::text" in plan
+
+
+def test_write_xlsx():
+    file = io.BytesIO()
+    write_xlsx(iter([ROW, ROW]), file)
+    rows = read_xlsx(file)
+
+    assert rows[0] == EXPORT_COLUMNS
+    assert len(rows) == 3
+    assert rows[1][0] == "FO001"
+    assert rows[1][3:] == ["light", "1800"]
+
+
+def test_write_xlsx_empty():
+    file = io.BytesIO()
+    write_xlsx([], file)
+    assert read_xlsx(file) == [EXPORT_COLUMNS]
+
+
+def test_write_xlsx_too_many_rows(monkeypatch):
+    monkeypatch.setattr(fitbit_export, "XLSX_MAX_ROWS", 3)
+    write_xlsx([ROW, ROW], io.BytesIO())
+
+    with pytest.raises(ValueError, match="Too many rows"):
+        write_xlsx([ROW, ROW, ROW], io.BytesIO())
+
+
+def test_write_parquet():
+    file = io.BytesIO()
+    write_parquet(iter([ROW] * 5), file, batch_size=2)
+    parquet = pq.ParquetFile(file)
+
+    assert parquet.schema_arrow.names == EXPORT_COLUMNS
+    assert parquet.num_row_groups == 3
+    assert parquet.read().to_pylist()[0] == dict(
+        zip(EXPORT_COLUMNS, ROW, strict=True)
+    )
+
+
+def test_write_parquet_empty():
+    file = io.BytesIO()
+    write_parquet([], file)
+    assert pq.read_table(file).num_rows == 0
+
+
+def test_iter_csv():
+    data = b"".join(iter_csv(iter([ROW, ROW]))).decode()
+    rows = list(csv.reader(io.StringIO(data)))
+
+    assert rows == [
+        EXPORT_COLUMNS,
+        ["FO001", "2025-01-01", "2025-01-01 23:00:00", "light", "1800"],
+        ["FO001", "2025-01-01", "2025-01-01 23:00:00", "light", "1800"],
+    ]
+
+
+def test_iter_csv_chunks(monkeypatch):
+    monkeypatch.setattr(fitbit_export, "CSV_CHUNK_SIZE", 100)
+    chunks = list(iter_csv([ROW] * 10))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 100 for chunk in chunks[:-1])
+    assert len(b"".join(chunks).decode().splitlines()) == 11
+
+
+def test_iter_csv_compress(monkeypatch):
+    monkeypatch.setattr(fitbit_export, "CSV_CHUNK_SIZE", 100)
+    data = b"".join(iter_csv([ROW] * 10, compress=True))
+
+    assert gzip.decompress(data) == b"".join(iter_csv([ROW] * 10))
+
+
+def test_export_xlsx():
+    with export_xlsx([ROW]) as file:
+        assert file.tell() == 0
+        assert not file._rolled
+        assert len(read_xlsx(file)) == 2
+
+
+def test_export_xlsx_spools_to_disk(monkeypatch):
+    monkeypatch.setattr(fitbit_export, "SPOOL_MAX_SIZE", 1024)
+    with export_xlsx([ROW] * 1000) as file:
+        assert file._rolled
+        assert len(read_xlsx(file)) == 1001
+
+
+def test_export_xlsx_error():
+    def rows():
+        yield ROW
+        raise ValueError("foo")
+
+    with pytest.raises(ValueError, match="foo"):
+        export_xlsx(rows())
+
+
+def test_export_parquet():
+    with export_parquet([ROW]) as file:
+        assert file.tell() == 0
+        assert pq.read_table(file).num_rows == 1
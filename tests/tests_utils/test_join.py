@@ -0,0 +1,55 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from backend.utils.join import build_index, hash_join
+
+USERS = [
+    {"id": "1", "user_permission_id": "FO001"},
+    {"id": "2", "user_permission_id": "FO002"},
+    {"user_permission_id": "FO003"},
+]
+AUDIO_FILES = [{"id": "a", "title": "foo"}]
+
+
+def test_build_index():
+    index = build_index(USERS, "id")
+    assert index == {"1": USERS[0], "2": USERS[1]}
+
+
+def test_hash_join():
+    taps = [
+        {"id": "1", "tapUserId": "1"},
+        {"id": "2", "tapUserId": "3"},
+        {"id": "3"},
+        {"id": "4", "tapUserId": "2"},
+    ]
+    users = build_index(USERS, "id")
+
+    assert list(hash_join(taps, ("tapUserId", users))) == [
+        (taps[0], USERS[0]),
+        (taps[3], USERS[1]),
+    ]
+
+
+def test_hash_join_many():
+    audio_taps = [
+        {"id": "1", "audioTapUserId": "1", "audioTapAudioFileId": "a"},
+        {"id": "2", "audioTapUserId": "1", "audioTapAudioFileId": "b"},
+        {"id": "3", "audioTapUserId": "4", "audioTapAudioFileId": "a"},
+    ]
+    rows = hash_join(
+        iter(audio_taps),
+        ("audioTapUserId", build_index(USERS, "id")),
+        ("audioTapAudioFileId", build_index(AUDIO_FILES, "id")),
+    )
+
+    assert list(rows) == [(audio_taps[0], USERS[0], AUDIO_FILES[0])]
@@ -54,7 +54,7 @@ def mock_query():
 
 @pytest.fixture
 def mock_boto3_client():
-    with patch("backend.utils.lambda_task.boto3.client") as mock_client:
+    with patch("backend.utils.lambda_task.registry.get_client") as mock_client:
         yield mock_client
 
 
@@ -307,7 +307,7 @@ def test_check_and_invoke_lambda_task_exception(
 
 
 @patch("backend.utils.lambda_task.db.session")
-@patch("backend.utils.lambda_task.boto3.client")
+@patch("backend.utils.lambda_task.registry.get_client")
 @patch("backend.utils.lambda_task.datetime")
 def test_invoke_lambda_task_success(
     mock_datetime, mock_boto3_client, mock_db_session, app, fixed_datetime
@@ -345,7 +345,7 @@ def test_invoke_lambda_task_success(
 
 
 @patch("backend.utils.lambda_task.db.session")
-@patch("backend.utils.lambda_task.boto3.client")
+@patch("backend.utils.lambda_task.registry.get_client")
 @patch("backend.utils.lambda_task.datetime")
 def test_invoke_lambda_task_missing_function_name(
     mock_datetime, mock_boto3_client, mock_db_session, app, fixed_datetime
@@ -375,7 +375,7 @@ def test_invoke_lambda_task_missing_function_name(
 
 
 @patch("backend.utils.lambda_task.db.session")
-@patch("backend.utils.lambda_task.boto3.client")
+@patch("backend.utils.lambda_task.registry.get_client")
 @patch("backend.utils.lambda_task.datetime")
 def test_invoke_lambda_task_lambda_invoke_exception(
     mock_datetime, mock_boto3_client, mock_db_session, app, fixed_datetime
@@ -0,0 +1,159 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from unittest.mock import patch
+
+import pytest
+
+from backend.extensions import cache, db
+from backend.models import AccessGroup, Account, JoinAccountAccessGroup
+from backend.utils import permissions as permissions_module
+from backend.utils.permissions import (
+    GLOBAL_VERSION_KEY,
+    get_permission_set,
+    get_permission_sets,
+    get_version,
+    has_permission,
+    invalidate_account_permissions,
+    invalidate_all_permissions,
+)
+
+
+@pytest.fixture
+def account(app):
+    return Account.query.filter(Account.email == "foo@email.com").first()
+
+
+@pytest.fixture
+def access_group(app):
+    return AccessGroup.query.filter(AccessGroup.name == "foo").first()
+
+
+@pytest.fixture
+def compiles():
+    with patch.object(
+        Account,
+        "compile_permissions",
+        autospec=True,
+        side_effect=Account.compile_permissions,
+    ) as mock_compile:
+        yield mock_compile
+
+
+def test_has_permission():
+    permissions = frozenset({("View", "Taps"), ("Edit", "*"), ("*", "Users")})
+
+    assert has_permission(permissions, "View", "Taps")
+    assert has_permission(permissions, "Edit", "Studies")
+    assert has_permission(permissions, "Delete", "Users")
+    assert not has_permission(permissions, "View", "Studies")
+    assert has_permission(frozenset({("*", "*")}), "View", "Studies")
+
+
+def test_get_permission_set_cached(account, access_group, compiles):
+    permissions = get_permission_set(account, access_group.id)
+    assert permissions == {("foo", "baz")}
+
+    # App IDs from query strings are the same app
+    assert get_permission_set(account, str(access_group.id)) is permissions
+    assert compiles.call_count == 1
+
+
+def test_get_permission_set_expires(app, account, access_group, compiles):
+    with patch.object(permissions_module.time, "monotonic", return_value=0):
+        get_permission_set(account, access_group.id)
+
+    # Expired sets are compiled again without a version bump
+    ttl = app.config["PERMISSION_SET_TTL"]
+    with patch.object(permissions_module.time, "monotonic", return_value=ttl):
+        get_permission_set(account, access_group.id)
+
+    assert compiles.call_count == 2
+
+
+def test_get_permission_set_evicts(account, access_group, compiles, monkeypatch):
+    monkeypatch.setattr(permissions_module, "PERMISSION_SETS_MAXSIZE", 2)
+
+    for study_id in (1, 2, 1, 3):
+        get_permission_set(account, access_group.id, study_id)
+
+    # Study 2 was the least recently used
+    permission_sets, _ = get_permission_sets()
+    assert [key[2] for key in permission_sets] == ["1", "3"]
+
+    get_permission_set(account, access_group.id, 1)
+    assert compiles.call_count == 3
+
+
+def test_invalidate_account_permissions(account, access_group, compiles):
+    get_permission_set(account, access_group.id)
+
+    invalidate_account_permissions(account.id + 1)
+    get_permission_set(account, access_group.id)
+    assert compiles.call_count == 1
+
+    invalidate_account_permissions(account.id)
+    get_permission_set(account, access_group.id)
+    assert compiles.call_count == 2
+
+
+def test_invalidate_all_permissions(account, access_group, compiles):
+    assert get_permission_set(account, access_group.id) == {("foo", "baz")}
+
+    access_group.is_archived = True
+    db.session.commit()
+
+    # Stale until the version is bumped
+    assert get_permission_set(account, access_group.id) == {("foo", "baz")}
+
+    invalidate_all_permissions()
+    assert get_permission_set(account, access_group.id) == set()
+    assert compiles.call_count == 2
+
+
+def test_get_version_evicted(app):
+    version = get_version(GLOBAL_VERSION_KEY)
+    assert get_version(GLOBAL_VERSION_KEY) == version
+
+    # A version that is evicted is recreated with a new value
+    cache.delete(GLOBAL_VERSION_KEY)
+    assert get_version(GLOBAL_VERSION_KEY) != version
+
+
+def test_account_edit_invalidates_permissions(
+    app, account, access_group, compiles
+):
+    from tests.testing_utils import mock_researcher_auth_for_testing
+
+    get_permission_set(account, access_group.id)
+
+    with app.test_client() as client:
+        headers = mock_researcher_auth_for_testing(client, is_admin=True)
+        other = AccessGroup.query.filter(AccessGroup.name == "bar").first()
+        response = client.post(
+            "/admin/account/edit",
+            json={
+                "app": 1,
+                "id": account.id,
+                "edit": {"access_groups": [{"id": other.id}]},
+            },
+            headers=headers,
+        )
+
+    assert response.status_code == 200
+    assert get_permission_set(account, access_group.id) == set()
+    assert (
+        JoinAccountAccessGroup.query.filter(
+            JoinAccountAccessGroup.account_id == account.id
+        ).count()
+        == 1
+    )
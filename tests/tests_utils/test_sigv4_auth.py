@@ -0,0 +1,206 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials
+from botocore.exceptions import ClientError
+from flask import Flask
+from freezegun import freeze_time
+from moto import mock_aws
+
+from backend.utils import lambda_credentials_manager, sigv4_auth
+from backend.utils.aws import registry
+from backend.utils.lambda_credentials_manager import get_credentials_manager
+from backend.utils.sigv4_auth import get_signing_key, sigv4_required
+
+SECRET_NAME = "lambda-execution-user-credentials"  # noqa: S105
+
+
+def put_secret(client, access_key, secret_key):
+    client.put_secret_value(
+        SecretId=SECRET_NAME,
+        SecretString=json.dumps(
+            {
+                "LAMBDA_ACCESS_KEY_ID": access_key,
+                "LAMBDA_SECRET_ACCESS_KEY": secret_key,
+            }
+        ),
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    lambda_credentials_manager.managers.clear()
+    sigv4_auth.signing_keys.clear()
+    yield
+    lambda_credentials_manager.managers.clear()
+    sigv4_auth.signing_keys.clear()
+
+
+@pytest.fixture
+def secretsmanager():
+    with mock_aws():
+        client = registry.get_client("secretsmanager", region_name="us-east-1")
+        client.create_secret(Name=SECRET_NAME)
+        put_secret(client, "foo", "bar")
+
+        # Count the calls to Secrets Manager
+        client.get_secret_value = MagicMock(wraps=client.get_secret_value)
+        yield client
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+
+    @app.route("/sigv4")
+    @sigv4_required
+    def sigv4():
+        return "OK"
+
+    return app
+
+
+def signed_headers(access_key, secret_key):
+    aws_request = AWSRequest(
+        method="GET", url="http://localhost/sigv4", headers={"Host": "localhost"}
+    )
+    credentials = Credentials(access_key, secret_key)
+    SigV4Auth(credentials, "execute-api", "us-east-1").add_auth(aws_request)
+    return {
+        "Authorization": aws_request.headers["Authorization"],
+        "X-Amz-Date": aws_request.headers["X-Amz-Date"],
+    }
+
+
+@freeze_time("2025-01-01 09:00:00")
+def test_sigv4_required(app, secretsmanager):
+    client = app.test_client()
+    for _ in range(3):
+        res = client.get("/sigv4", headers=signed_headers("foo", "bar"))
+        assert res.status_code == 200
+
+    secretsmanager.get_secret_value.assert_called_once()
+    assert len(sigv4_auth.signing_keys) == 1
+
+
+@freeze_time("2025-01-01 09:00:00")
+def test_sigv4_required_invalid_signature(app, secretsmanager):
+    res = app.test_client().get("/sigv4", headers=signed_headers("foo", "baz"))
+    assert res.status_code == 401
+
+
+def test_sigv4_required_missing_headers(app):
+    res = app.test_client().get("/sigv4")
+    assert res.status_code == 401
+
+
+@freeze_time("2025-01-01 09:00:00")
+def test_sigv4_required_rotated(app, secretsmanager):
+    client = app.test_client()
+    res = client.get("/sigv4", headers=signed_headers("foo", "bar"))
+    assert res.status_code == 200
+
+    put_secret(secretsmanager, "foo", "baz")
+    manager = get_credentials_manager(SECRET_NAME)
+
+    # The secret is not fetched again right away
+    res = client.get("/sigv4", headers=signed_headers("foo", "baz"))
+    assert res.status_code == 401
+    assert secretsmanager.get_secret_value.call_count == 1
+
+    manager.fetched_at -= manager.min_refresh_interval
+    res = client.get("/sigv4", headers=signed_headers("foo", "baz"))
+    assert res.status_code == 200
+    assert secretsmanager.get_secret_value.call_count == 2
+
+
+class TestLambdaCredentialsManager:
+    def test_get_credentials(self, secretsmanager):
+        manager = get_credentials_manager(SECRET_NAME)
+        assert get_credentials_manager(SECRET_NAME) is manager
+
+        credentials = manager.get_credentials()
+        assert credentials.access_key == "foo"
+        assert credentials.secret_key == "bar"  # noqa: S105
+        assert manager.get_credentials() is credentials
+        secretsmanager.get_secret_value.assert_called_once()
+
+    def test_get_credentials_expired(self, secretsmanager):
+        manager = get_credentials_manager(SECRET_NAME)
+        credentials = manager.get_credentials()
+        manager.fetched_at -= manager.ttl
+
+        # Unchanged credentials are kept
+        assert manager.get_credentials() is credentials
+        assert secretsmanager.get_secret_value.call_count == 2
+
+    def test_get_credentials_stale(self, secretsmanager):
+        manager = get_credentials_manager(SECRET_NAME)
+        credentials = manager.get_credentials()
+        manager.fetched_at -= manager.ttl
+        secretsmanager.get_secret_value.side_effect = ClientError(
+            {"Error": {"Code": "InternalServiceError"}}, "GetSecretValue"
+        )
+
+        assert manager.get_credentials() is credentials
+        assert manager.get_credentials() is credentials
+        assert secretsmanager.get_secret_value.call_count == 2
+
+    def test_get_credentials_error(self, secretsmanager):
+        secretsmanager.get_secret_value.side_effect = ClientError(
+            {"Error": {"Code": "ResourceNotFoundException"}}, "GetSecretValue"
+        )
+
+        with pytest.raises(ClientError):
+            get_credentials_manager(SECRET_NAME).get_credentials()
+
+    def test_refresh_if_rotated(self, secretsmanager):
+        manager = get_credentials_manager(SECRET_NAME)
+        manager.get_credentials()
+        manager.fetched_at -= manager.min_refresh_interval
+        assert not manager.refresh_if_rotated()
+
+        put_secret(secretsmanager, "foo", "baz")
+        assert not manager.refresh_if_rotated()
+
+        manager.fetched_at -= manager.min_refresh_interval
+        assert manager.refresh_if_rotated()
+        assert manager.credentials.secret_key == "baz"  # noqa: S105
+
+
+def test_get_signing_key():
+    request = AWSRequest()
+    request.context["timestamp"] = "20250101T090000Z"
+    auth = SigV4Auth(Credentials("foo", "bar"), "execute-api", "us-east-1")
+    expected = auth.signature("baz", request)
+
+    signing_key = get_signing_key("bar", "20250101", "us-east-1", "execute-api")
+    assert auth._sign(signing_key, "baz", hex=True) == expected
+    assert (
+        get_signing_key("bar", "20250101", "us-east-1", "execute-api")
+        is signing_key
+    )
+
+
+def test_get_signing_key_discards_past_dates():
+    get_signing_key("bar", "20250101", "us-east-1", "execute-api")
+    get_signing_key("bar", "20250102", "us-east-1", "execute-api")
+    assert list(sigv4_auth.signing_keys) == [
+        ("bar", "20250102", "us-east-1", "execute-api")
+    ]
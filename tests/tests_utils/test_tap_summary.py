@@ -0,0 +1,84 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from backend.utils.tap_summary import (
+    bin_taps,
+    get_summary_range,
+    get_timezone,
+    parse_timestamp,
+)
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def test_get_timezone():
+    assert get_timezone("America/New_York") == NEW_YORK
+
+    with pytest.raises(ValueError, match="Invalid timezone: foo"):
+        get_timezone("foo")
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("2025-01-01T09:00:00Z", "start") == (
+        "2025-01-01T09:00:00.000Z"
+    )
+    assert parse_timestamp("2025-01-01T04:00:00.5-05:00", "start") == (
+        "2025-01-01T09:00:00.500Z"
+    )
+    assert parse_timestamp("2025-01-01", "start") == "2025-01-01T00:00:00.000Z"
+
+    with pytest.raises(ValueError, match="Invalid end"):
+        parse_timestamp("foo", "end")
+
+
+def test_get_summary_range():
+    assert get_summary_range("2025-01-01", "2025-01-02", NEW_YORK) == (
+        "2025-01-01T05:00:00.000Z",
+        "2025-01-03T05:00:00.000Z",
+    )
+
+
+def test_get_summary_range_invalid():
+    with pytest.raises(ValueError, match="Expected YYYY-MM-DD"):
+        get_summary_range("2025-01-01", None, NEW_YORK)
+
+    with pytest.raises(ValueError, match="cannot be earlier"):
+        get_summary_range("2025-01-02", "2025-01-01", NEW_YORK)
+
+
+def test_bin_taps():
+    records = [
+        ("FO001", "2025-01-01T14:10:00.000Z"),
+        ("FO001", "2025-01-01T14:50:00.000Z"),
+        ("FO001", "2025-01-02T03:00:00.000Z"),
+        ("FO002", "2025-01-01T15:00:00.000Z"),
+    ]
+
+    assert bin_taps(records, "hour", NEW_YORK) == [
+        {"dittiId": "FO001", "time": "2025-01-01T09:00:00", "count": 2},
+        {"dittiId": "FO001", "time": "2025-01-01T22:00:00", "count": 1},
+        {"dittiId": "FO002", "time": "2025-01-01T10:00:00", "count": 1},
+    ]
+
+    # The last tap by FO001 falls on the previous day in New York
+    assert bin_taps(records, "day", NEW_YORK) == [
+        {"dittiId": "FO001", "time": "2025-01-01T00:00:00", "count": 3},
+        {"dittiId": "FO002", "time": "2025-01-01T00:00:00", "count": 1},
+    ]
+
+
+def test_bin_taps_empty():
+    assert bin_taps([], "day", NEW_YORK) == []
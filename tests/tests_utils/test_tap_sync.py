@@ -0,0 +1,127 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from backend.extensions import db
+from backend.models import AudioTap, SyncCheckpoint, Tap
+from backend.utils.tap_sync import (
+    get_sync_start,
+    iter_local_items,
+    sync_table,
+    sync_taps,
+)
+
+
+def test_get_sync_start():
+    assert get_sync_start(None) is None
+    assert (
+        get_sync_start("2025-01-01T10:00:00.000Z") == "2025-01-01T09:55:00.000Z"
+    )
+
+
+def test_sync_table(app, with_mocked_taps):
+    assert sync_table("Tap") == 3
+    assert db.session.query(Tap).count() == 3
+
+    tap = db.session.get(Tap, "2")
+    assert tap.user_id == "2"
+    assert tap.time == "2025-01-01T10:00:00.000Z"
+    assert tap.timezone is None
+
+    checkpoint = db.session.get(SyncCheckpoint, "Tap")
+    assert checkpoint.high_water_mark == "2025-01-01T11:00:00.000Z"
+    assert checkpoint.synced_on is not None
+
+
+def test_sync_table_incremental(app, with_mocked_taps):
+    sync_table("Tap")
+
+    with_mocked_taps.put_item(
+        TableName="testing_table_tap",
+        Item={
+            "id": {"S": "4"},
+            "tapUserId": {"S": "2"},
+            "time": {"S": "2025-01-02T09:00:00.000Z"},
+            "createdAt": {"S": "2025-01-02T09:00:00.000Z"},
+        },
+    )
+
+    # Only the new item is copied; items inside the overlap are skipped
+    assert sync_table("Tap") == 1
+    assert db.session.query(Tap).count() == 4
+
+    checkpoint = db.session.get(SyncCheckpoint, "Tap")
+    assert checkpoint.high_water_mark == "2025-01-02T09:00:00.000Z"
+
+    assert sync_table("Tap") == 0
+
+
+def test_sync_taps(app, with_mocked_taps):
+    assert sync_taps() == {"Tap": 3, "AudioTap": 3}
+    assert db.session.query(AudioTap).count() == 3
+
+
+def test_iter_local_items(app, with_mocked_taps):
+    sync_taps()
+
+    items = sorted(iter_local_items("Tap", ["2"]), key=lambda item: item["id"])
+    assert [item["id"] for item in items] == ["1", "2"]
+    assert items[0] == {
+        "id": "1",
+        "tapUserId": "2",
+        "time": "2025-01-01T09:00:00.000Z",
+        "timeZone": "America/New_York",
+        "createdAt": "2025-01-01T09:00:00.000Z",
+    }
+
+    assert list(iter_local_items("Tap", [])) == []
+
+
+def test_sync_table_deleted(app, with_mocked_taps):
+    sync_table("Tap")
+
+    # Tap 1 was created before the high-water mark and deleted after it
+    with_mocked_taps.update_item(
+        TableName="testing_table_tap",
+        Key={"id": {"S": "1"}},
+        UpdateExpression="SET #d = :d",
+        ExpressionAttributeNames={"#d": "_deleted"},
+        ExpressionAttributeValues={":d": {"BOOL": True}},
+    )
+
+    assert sync_table("Tap") == 0
+    assert db.session.get(Tap, "1") is None
+    assert db.session.query(Tap).count() == 2
+
+    # Deleted items are not copied by a full sync
+    assert sync_table("Tap", full=True) == 0
+    assert db.session.get(Tap, "1") is None
+
+
+def test_sync_table_no_created_at(app, with_mocked_taps):
+    sync_table("Tap")
+
+    with_mocked_taps.put_item(
+        TableName="testing_table_tap",
+        Item={
+            "id": {"S": "4"},
+            "tapUserId": {"S": "2"},
+            "time": {"S": "2025-01-02T09:00:00.000Z"},
+        },
+    )
+
+    # Items without createdAt are only read by a full sync
+    assert sync_table("Tap") == 0
+    assert sync_table("Tap", full=True) == 1
+    assert db.session.get(Tap, "4").created_at is None
+
+    checkpoint = db.session.get(SyncCheckpoint, "Tap")
+    assert checkpoint.high_water_mark == "2025-01-01T11:00:00.000Z"
@@ -0,0 +1,186 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import pytest
+
+from backend.utils.aws import Query
+from backend.utils.user_directory import (
+    find_user,
+    get_all_users,
+    get_study_users,
+    invalidate_users,
+)
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Record the parameters of every scan of the User table."""
+    calls = []
+    scan = Query.scan
+
+    def _scan(self, *args, **kwargs):
+        if self.key == "User":
+            calls.append(self)
+        return scan(self, *args, **kwargs)
+
+    monkeypatch.setattr(Query, "scan", _scan)
+    return calls
+
+
+def put_user(client, user_id, user_permission_id):
+    client.put_item(
+        TableName="testing_table_user",
+        Item={
+            "id": {"S": user_id},
+            "user_permission_id": {"S": user_permission_id},
+        },
+    )
+
+
+def get_ditti_ids(users):
+    return sorted(user["user_permission_id"] for user in users)
+
+
+def test_get_study_users(app, with_mocked_tables, scans):
+    put_user(with_mocked_tables, "2", "FO001")
+    put_user(with_mocked_tables, "3", "BA001")
+
+    assert get_ditti_ids(get_study_users(["FO"])) == ["FO001"]
+    assert len(scans) == 1
+
+    # Cached entries are returned without reading DynamoDB
+    put_user(with_mocked_tables, "4", "FO002")
+    assert get_ditti_ids(get_study_users(["FO"])) == ["FO001"]
+    assert len(scans) == 1
+
+    # Only studies that are not cached are read
+    assert get_ditti_ids(get_study_users(["FO", "BA"])) == ["BA001", "FO001"]
+    assert len(scans) == 2
+    assert get_ditti_ids(get_study_users(["BA", "FO"])) == ["BA001", "FO001"]
+    assert len(scans) == 2
+
+
+def test_get_study_users_empty(app, with_mocked_tables, scans):
+    assert get_study_users([]) == []
+    assert get_study_users(["FO"]) == []
+    assert get_study_users(["FO"]) == []
+    assert len(scans) == 1
+
+
+def test_get_study_users_overlapping(app, with_mocked_tables):
+    put_user(with_mocked_tables, "2", "FO001")
+    assert get_ditti_ids(get_study_users(["F", "FO"])) == ["FO001"]
+
+
+def test_get_all_users(app, with_mocked_tables, scans):
+    assert get_ditti_ids(get_all_users()) == ["abc123"]
+    put_user(with_mocked_tables, "2", "FO001")
+    assert get_ditti_ids(get_all_users()) == ["abc123"]
+    assert len(scans) == 1
+
+    invalidate_users("FO001")
+    assert get_ditti_ids(get_all_users()) == ["FO001", "abc123"]
+    assert len(scans) == 2
+
+
+def test_invalidate_users(app, with_mocked_tables, scans):
+    put_user(with_mocked_tables, "2", "FO001")
+    put_user(with_mocked_tables, "3", "BA001")
+    get_study_users(["FO", "BA"])
+
+    put_user(with_mocked_tables, "4", "FO002")
+    invalidate_users("FO002", None)
+
+    # Only the entry for the user's study is removed
+    assert get_ditti_ids(get_study_users(["FO", "BA"])) == [
+        "BA001",
+        "FO001",
+        "FO002",
+    ]
+    assert len(scans) == 2
+
+
+def test_find_user(app, with_mocked_tables, scans):
+    put_user(with_mocked_tables, "2", "FO001")
+
+    assert find_user("FO001")["id"] == "2"
+    assert len(scans) == 1
+
+    # The user's key is read from the directory
+    assert find_user("FO001")["id"] == "2"
+    assert len(scans) == 1
+
+
+def test_find_user_stale(app, with_mocked_tables, scans):
+    put_user(with_mocked_tables, "2", "FO001")
+    get_study_users(["FO"])
+
+    # The cached entry is refreshed once if the user is not in it
+    put_user(with_mocked_tables, "3", "FO002")
+    assert find_user("FO002")["id"] == "3"
+    assert len(scans) == 2
+
+    assert find_user("FO003") is None
+    assert len(scans) == 3
+
+    # A user whose Ditti ID was changed is not returned by their old one
+    put_user(with_mocked_tables, "2", "FO004")
+    assert find_user("FO001") is None
+
+
+def test_find_user_missing(app, with_mocked_tables, scans):
+    put_user(with_mocked_tables, "2", "FO001")
+    get_study_users(["FO"])
+
+    # Unknown Ditti IDs are remembered after the entry is refreshed once
+    assert find_user("FO002") is None
+    assert len(scans) == 2
+    assert find_user("FO002") is None
+    assert find_user("FO002") is None
+    assert len(scans) == 2
+
+    # Creating the user clears the record that it is missing
+    put_user(with_mocked_tables, "3", "FO002")
+    invalidate_users("FO002")
+    assert find_user("FO002")["id"] == "3"
+    assert len(scans) == 3
+
+
+def test_find_user_index(app, with_mocked_tables, monkeypatch, scans):
+    monkeypatch.setenv("AWS_TABLENAME_USER", "testing_table_user_index")
+    app.config["AWS_USER_PERMISSION_ID_INDEX"] = "byUserPermissionId"
+    with_mocked_tables.create_table(
+        TableName="testing_table_user_index",
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_permission_id", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "byUserPermissionId",
+                "KeySchema": [
+                    {"AttributeName": "user_permission_id", "KeyType": "HASH"}
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    with_mocked_tables.put_item(
+        TableName="testing_table_user_index",
+        Item={"id": {"S": "2"}, "user_permission_id": {"S": "FO001"}},
+    )
+
+    assert find_user("FO001")["id"] == "2"
+    assert find_user("FO002") is None
+    assert len(scans) == 0
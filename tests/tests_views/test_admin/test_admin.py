@@ -12,7 +12,7 @@
 
 import json
 
-from backend.extensions import db
+from backend.extensions import cache, db
 from backend.models import (
     AccessGroup,
     Account,
@@ -405,3 +405,14 @@ def test_app_edit(post_admin):
 
     foo = db.session.get(App, 1)
     assert foo.name == "baz"
+
+
+def test_cache_stats(app, get_admin):
+    cache.reset_stats()
+    cache.get("foo")
+
+    res = get_admin("/admin/cache")
+    data = json.loads(res.data)
+    assert data["type"] == "SimpleCache"
+    assert data["misses"] >= 1
+    assert data["hitRate"] == data["hits"] / (data["hits"] + data["misses"])
@@ -14,8 +14,22 @@ import pytest
 from flask import json
 from moto import mock_aws
 
-from backend.utils.aws import Connection, Loader, Query
-from tests.testing_utils import mock_researcher_auth_for_testing
+from backend.utils.aws import (
+    Connection,
+    Loader,
+    MutationClient,
+    Query,
+    registry,
+)
+from backend.utils.columnar import COLUMNAR_MIMETYPE
+from backend.utils.tap_sync import sync_taps
+from backend.views.aws_requests import stream_json_array
+from tests.testing_utils import (
+    AUDIO_FILE,
+    FakeAppSyncSession,
+    decode_columnar,
+    mock_researcher_auth_for_testing,
+)
 
 
 @pytest.fixture
@@ -40,6 +54,354 @@ def researcher_post(client, researcher_headers):
     return _post
 
 
+def test_get_taps(get_admin, with_mocked_taps):
+    res = get_admin("/aws/get-taps", query_string={"app": 2})
+    assert res.status_code == 200
+    data = sorted(json.loads(res.data), key=lambda tap: tap["time"])
+    assert data == [
+        {
+            "dittiId": "FO001",
+            "time": "2025-01-01T09:00:00.000Z",
+            "timezone": "America/New_York",
+        },
+        {
+            "dittiId": "FO001",
+            "time": "2025-01-01T10:00:00.000Z",
+            "timezone": "GMT Universal Coordinated Time",
+        },
+    ]
+
+
+def test_get_taps_time_window(get_admin, with_mocked_taps):
+    query_string = {"app": 2, "start": "2025-01-01T09:30:00Z"}
+    res = get_admin("/aws/get-taps", query_string=query_string)
+    assert res.status_code == 200
+    assert [tap["time"] for tap in json.loads(res.data)] == [
+        "2025-01-01T10:00:00.000Z"
+    ]
+
+    query_string = {"app": 2, "end": "2025-01-01T04:30:00-05:00"}
+    res = get_admin("/aws/get-taps", query_string=query_string)
+    assert [tap["time"] for tap in json.loads(res.data)] == [
+        "2025-01-01T09:00:00.000Z"
+    ]
+
+
+def read_pages(get_admin, url, **options):
+    pages = []
+    query_string = {"app": 2, "limit": 1, **options}
+
+    while True:
+        res = get_admin(url, query_string=query_string)
+        assert res.status_code == 200
+        page = json.loads(res.data)
+        pages.append(page["items"])
+        if page["cursor"] is None:
+            return pages
+
+        query_string["cursor"] = page["cursor"]
+
+
+def test_get_taps_paged(get_admin, with_mocked_taps):
+    pages = read_pages(get_admin, "/aws/get-taps")
+    assert [len(page) for page in pages] == [1, 1, 0]
+    assert sorted(page[0]["time"] for page in pages[:2]) == [
+        "2025-01-01T09:00:00.000Z",
+        "2025-01-01T10:00:00.000Z",
+    ]
+
+    pages = read_pages(get_admin, "/aws/get-taps", start="2025-01-01T09:30:00Z")
+    assert [[tap["time"] for tap in page] for page in pages] == [
+        ["2025-01-01T10:00:00.000Z"],
+        [],
+    ]
+
+
+def test_get_taps_paged_local(app, get_admin, with_mocked_taps):
+    app.config["LOCAL_TAPS"] = True
+    sync_taps()
+
+    # Local taps are paged newest first
+    pages = read_pages(get_admin, "/aws/get-taps")
+    assert [[tap["time"] for tap in page] for page in pages] == [
+        ["2025-01-01T10:00:00.000Z"],
+        ["2025-01-01T09:00:00.000Z"],
+        [],
+    ]
+
+
+def put_tap_without_time(client):
+    client.put_item(
+        TableName="testing_table_tap",
+        Item={
+            "id": {"S": "4"},
+            "tapUserId": {"S": "2"},
+            "createdAt": {"S": "2025-01-01T12:00:00.000Z"},
+        },
+    )
+
+
+def test_get_taps_paged_without_time(get_admin, with_mocked_taps):
+    put_tap_without_time(with_mocked_taps)
+
+    # Every page can be resumed, including one that ends on a tap without time
+    pages = read_pages(get_admin, "/aws/get-taps")
+    assert [len(page) for page in pages] == [1, 1, 1, 0]
+    assert sorted(page[0]["time"] or "" for page in pages[:3]) == [
+        "",
+        "2025-01-01T09:00:00.000Z",
+        "2025-01-01T10:00:00.000Z",
+    ]
+
+
+def test_get_taps_paged_local_without_time(app, get_admin, with_mocked_taps):
+    put_tap_without_time(with_mocked_taps)
+    app.config["LOCAL_TAPS"] = True
+    sync_taps()
+
+    # Taps without time are paged first
+    pages = read_pages(get_admin, "/aws/get-taps")
+    assert [[tap["time"] for tap in page] for page in pages] == [
+        [None],
+        ["2025-01-01T10:00:00.000Z"],
+        ["2025-01-01T09:00:00.000Z"],
+        [],
+    ]
+
+
+def test_get_audio_taps_paged(get_admin, with_mocked_taps):
+    pages = read_pages(get_admin, "/aws/get-audio-taps", limit=10)
+    assert [[tap["audioFileTitle"] for tap in page] for page in pages] == [
+        ["foo"]
+    ]
+
+
+def test_get_taps_columnar(client, get_admin, with_mocked_taps):
+    res = get_admin(
+        "/aws/get-taps", query_string={"app": 2, "format": "columnar"}
+    )
+    assert res.status_code == 200
+    assert res.mimetype == COLUMNAR_MIMETYPE
+    records = decode_columnar(json.loads(res.data))
+    assert sorted(records, key=lambda tap: tap["time"]) == [
+        {
+            "dittiId": "FO001",
+            "time": "2025-01-01T09:00:00.000Z",
+            "timezone": "America/New_York",
+        },
+        {
+            "dittiId": "FO001",
+            "time": "2025-01-01T10:00:00.000Z",
+            "timezone": "GMT Universal Coordinated Time",
+        },
+    ]
+
+    headers = mock_researcher_auth_for_testing(client, is_admin=True)
+    headers["Accept"] = COLUMNAR_MIMETYPE
+    res = client.get("/aws/get-taps", query_string={"app": 2}, headers=headers)
+    assert res.mimetype == COLUMNAR_MIMETYPE
+    assert json.loads(res.data)["length"] == 2
+
+
+def test_get_audio_taps_columnar_paged(get_admin, with_mocked_taps):
+    query_string = {"app": 2, "format": "columnar", "limit": 10}
+    res = get_admin("/aws/get-audio-taps", query_string=query_string)
+    assert res.status_code == 200
+    page = json.loads(res.data)
+    assert page["cursor"] is None
+    assert decode_columnar(page["items"]) == [
+        {
+            "action": "play",
+            "audioFileTitle": "foo",
+            "dittiId": "FO001",
+            "time": "2025-01-01T09:00:00.000Z",
+            "timezone": "America/New_York",
+        }
+    ]
+
+
+@pytest.mark.parametrize(
+    ("options", "msg"),
+    [
+        ({"start": "foo"}, "Invalid start"),
+        ({"end": "foo"}, "Invalid end"),
+        ({"limit": 0}, "Invalid limit"),
+        ({"limit": "foo"}, "Invalid limit"),
+        ({"cursor": "foo"}, "Invalid cursor"),
+        ({"cursor": "e30="}, "Invalid cursor"),
+    ],
+)
+def test_get_taps_invalid(get_admin, with_mocked_taps, options, msg):
+    res = get_admin("/aws/get-taps", query_string={"app": 2, **options})
+    assert res.status_code == 400
+    assert json.loads(res.data)["msg"].startswith(msg)
+
+
+def test_get_tap_summary(get_admin, with_mocked_taps):
+    query_string = {
+        "app": 2,
+        "granularity": "hour",
+        "start_date": "2025-01-01",
+        "end_date": "2025-01-01",
+        "timezone": "America/New_York",
+    }
+    res = get_admin("/aws/get-tap-summary", query_string=query_string)
+    assert res.status_code == 200
+    assert json.loads(res.data) == [
+        {"count": 1, "dittiId": "FO001", "time": "2025-01-01T04:00:00"},
+        {"count": 1, "dittiId": "FO001", "time": "2025-01-01T05:00:00"},
+    ]
+
+    query_string["granularity"] = "day"
+    res = get_admin("/aws/get-tap-summary", query_string=query_string)
+    assert json.loads(res.data) == [
+        {"count": 2, "dittiId": "FO001", "time": "2025-01-01T00:00:00"}
+    ]
+
+    # Both taps fall on January 1 in New York
+    query_string["start_date"] = query_string["end_date"] = "2025-01-02"
+    res = get_admin("/aws/get-tap-summary", query_string=query_string)
+    assert json.loads(res.data) == []
+
+
+def test_get_tap_summary_local(app, get_admin, with_mocked_taps):
+    app.config["LOCAL_TAPS"] = True
+    sync_taps()
+
+    query_string = {
+        "app": 2,
+        "start_date": "2025-01-01",
+        "end_date": "2025-01-01",
+    }
+    res = get_admin("/aws/get-tap-summary", query_string=query_string)
+    assert res.status_code == 200
+    assert json.loads(res.data) == [
+        {"count": 2, "dittiId": "FO001", "time": "2025-01-01T00:00:00"}
+    ]
+
+
+@pytest.mark.parametrize(
+    ("options", "msg"),
+    [
+        ({"granularity": "week"}, "Invalid granularity: week"),
+        ({"timezone": "foo"}, "Invalid timezone: foo"),
+        ({"start_date": "foo"}, "Invalid start_date or end_date"),
+    ],
+)
+def test_get_tap_summary_invalid(get_admin, with_mocked_taps, options, msg):
+    query_string = {
+        "app": 2,
+        "start_date": "2025-01-01",
+        "end_date": "2025-01-01",
+        **options,
+    }
+    res = get_admin("/aws/get-tap-summary", query_string=query_string)
+    assert res.status_code == 400
+    assert json.loads(res.data)["msg"].startswith(msg)
+
+
+def test_stream_json_array(app):
+    records = ({"foo": i} for i in range(5))
+    with app.test_request_context():
+        res = stream_json_array(records, chunk_size=2)
+        assert json.loads(b"".join(res.iter_encoded())) == [
+            {"foo": i} for i in range(5)
+        ]
+
+        res = stream_json_array(iter([]))
+        assert json.loads(b"".join(res.iter_encoded())) == []
+
+
+def test_get_audio_taps(get_admin, with_mocked_taps):
+    res = get_admin("/aws/get-audio-taps", query_string={"app": 2})
+    assert res.status_code == 200
+    assert json.loads(res.data) == [
+        {
+            "action": "play",
+            "audioFileTitle": "foo",
+            "dittiId": "FO001",
+            "time": "2025-01-01T09:00:00.000Z",
+            "timezone": "America/New_York",
+        }
+    ]
+
+
+def test_get_taps_local(app, get_admin, with_mocked_taps):
+    app.config["LOCAL_TAPS"] = True
+    sync_taps()
+
+    res = get_admin("/aws/get-taps", query_string={"app": 2})
+    assert res.status_code == 200
+    data = sorted(json.loads(res.data), key=lambda tap: tap["time"])
+    assert [tap["time"] for tap in data] == [
+        "2025-01-01T09:00:00.000Z",
+        "2025-01-01T10:00:00.000Z",
+    ]
+    assert data[1]["timezone"] == "GMT Universal Coordinated Time"
+
+    res = get_admin("/aws/get-audio-taps", query_string={"app": 2})
+    assert res.status_code == 200
+    assert [tap["audioFileTitle"] for tap in json.loads(res.data)] == ["foo"]
+
+
+def test_user_edit_invalidates_directory(get_admin, post_admin, with_mocked_taps):
+    res = get_admin("/aws/get-users", query_string={"app": 2})
+    assert [user["information"] for user in json.loads(res.data)] == [""]
+
+    data = {
+        "app": 2,
+        "study": 1,
+        "user_permission_id": "FO001",
+        "edit": {"information": "foo"},
+    }
+    res = post_admin("/aws/user/edit", data=json.dumps(data))
+    assert json.loads(res.data)["msg"] == "User Successfully Edited"
+
+    res = get_admin("/aws/get-users", query_string={"app": 2})
+    assert [user["information"] for user in json.loads(res.data)] == ["foo"]
+
+
+def test_audio_file_create_partial_failure(post_admin, monkeypatch):
+    session = FakeAppSyncSession(fail={"0.mp3", "2.mp3"})
+    monkeypatch.setattr(MutationClient, "session", session)
+    monkeypatch.setattr(MutationClient, "chunk_size", 1)
+
+    data = {
+        "app": 2,
+        "create": [{**AUDIO_FILE, "fileName": f"{i}.mp3"} for i in range(3)],
+    }
+    res = post_admin("/aws/audio-file/create", data=data)
+    assert res.status_code == 500
+    assert json.loads(res.data) == {
+        "msg": "Creation of 2 of 3 audio files failed.",
+        "errors": [
+            {"fileName": "0.mp3", "error": "Invalid 0.mp3"},
+            {"fileName": "2.mp3", "error": "Request failed"},
+        ],
+    }
+    assert len(session.bodies) == 3
+
+
+def test_audio_file_create(post_admin, monkeypatch):
+    monkeypatch.setattr(MutationClient, "session", FakeAppSyncSession())
+    data = {"app": 2, "create": [AUDIO_FILE]}
+    res = post_admin("/aws/audio-file/create", data=data)
+    assert res.status_code == 200
+    assert json.loads(res.data) == {"msg": "Audio File Created Successfully"}
+
+
+@mock_aws
+def test_audio_file_presigned_urls_reuse_client(app, post_admin):
+    app.config["AWS_AUDIO_FILE_BUCKET"] = "testing-bucket"
+    data = {"app": 2, "files": [{"key": "foo.mp3", "type": "audio/mpeg"}]}
+    for _ in range(3):
+        res = post_admin("/aws/audio-file/get-presigned-urls", data=data)
+        assert res.status_code == 200
+        assert len(json.loads(res.data)["urls"]) == 1
+
+    assert registry.constructions == 1
+
+
 @mock_aws
 @pytest.mark.skip(reason="Must create mock for requests")
 def test_user_create(post_admin):
@@ -0,0 +1,197 @@
+# Copyright 2025 The Trustees of the University of Pennsylvania
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may]
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import csv
+import gzip
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow.parquet as pq
+import pytest
+from flask import json
+
+from backend.extensions import db
+from backend.models import Account, ExportTask, Study
+from backend.utils import export_task as export_task_module
+from backend.utils import fitbit_export
+from backend.utils.aws import registry
+from backend.utils.fitbit_export import (
+    EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    XLSX_MIMETYPE,
+)
+from tests.testing_utils import create_sleep_levels, read_xlsx
+
+
+@pytest.fixture
+def sleep_levels(app):
+    return {
+        ditti_id: create_sleep_levels(ditti_id)
+        for ditti_id in ("FO001", "FO002", "BR001")
+    }
+
+
+def test_download_fitbit_participant(get_admin, sleep_levels):
+    res = get_admin("/admin/fitbit_data/download/participant/FO001")
+    assert res.status_code == 200
+    assert res.mimetype == XLSX_MIMETYPE
+    assert "FO001_Fitbit_" in res.headers["Content-Disposition"]
+
+    rows = read_xlsx(io.BytesIO(res.data))
+    assert rows[0] == EXPORT_COLUMNS
+    assert len(rows) == sleep_levels["FO001"] + 1
+    assert {row[0] for row in rows[1:]} == {"FO001"}
+
+
+def test_download_fitbit_participant_csv(get_admin, sleep_levels):
+    res = get_admin(
+        "/admin/fitbit_data/download/participant/FO001",
+        query_string={"format": "csv"},
+    )
+    assert res.status_code == 200
+    assert res.mimetype == "text/csv"
+    assert res.headers["Content-Disposition"].endswith(".csv")
+
+    rows = list(csv.reader(io.StringIO(res.data.decode())))
+    assert rows[0] == EXPORT_COLUMNS
+    assert len(rows) == sleep_levels["FO001"] + 1
+
+
+def test_download_fitbit_participant_invalid_format(get_admin, sleep_levels):
+    res = get_admin(
+        "/admin/fitbit_data/download/participant/FO001",
+        query_string={"format": "json"},
+    )
+    assert res.status_code == 400
+    assert json.loads(res.data) == {"msg": "Invalid format."}
+
+
+def test_download_fitbit_participant_too_many_rows(
+    get_admin, sleep_levels, monkeypatch
+):
+    monkeypatch.setattr(fitbit_export, "XLSX_MAX_ROWS", 2)
+    res = get_admin("/admin/fitbit_data/download/participant/FO001")
+    assert res.status_code == 400
+    assert json.loads(res.data) == {
+        "msg": "Too many rows for an Excel file. Export as CSV or Parquet."
+    }
+
+
+def test_download_fitbit_participant_not_found(get_admin):
+    res = get_admin("/admin/fitbit_data/download/participant/FO001")
+    assert res.status_code == 200
+    assert json.loads(res.data) == {
+        "msg": "Participant with Ditti ID FO001 not found."
+    }
+
+
+def test_download_fitbit_study(app, get_admin, sleep_levels):
+    study = Study.query.filter(Study.ditti_id == "FO").first()
+    res = get_admin(f"/admin/fitbit_data/download/study/{study.id}")
+    assert res.status_code == 200
+    assert "FOO_Fitbit_" in res.headers["Content-Disposition"]
+
+    rows = read_xlsx(io.BytesIO(res.data))
+    assert len(rows) == sleep_levels["FO001"] + sleep_levels["FO002"] + 1
+    assert [row[0] for row in rows[1:]] == sorted(row[0] for row in rows[1:])
+    assert {row[0] for row in rows[1:]} == {"FO001", "FO002"}
+
+
+@pytest.mark.parametrize("export_format", ["csv.gz", "parquet"])
+def test_download_fitbit_study_format(
+    app, get_admin, sleep_levels, export_format
+):
+    study = Study.query.filter(Study.ditti_id == "FO").first()
+    res = get_admin(
+        f"/admin/fitbit_data/download/study/{study.id}",
+        query_string={"format": export_format},
+    )
+    assert res.status_code == 200
+    assert res.mimetype == EXPORT_FORMATS[export_format]
+    assert "FOO_Fitbit_" in res.headers["Content-Disposition"]
+    assert res.headers["Content-Disposition"].endswith(f".{export_format}")
+
+    if export_format == "parquet":
+        ditti_ids = pq.read_table(io.BytesIO(res.data))["Ditti ID"].to_pylist()
+    else:
+        data = gzip.decompress(res.data).decode()
+        ditti_ids = [row[0] for row in csv.reader(io.StringIO(data))][1:]
+
+    assert len(ditti_ids) == sleep_levels["FO001"] + sleep_levels["FO002"]
+    assert set(ditti_ids) == {"FO001", "FO002"}
+
+
+def test_download_fitbit_study_too_many_rows(
+    app, get_admin, sleep_levels, monkeypatch
+):
+    monkeypatch.setattr(fitbit_export, "XLSX_MAX_ROWS", 2)
+    study = Study.query.filter(Study.ditti_id == "FO").first()
+    res = get_admin(f"/admin/fitbit_data/download/study/{study.id}")
+    assert res.status_code == 400
+    assert "Too many rows" in json.loads(res.data)["msg"]
+
+    # Other formats have no limit
+    res = get_admin(
+        f"/admin/fitbit_data/download/study/{study.id}",
+        query_string={"format": "parquet"},
+    )
+    assert res.status_code == 200
+
+
+def test_download_fitbit_study_not_found(get_admin):
+    res = get_admin("/admin/fitbit_data/download/study/0")
+    assert res.status_code == 200
+    assert json.loads(res.data) == {"msg": "Study with ID 0 not found."}
+
+
+def test_download_fitbit_study_async(app, get_admin, sleep_levels, monkeypatch):
+    app.config["AWS_EXPORT_BUCKET"] = "testing-exports"
+    registry.get_client("s3").create_bucket(Bucket="testing-exports")
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(export_task_module, "executor", executor)
+
+    study = Study.query.filter(Study.ditti_id == "FO").first()
+    res = get_admin(
+        f"/admin/fitbit_data/download/study/{study.id}",
+        query_string={"format": "csv", "async": "true"},
+    )
+    assert res.status_code == 202
+    task = json.loads(res.data)["task"]
+    assert task["status"] == "Pending"
+    assert task["studyId"] == study.id
+
+    executor.shutdown(wait=True)
+    res = get_admin(f"/admin/fitbit_data/export/{task['id']}")
+    assert res.status_code == 200
+    data = json.loads(res.data)
+    assert data["task"]["status"] == "Success"
+    total = sleep_levels["FO001"] + sleep_levels["FO002"]
+    assert data["task"]["rowsDone"] == data["task"]["rowsTotal"] == total
+    assert "testing-exports" in data["url"]
+
+
+def test_get_export_task_not_found(app, get_admin):
+    res = get_admin("/admin/fitbit_data/export/0")
+    assert res.status_code == 404
+
+
+def test_get_export_task_other_account(app, get_admin):
+    study = Study.query.filter(Study.ditti_id == "FO").first()
+    account = Account.query.filter(Account.email != "foo@email.com").first()
+    export_task = ExportTask(
+        status="Pending", study_id=study.id, account_id=account.id, format="csv"
+    )
+    db.session.add(export_task)
+    db.session.commit()
+
+    res = get_admin(f"/admin/fitbit_data/export/{export_task.id}")
+    assert res.status_code == 404